@@ -1,12 +1,17 @@
 """依赖项 - 用于路由的通用依赖"""
-from typing import Optional
+from functools import lru_cache
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+from typing import Callable, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.config import settings
 from app.core.db import get_session
+from app.core.logging import logger
+from app.core.rate_limit import limiter, retry_after_header
 from app.core.security import decode_access_token
 from app.models.user import User
 from app.schemas.user import TokenData
@@ -76,3 +81,113 @@ async def get_current_active_user(
         当前活跃用户
     """
     return current_user
+
+
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    """获取当前管理员用户
+    
+    Args:
+        current_user: 当前用户
+        
+    Returns:
+        当前管理员用户
+        
+    Raises:
+        HTTPException: 非管理员时抛出403错误
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
+    return current_user
+
+
+async def _enforce_rate_limit(scope: str, identity: str, rate: str) -> None:
+    """执行限流检查
+    
+    Args:
+        scope: 限流范围
+        identity: 调用方标识
+        rate: 限流规则
+        
+    Raises:
+        HTTPException: 超出限额时抛出429错误,附带Retry-After响应头
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    
+    result = await limiter.hit(scope, identity, rate)
+    if not result.allowed:
+        logger.warning(f"触发限流: scope={scope}, {identity}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="请求过于频繁,请稍后再试",
+            headers={"Retry-After": retry_after_header(result)},
+        )
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple[IPv4Network | IPv6Network, ...]:
+    """解析可信代理的IP或网段"""
+    return tuple(ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def get_client_ip(request: Request) -> str:
+    """获取客户端IP
+    
+    只有直连地址属于 RATE_LIMIT_TRUSTED_PROXIES 时才使用代理设置的X-Real-IP,
+    否则客户端可以伪造该请求头绕过按IP限流
+    
+    Args:
+        request: 请求对象
+        
+    Returns:
+        客户端IP
+    """
+    peer = request.client.host if request.client else None
+    if peer and settings.RATE_LIMIT_TRUSTED_PROXIES:
+        real_ip = request.headers.get("x-real-ip")
+        if real_ip:
+            try:
+                address = ip_address(peer)
+            except ValueError:
+                address = None
+            networks = _trusted_networks(tuple(settings.RATE_LIMIT_TRUSTED_PROXIES))
+            if address is not None and any(address in network for network in networks):
+                return real_ip.strip()
+    return peer or "unknown"
+
+
+def user_rate_limit(scope: str, rate_setting: str) -> Callable:
+    """按用户限流的依赖项
+    
+    Args:
+        scope: 限流范围
+        rate_setting: 限流规则对应的配置项名,如 "RATE_LIMIT_GENERATE"
+        
+    Returns:
+        FastAPI依赖函数
+    """
+    async def dependency(current_user: User = Depends(get_current_active_user)) -> None:
+        await _enforce_rate_limit(scope, f"user:{current_user.id}", getattr(settings, rate_setting))
+    
+    return dependency
+
+
+def ip_rate_limit(scope: str, rate_setting: str) -> Callable:
+    """按客户端IP限流的依赖项(用于未登录接口)
+    
+    Args:
+        scope: 限流范围
+        rate_setting: 限流规则对应的配置项名,如 "RATE_LIMIT_AUTH"
+        
+    Returns:
+        FastAPI依赖函数
+    """
+    async def dependency(request: Request) -> None:
+        await _enforce_rate_limit(scope, f"ip:{get_client_ip(request)}", getattr(settings, rate_setting))
+    
+    return dependency
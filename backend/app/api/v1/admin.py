@@ -0,0 +1,124 @@
+"""管理端API - 全站用量统计(只读取 usage_daily、article_status_counts 汇总表)与进程内缓存统计"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import get_current_admin_user
+from app.core.config import settings
+from app.core.db import get_session
+from app.models.article import ArticleStatus
+from app.models.user import User
+from app.schemas.usage import PromptCacheReport, UsageReport, UserUsage
+from app.services.article_status import ArticleStatusService
+from app.services.prompt_templates import PromptCacheStats
+from app.services.usage_stats import UsageStatsService
+
+router = APIRouter(prefix="/admin", tags=["管理"])
+
+
+def _date_range(start: Optional[date], end: Optional[date]) -> tuple[date, date]:
+    """补全并校验日期范围,默认最近 ADMIN_USAGE_DEFAULT_DAYS 天(UTC)
+
+    Raises:
+        HTTPException: 范围无效或超过 ADMIN_USAGE_MAX_DAYS 天时抛出400错误
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=settings.ADMIN_USAGE_DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="开始日期不能晚于结束日期"
+        )
+    if (end - start).days + 1 > settings.ADMIN_USAGE_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"查询范围不能超过 {settings.ADMIN_USAGE_MAX_DAYS} 天"
+        )
+    return start, end
+
+
+@router.get("/usage", response_model=UsageReport)
+async def get_usage(
+    start: Optional[date] = Query(None, description="开始日期(含,UTC)"),
+    end: Optional[date] = Query(None, description="结束日期(含,UTC),默认今天"),
+    user_id: Optional[int] = Query(None, description="只统计该用户,为空时合计全部用户"),
+    admin: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
+) -> UsageReport:
+    """按天统计生成、同步与LLM用量
+
+    Args:
+        start: 开始日期
+        end: 结束日期
+        user_id: 用户ID
+        admin: 当前管理员
+        session: 数据库会话
+
+    Returns:
+        用量报表(合计与每日明细,耗时分位数由直方图估算)
+    """
+    start, end = _date_range(start, end)
+    return await UsageStatsService.report(session, start, end, user_id)
+
+
+@router.get("/usage/users", response_model=List[UserUsage])
+async def get_top_users(
+    start: Optional[date] = Query(None, description="开始日期(含,UTC)"),
+    end: Optional[date] = Query(None, description="结束日期(含,UTC),默认今天"),
+    limit: int = Query(20, ge=1, le=100),
+    admin: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
+) -> List[UserUsage]:
+    """统计时间范围内生成文章最多的用户
+
+    Args:
+        start: 开始日期
+        end: 结束日期
+        limit: 返回数量
+        admin: 当前管理员
+        session: 数据库会话
+
+    Returns:
+        用户用量列表(按生成文章数从高到低)
+    """
+    start, end = _date_range(start, end)
+    return await UsageStatsService.top_users(session, start, end, limit)
+
+
+@router.get("/articles/status-counts", response_model=Dict[ArticleStatus, int])
+async def get_article_status_counts(
+    user_id: Optional[int] = Query(None, description="只统计该用户,为空时合计全部用户"),
+    admin: User = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_session),
+) -> dict[str, int]:
+    """统计各状态的文章数量
+
+    Args:
+        user_id: 用户ID
+        admin: 当前管理员
+        session: 数据库会话
+
+    Returns:
+        状态 -> 文章数量
+    """
+    return await ArticleStatusService.counts(session, user_id)
+
+
+@router.get("/prompt-cache", response_model=PromptCacheReport)
+async def get_prompt_cache_stats(
+    admin: User = Depends(get_current_admin_user),
+) -> dict:
+    """Prompt前缀缓存命中统计
+
+    统计保存在进程内,多worker部署时只反映处理本次请求的worker;
+    全站的缓存Token合计见 /admin/usage 的 cached_tokens。
+
+    Args:
+        admin: 当前管理员
+
+    Returns:
+        调用数、缓存Token占比与命中/未命中缓存时的平均耗时
+    """
+    return PromptCacheStats.snapshot()
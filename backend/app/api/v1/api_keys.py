@@ -50,7 +50,7 @@ async def create_api_key(
     
     # 验证API Key
     try:
-        mcp_service = MCPService(api_key_encrypted)
+        mcp_service = MCPService(api_key_encrypted, api_key_data.provider)
         is_valid = await mcp_service.validate_api_key()
     except Exception as e:
         logger.error(f"API Key验证失败: {e}")
@@ -142,7 +142,7 @@ async def update_api_key(
     
     # 验证新的API Key
     try:
-        mcp_service = MCPService(api_key_encrypted)
+        mcp_service = MCPService(api_key_encrypted, api_key.provider)
         is_valid = await mcp_service.validate_api_key()
     except Exception as e:
         logger.error(f"API Key验证失败: {e}")
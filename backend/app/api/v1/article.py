@@ -1,37 +1,118 @@
 """文章管理API"""
-from datetime import datetime
-from typing import List
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.api.dependencies import get_current_active_user
+from app.api.dependencies import get_current_active_user, user_rate_limit
+from app.core.config import settings
 from app.core.db import get_session
+from app.core.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
 from app.core.logging import logger
-from app.models.article import Article
-from app.models.style import Style
+from app.core.tracing import get_tracer
+from app.models.article import Article, ArticleStatus
+from app.models.task import Task
 from app.models.user import User
 from app.models.user_api_key import UserApiKey
 from app.models.wechat_config import WechatConfig
-from app.schemas.article import ArticleCreate, ArticleListResponse, ArticleResponse, ArticleUpdate
+from app.schemas.article import (
+    ArticleCreate,
+    ArticleImportResult,
+    ArticleListResponse,
+    ArticleMarkdownPatch,
+    ArticleResponse,
+    ArticleSchedule,
+    ArticleSearchPage,
+    ArticleSimilarQuery,
+    ArticleUpdate,
+    SimilarArticle,
+)
+from app.services.article_content import ArticleContentService
+from app.services.article_search import ArticleSearchService
+from app.services.article_status import SYNCABLE_STATUSES, ArticleStatusService
+from app.services.article_sync import ArticleSyncService
+from app.services.article_transfer import ArticleTransferService, ImportLineTooLarge
 from app.services.mcp_service import MCPService
+from app.services.prompt_similarity import PromptSimilarityService
+from app.services.style_cache import StyleCache
 from app.services.style_service import StyleService
-from app.services.wechat_service import WechatService
+from app.services.task_progress import report_progress, track_task
+from app.services.usage_stats import LLMUsage, UsageStatsService, meter_llm_usage
+from app.utils.markdown_blocks import apply_splices, content_hash
 
 router = APIRouter(prefix="/articles", tags=["文章管理"])
 
+tracer = get_tracer(__name__)
 
-@router.post("", response_model=ArticleResponse, status_code=status.HTTP_201_CREATED)
+# 文章详情需每次向服务端验证(编辑器轮询时命中304)
+ARTICLE_CACHE_CONTROL = "private, no-cache"
+
+# 计算ETag所需的轻量列(不含正文等大字段)
+_ETAG_COLUMNS = (
+    Article.id,
+    Article.user_id,
+    Article.style_id,
+    Article.updated_at,
+    Article.status,
+    Article.retry_count,
+    Article.synced_at,
+    Article.next_attempt_at,
+    Article.scheduled_at,
+    Article.shell_omitted,
+)
+
+
+async def _article_etag(session: AsyncSession, article) -> str:
+    """根据文章的版本字段生成ETag
+    
+    同步状态变化不更新 updated_at,因此同步相关字段也参与计算;
+    紧凑存储的文章按当前样式重新包装,样式版本同样参与计算。
+    
+    Args:
+        session: 数据库会话
+        article: 文章对象或只含 _ETAG_COLUMNS 的行
+    """
+    style_version = None
+    if article.shell_omitted:
+        style = await StyleCache.get_style(session, article.style_id)
+        style_version = style.version if style else None
+    return make_etag(
+        article.id,
+        article.updated_at.isoformat(),
+        article.status,
+        article.retry_count,
+        article.synced_at,
+        article.next_attempt_at,
+        article.scheduled_at,
+        style_version,
+    )
+
+
+@router.post(
+    "",
+    response_model=ArticleResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(user_rate_limit("generate", "RATE_LIMIT_GENERATE"))],
+)
 async def create_article(
     article_data: ArticleCreate,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_session),
 ) -> Article:
     """生成文章
     
+    reuse_existing 为真且存在同一样式下Prompt近似的已生成文章时,直接返回该文章(状态码200,
+    响应头 X-Reused-Article 为文章ID),不调用LLM。
+    
     Args:
         article_data: 文章创建数据
+        response: 响应对象(复用已有文章时设置状态码与响应头)
         current_user: 当前用户
         session: 数据库会话
         
@@ -39,10 +120,7 @@ async def create_article(
         生成的文章
     """
     # 检查样式是否存在
-    result = await session.execute(
-        select(Style).where(Style.id == article_data.style_id)
-    )
-    style = result.scalar_one_or_none()
+    style = await StyleCache.get_style(session, article_data.style_id)
     
     if not style:
         raise HTTPException(
@@ -57,6 +135,21 @@ async def create_article(
             detail="无权使用此样式"
         )
     
+    if article_data.reuse_existing and settings.PROMPT_SIMILARITY_ENABLED:
+        similar = await PromptSimilarityService.find_similar(
+            session, current_user.id, article_data.prompt_input, style_id=article_data.style_id, limit=1
+        )
+        if similar:
+            existing = await session.get(Article, similar[0].id)
+            if existing is not None:
+                logger.info(
+                    f"用户 {current_user.username} 复用相似文章: article_id={existing.id}, "
+                    f"similarity={similar[0].similarity:.2f}"
+                )
+                response.status_code = status.HTTP_200_OK
+                response.headers["X-Reused-Article"] = str(existing.id)
+                return await ArticleContentService.hydrate(session, existing)
+    
     # 检查用户是否配置了API Key
     result = await session.execute(
         select(UserApiKey).where(UserApiKey.user_id == current_user.id)
@@ -77,47 +170,69 @@ async def create_article(
         prompt_input=article_data.prompt_input,
         content_raw="",
         content_html="",
-        status="draft",
+        status=ArticleStatus.GENERATING,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
     
-    session.add(new_article)
-    await session.commit()
-    await session.refresh(new_article)
-    
-    # 异步生成文章内容
-    try:
-        # 调用MCP服务生成Markdown
-        mcp_service = MCPService(api_key_config.api_key_encrypted)
-        markdown_content = await mcp_service.generate_article(
-            article_data.prompt_input,
-            style.prompt_instruction
-        )
-        
-        # 提取标题
-        title = StyleService.extract_title_from_markdown(markdown_content)
-        if not title:
-            title = article_data.prompt_input[:50]
-        
-        # 转换为HTML
-        html_content = StyleService.markdown_to_html(markdown_content, style.css_content)
-        
-        # 更新文章
-        new_article.title = title
-        new_article.content_raw = markdown_content
-        new_article.content_html = html_content
-        new_article.updated_at = datetime.utcnow()
-        
+    with tracer.start_as_current_span("db.create_article"):
+        session.add(new_article)
+        await ArticleStatusService.created(session, current_user.id, ArticleStatus.GENERATING)
         await session.commit()
         await session.refresh(new_article)
+    
+    # 异步生成文章内容(进度通过 /tasks/ws 推送)
+    llm_usage: Optional[LLMUsage] = None
+    try:
+        async with track_task(current_user.id, "generate_article", new_article.id):
+            # 调用MCP服务生成Markdown
+            with tracer.start_as_current_span("llm.generate"), meter_llm_usage() as llm_usage:
+                started = time.perf_counter()
+                mcp_service = MCPService(api_key_config.api_key_encrypted, api_key_config.provider)
+                markdown_content = await mcp_service.generate_article(
+                    article_data.prompt_input,
+                    style.prompt_instruction,
+                    model=style.model,
+                    target_length=article_data.target_length,
+                    mode=article_data.generation_mode,
+                    style_key=(style.id, style.version),
+                )
+                generation_ms = (time.perf_counter() - started) * 1000
+            
+            # 提取标题
+            title = StyleService.extract_title_from_markdown(markdown_content)
+            if not title:
+                title = article_data.prompt_input[:50]
+            
+            # 转换为HTML
+            await report_progress("rendering", 85)
+            body_html = StyleService.render_body(markdown_content)
+            
+            # 更新文章
+            new_article.title = title
+            new_article.content_raw = markdown_content
+            await ArticleContentService.set_rendered(new_article, body_html, style)
+            new_article.updated_at = datetime.utcnow()
+            await ArticleStatusService.transition(session, new_article, ArticleStatus.GENERATED)
+            
+            await report_progress("saving", 95)
+            if settings.PROMPT_SIMILARITY_ENABLED:
+                PromptSimilarityService.index(session, new_article)
+            await UsageStatsService.record_generation(
+                session, current_user.id, True, llm_usage, generation_ms
+            )
+            with tracer.start_as_current_span("db.save_article"):
+                await session.commit()
+                await session.refresh(new_article)
         
         logger.info(f"用户 {current_user.username} 生成文章成功: {title}")
         
     except Exception as e:
         # 记录错误
         new_article.generation_error = str(e)
-        new_article.status = "failed"
+        if new_article.status == ArticleStatus.GENERATING:
+            await ArticleStatusService.transition(session, new_article, ArticleStatus.GENERATION_FAILED)
+        await UsageStatsService.record_generation(session, current_user.id, False, llm_usage)
         await session.commit()
         await session.refresh(new_article)
         
@@ -127,7 +242,7 @@ async def create_article(
             detail=f"文章生成失败: {str(e)}"
         )
     
-    return new_article
+    return await ArticleContentService.hydrate(session, new_article)
 
 
 @router.get("", response_model=List[ArticleListResponse])
@@ -160,22 +275,186 @@ async def list_articles(
     return list(articles)
 
 
-@router.get("/{article_id}", response_model=ArticleResponse)
+@router.post("/similar", response_model=List[SimilarArticle])
+async def find_similar_articles(
+    query: ArticleSimilarQuery,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
+) -> List[SimilarArticle]:
+    """查找Prompt近似的已生成文章
+    
+    供前端在提交生成前提示用户,可改为打开已有文章或以 reuse_existing 提交。
+    
+    Args:
+        query: 准备提交的Prompt与样式
+        current_user: 当前用户
+        session: 数据库会话
+        
+    Returns:
+        相似文章列表(按相似度从高到低)
+    """
+    if not settings.PROMPT_SIMILARITY_ENABLED:
+        return []
+    return await PromptSimilarityService.find_similar(
+        session, current_user.id, query.prompt_input, style_id=query.style_id
+    )
+
+
+@router.get("/search", response_model=ArticleSearchPage)
+async def search_articles(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索词,多个关键词以空格分隔"),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
+) -> ArticleSearchPage:
+    """搜索文章
+    
+    在标题与Markdown正文中全文搜索,按相关度排序,标题命中的结果靠前。
+    
+    Args:
+        q: 搜索词
+        limit: 每页数量
+        cursor: 分页游标
+        current_user: 当前用户
+        session: 数据库会话
+        
+    Returns:
+        搜索结果页(含高亮标题与摘要)
+    """
+    try:
+        return await ArticleSearchService.search(session, current_user.id, q, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/status-counts", response_model=Dict[ArticleStatus, int])
+async def get_status_counts(
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
+) -> dict[str, int]:
+    """获取各状态的文章数量
+    
+    读取按用户维护的状态计数,不扫描文章表。
+    
+    Args:
+        current_user: 当前用户
+        session: 数据库会话
+        
+    Returns:
+        状态 -> 文章数量
+    """
+    return await ArticleStatusService.counts(session, current_user.id)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "application/zip": {}}}},
+)
+async def export_articles(
+    export_format: Literal["ndjson", "zip"] = Query("ndjson", alias="format", description="导出格式"),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """导出全部文章
+    
+    边读边发送,内存占用与文章数量无关:
+    - ndjson: 每行一篇文章(含Markdown与完整HTML),可直接用于 POST /articles/import
+    - zip: markdown/<id>-<标题>.md 与 html/<id>-<标题>.html
+    
+    Args:
+        export_format: 导出格式
+        current_user: 当前用户
+        
+    Returns:
+        流式响应
+    """
+    date = datetime.utcnow().strftime("%Y%m%d")
+    if export_format == "zip":
+        body = ArticleTransferService.export_zip(current_user.id)
+        media_type = "application/zip"
+    else:
+        body = ArticleTransferService.export_ndjson(current_user.id)
+        media_type = "application/x-ndjson"
+    
+    logger.info(f"用户 {current_user.username} 导出文章: format={export_format}")
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="articles-{date}.{export_format}"'},
+    )
+
+
+@router.post("/import", response_model=ArticleImportResult)
+async def import_articles(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
+) -> ArticleImportResult:
+    """从NDJSON导入文章
+    
+    请求体为NDJSON(每行一篇文章,格式同导出文件),边接收边解析并分批插入。
+    导入的文章均为草稿;无效的行会跳过并在结果中列出。
+    
+    Args:
+        request: 请求对象(读取请求体流)
+        current_user: 当前用户
+        session: 数据库会话
+        
+    Returns:
+        导入结果
+    """
+    try:
+        result = await ArticleTransferService.import_ndjson(session, current_user.id, request.stream())
+    except ImportLineTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"{e},该行之前的文章已导入"
+        )
+    
+    logger.info(f"用户 {current_user.username} 导入文章: 成功 {result.imported} 篇, 失败 {result.failed} 行")
+    return result
+
+
+@router.get(
+    "/{article_id}",
+    response_model=ArticleResponse,
+    responses={304: {"description": "文章未修改"}},
+)
 async def get_article(
     article_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_session),
-) -> Article:
+    if_none_match: Optional[str] = Header(None),
+):
     """获取文章详情
     
+    支持条件请求: If-None-Match 命中时只查询轻量列并返回304,不加载正文。
+    
     Args:
         article_id: 文章ID
+        response: 响应对象(用于设置ETag)
         current_user: 当前用户
         session: 数据库会话
+        if_none_match: 客户端缓存的ETag
         
     Returns:
         文章详情
     """
+    if if_none_match:
+        result = await session.execute(
+            select(*_ETAG_COLUMNS).where(Article.id == article_id)
+        )
+        row = result.one_or_none()
+        if row is not None and row.user_id == current_user.id:
+            etag = await _article_etag(session, row)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag, ARTICLE_CACHE_CONTROL)
+    
     result = await session.execute(
         select(Article).where(Article.id == article_id)
     )
@@ -194,7 +473,8 @@ async def get_article(
             detail="无权访问此文章"
         )
     
-    return article
+    set_cache_headers(response, await _article_etag(session, article), ARTICLE_CACHE_CONTROL)
+    return await ArticleContentService.hydrate(session, article)
 
 
 @router.put("/{article_id}", response_model=ArticleResponse)
@@ -237,7 +517,7 @@ async def update_article(
     if article_data.title is not None:
         article.title = article_data.title
     if article_data.content_html is not None:
-        article.content_html = article_data.content_html
+        await ArticleContentService.set_document(article, article_data.content_html)
     
     article.updated_at = datetime.utcnow()
     
@@ -246,10 +526,90 @@ async def update_article(
     
     logger.info(f"用户 {current_user.username} 更新文章: {article.title}")
     
-    return article
+    return await ArticleContentService.hydrate(session, article)
 
 
-@router.post("/{article_id}/sync", response_model=ArticleResponse)
+@router.patch("/{article_id}/markdown", response_model=ArticleResponse)
+async def patch_article_markdown(
+    article_id: int,
+    patch_data: ArticleMarkdownPatch,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
+) -> Article:
+    """增量编辑文章Markdown
+    
+    应用补丁后只重新渲染改动的块,同时更新 content_raw 与 content_html。
+    通过 PUT 直接编辑过的HTML会被Markdown的渲染结果覆盖。
+    
+    Args:
+        article_id: 文章ID
+        patch_data: Markdown补丁
+        current_user: 当前用户
+        session: 数据库会话
+        
+    Returns:
+        更新后的文章
+    """
+    result = await session.execute(
+        select(Article).where(Article.id == article_id)
+    )
+    article = result.scalar_one_or_none()
+    
+    if not article:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文章不存在"
+        )
+    
+    # 检查权限
+    if article.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权修改此文章"
+        )
+    
+    if patch_data.base_hash is not None and patch_data.base_hash != content_hash(article.content_raw):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="文章已被修改,请刷新后重试"
+        )
+    
+    try:
+        markdown_content = apply_splices(
+            article.content_raw,
+            [(p.start, p.end, p.text) for p in patch_data.patches],
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    style = await StyleCache.get_style(session, article.style_id)
+    if not style:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="样式不存在"
+        )
+    
+    body_html = StyleService.render_body_incremental(markdown_content)
+    
+    article.content_raw = markdown_content
+    await ArticleContentService.set_rendered(article, body_html, style)
+    article.updated_at = datetime.utcnow()
+    
+    with tracer.start_as_current_span("db.save_article"):
+        await session.commit()
+        await session.refresh(article)
+    
+    return await ArticleContentService.hydrate(session, article)
+
+
+@router.post(
+    "/{article_id}/sync",
+    response_model=ArticleResponse,
+    dependencies=[Depends(user_rate_limit("sync", "RATE_LIMIT_SYNC"))],
+)
 async def sync_article_to_wechat(
     article_id: int,
     current_user: User = Depends(get_current_active_user),
@@ -265,9 +625,10 @@ async def sync_article_to_wechat(
     Returns:
         同步后的文章
     """
-    # 获取文章
+    # 获取文章并锁定到提交同步中状态为止,与重试Worker的领取互斥
+    # (FOR NO KEY UPDATE 不阻塞 tasks 表引用该文章的外键检查)
     result = await session.execute(
-        select(Article).where(Article.id == article_id)
+        select(Article).where(Article.id == article_id).with_for_update(key_share=True)
     )
     article = result.scalar_one_or_none()
     
@@ -284,6 +645,18 @@ async def sync_article_to_wechat(
             detail="无权同步此文章"
         )
     
+    # 检查状态(同步租约过期的文章可以重新同步)
+    if article.status == ArticleStatus.SYNCING and article.next_attempt_at and article.next_attempt_at > datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="文章正在同步中"
+        )
+    if article.status not in SYNCABLE_STATUSES and article.status != ArticleStatus.SYNCING:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="文章尚未生成成功,不能同步"
+        )
+    
     # 检查微信配置
     result = await session.execute(
         select(WechatConfig).where(WechatConfig.user_id == current_user.id)
@@ -296,46 +669,136 @@ async def sync_article_to_wechat(
             detail="请先配置微信公众号"
         )
     
-    # 同步到微信
+    # 同步到微信(手动同步后取消尚未执行的定时同步)
+    article.scheduled_at = None
     try:
-        wechat_service = WechatService(wechat_config)
-        media_id = await wechat_service.sync_article_with_retry(
-            article.title,
-            article.content_html
-        )
-        
-        # 更新文章状态
-        article.wechat_media_id = media_id
-        article.status = "synced"
-        article.synced_at = datetime.utcnow()
-        article.sync_error_message = None
-        
-        # 更新微信配置统计
-        wechat_config.total_synced += 1
-        wechat_config.last_sync_at = datetime.utcnow()
-        
-        await session.commit()
-        await session.refresh(article)
-        await session.refresh(wechat_config)
-        
+        await ArticleSyncService.sync(session, article, wechat_config)
         logger.info(f"用户 {current_user.username} 同步文章成功: {article.title}")
         
     except Exception as e:
-        # 记录错误
-        article.sync_error_message = str(e)
-        article.status = "failed"
-        article.retry_count += 1
-        
-        await session.commit()
-        await session.refresh(article)
-        
         logger.error(f"文章同步失败: {e}")
+        detail = f"文章同步失败: {str(e)}"
+        if article.next_attempt_at:
+            detail += f",已加入重试队列,将于 {article.next_attempt_at.isoformat()} 自动重试"
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"文章同步失败: {str(e)}"
+            detail=detail
         )
     
-    return article
+    return await ArticleContentService.hydrate(session, article)
+
+
+@router.put("/{article_id}/schedule", response_model=ArticleResponse)
+async def schedule_article_sync(
+    article_id: int,
+    schedule: ArticleSchedule,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
+) -> Article:
+    """设置定时同步
+    
+    到期后由 SyncScheduler 批量同步,重复设置会覆盖之前的时间。
+    
+    Args:
+        article_id: 文章ID
+        schedule: 定时同步时间
+        current_user: 当前用户
+        session: 数据库会话
+        
+    Returns:
+        更新后的文章
+    """
+    result = await session.execute(
+        select(Article).where(Article.id == article_id)
+    )
+    article = result.scalar_one_or_none()
+    
+    if not article:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文章不存在"
+        )
+    
+    # 检查权限
+    if article.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权同步此文章"
+        )
+    
+    if article.status in (ArticleStatus.GENERATING, ArticleStatus.GENERATION_FAILED):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="文章尚未生成成功,不能同步"
+        )
+    
+    # 统一存储为不带时区的UTC时间
+    scheduled_at = schedule.scheduled_at
+    if scheduled_at.tzinfo is not None:
+        scheduled_at = scheduled_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if scheduled_at <= datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="定时同步时间必须晚于当前时间"
+        )
+    
+    # 检查微信配置
+    result = await session.execute(
+        select(WechatConfig.id).where(WechatConfig.user_id == current_user.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="请先配置微信公众号"
+        )
+    
+    article.scheduled_at = scheduled_at
+    await session.commit()
+    await session.refresh(article)
+    
+    logger.info(f"用户 {current_user.username} 设置定时同步: {article.title}, {scheduled_at.isoformat()}")
+    return await ArticleContentService.hydrate(session, article)
+
+
+@router.delete("/{article_id}/schedule", response_model=ArticleResponse)
+async def cancel_article_schedule(
+    article_id: int,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
+) -> Article:
+    """取消定时同步
+    
+    Args:
+        article_id: 文章ID
+        current_user: 当前用户
+        session: 数据库会话
+        
+    Returns:
+        更新后的文章
+    """
+    result = await session.execute(
+        select(Article).where(Article.id == article_id)
+    )
+    article = result.scalar_one_or_none()
+    
+    if not article:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文章不存在"
+        )
+    
+    # 检查权限
+    if article.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权同步此文章"
+        )
+    
+    article.scheduled_at = None
+    await session.commit()
+    await session.refresh(article)
+    
+    return await ArticleContentService.hydrate(session, article)
 
 
 @router.delete("/{article_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -369,6 +832,12 @@ async def delete_article(
             detail="无权删除此文章"
         )
     
+    # 保留任务记录,解除与文章的关联
+    await session.execute(
+        update(Task).where(Task.article_id == article.id).values(article_id=None)
+    )
+    await PromptSimilarityService.remove(session, article.id)
+    await ArticleStatusService.deleted(session, article)
     await session.delete(article)
     await session.commit()
     
@@ -5,13 +5,22 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.api.dependencies import ip_rate_limit
 from app.core.db import get_session
 from app.core.logging import logger
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    verify_and_update_password,
+)
 from app.models.user import User
 from app.schemas.user import Token, UserCreate, UserLogin, UserResponse
 
-router = APIRouter(prefix="/auth", tags=["认证"])
+router = APIRouter(
+    prefix="/auth",
+    tags=["认证"],
+    dependencies=[Depends(ip_rate_limit("auth", "RATE_LIMIT_AUTH"))],
+)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -44,7 +53,7 @@ async def register(
         )
     
     # 创建新用户
-    password_hash = get_password_hash(user_data.password)
+    password_hash = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -87,7 +96,12 @@ async def login(
     user = result.scalar_one_or_none()
     
     # 验证用户和密码
-    if not user or not verify_password(login_data.password, user.password_hash):
+    password_valid, new_password_hash = False, None
+    if user:
+        password_valid, new_password_hash = await verify_and_update_password(
+            login_data.password, user.password_hash
+        )
+    if not password_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -100,6 +114,13 @@ async def login(
             detail="用户账号已被禁用"
         )
     
+    # 哈希参数已调整时透明升级密码哈希
+    if new_password_hash:
+        user.password_hash = new_password_hash
+        user.updated_at = datetime.utcnow()
+        await session.commit()
+        logger.info(f"用户密码哈希已升级: {user.username}")
+    
     # 创建访问令牌
     access_token = create_access_token(
         data={"user_id": user.id, "username": user.username}
@@ -1,35 +1,65 @@
-"""健康检查API"""
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+"""健康检查API
 
-from app.core.db import get_session
+- /health/live: 存活探针,进程能响应即返回200,不访问任何依赖
+- /health/ready: 就绪探针,读取后台健康监控的缓存结果,未就绪时返回503
+- /health: 汇总信息(兼容旧接口)
+"""
+from fastapi import APIRouter, Response, status
+
+from app.services.health_monitor import OK, health_monitor
 
 router = APIRouter(prefix="/health", tags=["健康检查"])
 
 
 @router.get("")
-async def health_check(
-    session: AsyncSession = Depends(get_session),
-) -> dict:
+async def health_check() -> dict:
     """健康检查接口
     
-    检查数据库连接状态
+    返回后台健康监控最近一次的检查结果,尚未检查过时先执行一次
     
-    Args:
-        session: 数据库会话
-        
     Returns:
         健康状态信息
     """
-    try:
-        # 测试数据库连接
-        await session.execute(text("SELECT 1"))
+    await health_monitor.ensure_checked()
+    database = health_monitor.components.get("database")
+    if database is not None and database.status == OK:
         database_status = "ok"
-    except Exception as e:
-        database_status = f"error: {str(e)}"
+    else:
+        database_status = f"error: {database.detail.get('error') if database else '未检查'}"
     
     return {
         "status": "healthy" if database_status == "ok" else "unhealthy",
         "database": database_status,
+        **health_monitor.snapshot(),
     }
+
+
+@router.get("/live")
+async def liveness() -> dict:
+    """存活探针
+    
+    只反映进程是否存活,依赖故障时不应重启实例
+    
+    Returns:
+        固定的存活状态
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness(response: Response) -> dict:
+    """就绪探针
+    
+    O(1)读取缓存状态: 启动预热完成、检查结果未过期且数据库可用时返回200,否则返回503。
+    Redis与上游故障只记为 degraded,不影响就绪。
+    
+    Args:
+        response: 响应对象
+        
+    Returns:
+        就绪状态与各依赖的检查结果
+    """
+    snapshot = health_monitor.snapshot()
+    if not snapshot["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return snapshot
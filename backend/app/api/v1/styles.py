@@ -1,17 +1,20 @@
 """样式管理API"""
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import or_, select
+from sqlmodel import select
 
 from app.api.dependencies import get_current_active_user
+from app.core.config import settings
 from app.core.db import get_session
+from app.core.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
 from app.core.logging import logger
 from app.models.style import Style
 from app.models.user import User
 from app.schemas.style import StyleCreate, StyleResponse, StyleUpdate
+from app.services.style_cache import StyleCache
 
 router = APIRouter(prefix="/styles", tags=["样式管理"])
 
@@ -30,39 +33,36 @@ async def list_styles(
     Returns:
         样式列表
     """
-    result = await session.execute(
-        select(Style).where(
-            or_(
-                Style.is_system == True,
-                Style.user_id == current_user.id
-            )
-        ).order_by(Style.is_system.desc(), Style.created_at.desc())
-    )
-    styles = result.scalars().all()
-    
-    return list(styles)
+    return await StyleCache.list_styles(session, current_user.id)
 
 
-@router.get("/{style_id}", response_model=StyleResponse)
+@router.get(
+    "/{style_id}",
+    response_model=StyleResponse,
+    responses={304: {"description": "样式未修改"}},
+)
 async def get_style(
     style_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_session),
-) -> Style:
+    if_none_match: Optional[str] = Header(None),
+):
     """获取样式详情
     
+    返回ETag,If-None-Match 命中时返回304;系统样式对所有用户相同,允许共享缓存。
+    
     Args:
         style_id: 样式ID
+        response: 响应对象(用于设置ETag)
         current_user: 当前用户
         session: 数据库会话
+        if_none_match: 客户端缓存的ETag
         
     Returns:
         样式详情
     """
-    result = await session.execute(
-        select(Style).where(Style.id == style_id)
-    )
-    style = result.scalar_one_or_none()
+    style = await StyleCache.get_style(session, style_id)
     
     if not style:
         raise HTTPException(
@@ -77,6 +77,16 @@ async def get_style(
             detail="无权访问此样式"
         )
     
+    etag = make_etag(style.id, style.version, style.updated_at.isoformat())
+    if style.is_system:
+        cache_control = f"public, max-age={settings.STYLE_SYSTEM_MAX_AGE}"
+    else:
+        cache_control = "private, no-cache"
+    
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+    
+    set_cache_headers(response, etag, cache_control)
     return style
 
 
@@ -101,6 +111,7 @@ async def create_style(
         description=style_data.description,
         prompt_instruction=style_data.prompt_instruction,
         css_content=style_data.css_content,
+        model=style_data.model,
         is_system=False,
         user_id=current_user.id,
         version=1,
@@ -112,6 +123,7 @@ async def create_style(
     session.add(new_style)
     await session.commit()
     await session.refresh(new_style)
+    await StyleCache.invalidate(None, current_user.id)
     
     logger.info(f"用户 {current_user.username} 创建样式: {new_style.name}")
     
@@ -154,16 +166,23 @@ async def update_style(
             detail="无权修改此样式"
         )
     
+    previous_version = style.version
+    
     # 更新字段
     if style_data.name is not None:
         style.name = style_data.name
     if style_data.description is not None:
         style.description = style_data.description
-    if style_data.prompt_instruction is not None:
-        style.prompt_instruction = style_data.prompt_instruction
     if style_data.css_content is not None:
         style.css_content = style_data.css_content
         style.version += 1  # 增加版本号
+    if style_data.prompt_instruction is not None and style_data.prompt_instruction != style.prompt_instruction:
+        style.prompt_instruction = style_data.prompt_instruction
+        # 系统提示前缀按 (样式ID, 版本) 缓存,指令变化时同样需要新版本
+        if style.version == previous_version:
+            style.version += 1
+    if style_data.model is not None:
+        style.model = style_data.model or None  # 传空字符串时恢复默认模型
     if style_data.preview_image is not None:
         style.preview_image = style_data.preview_image
     
@@ -171,6 +190,7 @@ async def update_style(
     
     await session.commit()
     await session.refresh(style)
+    await StyleCache.invalidate(style.id, current_user.id, previous_version, style.version)
     
     logger.info(f"用户 {current_user.username} 更新样式: {style.name}")
     
@@ -210,5 +230,6 @@ async def delete_style(
     
     await session.delete(style)
     await session.commit()
+    await StyleCache.invalidate(style_id, current_user.id, style.version, style.version + 1)
     
     logger.info(f"用户 {current_user.username} 删除样式: {style.name}")
@@ -0,0 +1,103 @@
+"""任务API - 任务查询与进度推送(WebSocket)"""
+import asyncio
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.api.dependencies import get_current_active_user
+from app.core.config import settings
+from app.core.db import async_session_maker, get_session
+from app.core.security import decode_access_token
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskResponse
+from app.services.task_progress import progress_broker
+
+router = APIRouter(prefix="/tasks", tags=["任务管理"])
+
+
+@router.get("", response_model=List[TaskResponse])
+async def list_tasks(
+    task_status: Optional[str] = Query(None, alias="status", description="按状态过滤: running/completed/failed"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
+) -> List[Task]:
+    """获取最近的任务
+
+    WebSocket断线重连后可用于补齐断线期间的任务状态。
+
+    Args:
+        task_status: 状态过滤
+        limit: 返回数量
+        current_user: 当前用户
+        session: 数据库会话
+
+    Returns:
+        任务列表(按创建时间倒序)
+    """
+    query = select(Task).where(Task.user_id == current_user.id)
+    if task_status:
+        query = query.where(Task.status == task_status)
+    result = await session.execute(query.order_by(Task.created_at.desc()).limit(limit))
+    return result.scalars().all()
+
+
+async def _authenticate(token: str) -> Optional[User]:
+    """校验WebSocket连接携带的访问令牌"""
+    payload = decode_access_token(token)
+    if payload is None or payload.get("user_id") is None:
+        return None
+    async with async_session_maker() as session:
+        user = await session.get(User, payload["user_id"])
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+@router.websocket("/ws")
+async def task_progress_ws(websocket: WebSocket, token: str = Query(...)) -> None:
+    """推送当前用户的任务进度
+
+    浏览器无法为WebSocket设置请求头,访问令牌通过查询参数 token 传递。
+    每条消息为一个JSON事件: task_id/task_type/article_id/status/stage/progress/tokens/detail;
+    tokens 为已生成的Token数,流式生成时按 LLM_STREAM_PROGRESS_INTERVAL 持续更新(估算值,完成后按实际用量校正);
+    空闲时每隔 TASK_WS_HEARTBEAT 秒发送 {"type": "ping"}。
+
+    Args:
+        websocket: WebSocket连接
+        token: 访问令牌
+    """
+    user = await _authenticate(token)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="无法验证凭证")
+        return
+
+    await websocket.accept()
+    async with progress_broker.subscribe(user.id) as queue:
+        # 客户端不发送消息,接收循环只用于及时发现断开
+        receiver = asyncio.create_task(websocket.receive_text())
+        try:
+            while True:
+                getter = asyncio.create_task(queue.get())
+                done, _ = await asyncio.wait(
+                    {getter, receiver},
+                    timeout=settings.TASK_WS_HEARTBEAT,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if getter in done:
+                    await websocket.send_text(getter.result())
+                else:
+                    getter.cancel()
+                if receiver in done:
+                    receiver.result()  # 断开时抛出 WebSocketDisconnect
+                    receiver = asyncio.create_task(websocket.receive_text())
+                elif not done:
+                    await websocket.send_text(json.dumps({"type": "ping"}))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
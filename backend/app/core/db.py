@@ -6,6 +6,8 @@ from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 
 from app.core.config import settings
+from app.core.logging import logger
+from app.utils.sql import add_missing_columns
 
 # 将postgresql://转换为postgresql+asyncpg://以支持异步
 database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
@@ -16,8 +18,8 @@ engine = create_async_engine(
     echo=settings.DEBUG,
     future=True,
     pool_pre_ping=True,  # 连接池预检查
-    pool_size=10,  # 连接池大小
-    max_overflow=20,  # 最大溢出连接数
+    pool_size=settings.DB_POOL_SIZE,  # 连接池大小(每个worker进程)
+    max_overflow=settings.DB_MAX_OVERFLOW,  # 最大溢出连接数
 )
 
 # 创建异步会话工厂
@@ -30,10 +32,25 @@ async_session_maker = sessionmaker(
 )
 
 
+# 新版本在已有表上增加的列: create_all 不会修改已存在的表,启动时补齐
+ADDED_COLUMNS: dict[str, tuple[str, ...]] = {
+    "articles": (
+        "content_body", "content_blob", "content_codec", "shell_omitted", "style_version",
+        "next_attempt_at", "scheduled_at",
+    ),
+    "styles": ("model",),
+    "users": ("is_admin",),
+}
+
+
 async def create_db_and_tables() -> None:
-    """创建数据库表"""
+    """创建数据库表并补充新增列"""
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        for table_name, column_names in ADDED_COLUMNS.items():
+            added = await add_missing_columns(conn, SQLModel.metadata.tables[table_name], column_names)
+            if added:
+                logger.info(f"已为 {table_name} 表补充列: {', '.join(added)}")
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
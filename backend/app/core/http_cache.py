@@ -0,0 +1,53 @@
+"""HTTP缓存 - ETag生成与条件请求(If-None-Match)处理"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """根据资源的版本字段生成强ETag
+
+    Args:
+        *parts: 决定响应内容的字段(ID、版本号、更新时间等)
+
+    Returns:
+        带引号的ETag
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return '"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断 If-None-Match 是否命中
+
+    If-None-Match 使用弱比较,忽略 W/ 前缀;支持逗号分隔的多个值与 "*"。
+
+    Args:
+        if_none_match: 请求头的值
+        etag: 当前资源的ETag
+
+    Returns:
+        是否命中
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """构造304响应"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    """为200响应设置缓存相关响应头"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
@@ -41,15 +41,27 @@ class SensitiveDataFilter(logging.Filter):
         return True
 
 
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """首次写入日志时才创建目录和文件的轮转文件处理器
+    
+    导入模块(如运行测试、执行脚本)时不在工作目录下创建 logs 目录。
+    """
+    
+    def __init__(self, filename: Path, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+    
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
 def setup_logging() -> logging.Logger:
     """配置应用日志系统
     
     Returns:
         配置好的logger实例
     """
-    # 创建日志目录
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
+    log_dir = Path(settings.LOG_DIR)
     
     # 创建logger
     logger = logging.getLogger("wechat_agent")
@@ -72,7 +84,7 @@ def setup_logging() -> logging.Logger:
     console_handler.addFilter(SensitiveDataFilter())
     
     # 文件处理器(带轮转)
-    file_handler = RotatingFileHandler(
+    file_handler = LazyRotatingFileHandler(
         log_dir / "app.log",
         maxBytes=settings.LOG_FILE_MAX_BYTES,
         backupCount=settings.LOG_FILE_BACKUP_COUNT,
@@ -83,7 +95,7 @@ def setup_logging() -> logging.Logger:
     file_handler.addFilter(SensitiveDataFilter())
     
     # 错误日志文件处理器
-    error_handler = RotatingFileHandler(
+    error_handler = LazyRotatingFileHandler(
         log_dir / "error.log",
         maxBytes=settings.LOG_FILE_MAX_BYTES,
         backupCount=settings.LOG_FILE_BACKUP_COUNT,
@@ -0,0 +1,153 @@
+"""限流模块 - 基于Redis GCRA的分布式限流,Redis不可用时降级为本地令牌桶
+
+限流规则格式与配置一致,如 "5/minute"、"100/hour"。
+Redis中每个限流键只保存一个理论到达时间(TAT),一次EVALSHA完成判断与更新,
+单次请求开销为一个Redis往返。
+"""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis, mark_redis_unavailable, redis_available
+
+# 时间单位(秒)
+_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# GCRA限流脚本
+# KEYS[1]: 限流键
+# ARGV[1]: 发射间隔(毫秒) = 周期 / 次数
+# ARGV[2]: 突发容量(次数)
+# 返回: {是否允许(1/0), 需等待的毫秒数}
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local wait = new_tat - now - interval * burst
+if wait > 0 then
+    return {0, math.ceil(wait)}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, 0}
+"""
+
+
+@dataclass
+class RateLimitResult:
+    """限流判断结果"""
+    allowed: bool
+    retry_after: float = 0.0  # 需等待的秒数
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """解析限流规则
+
+    Args:
+        rate: 限流规则,如 "5/minute"
+
+    Returns:
+        (次数, 周期秒数)
+
+    Raises:
+        ValueError: 格式不合法时抛出
+    """
+    try:
+        count, unit = rate.strip().split("/", 1)
+        unit = unit.strip().lower().rstrip("s")
+        return int(count), _PERIODS[unit]
+    except (ValueError, KeyError):
+        raise ValueError(f"无效的限流规则: {rate}")
+
+
+class LocalTokenBucket:
+    """本地令牌桶 - Redis不可用时的进程内降级实现
+
+    只能限制单个进程,多worker部署时总限额会按worker数放大。
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        # key -> (剩余令牌数, 上次更新时间)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def hit(self, key: str, count: int, period: int) -> RateLimitResult:
+        """消耗一个令牌
+
+        Args:
+            key: 限流键
+            count: 周期内允许的次数(桶容量)
+            period: 周期秒数
+        """
+        now = time.monotonic()
+        refill_rate = count / period
+        tokens, updated_at = self._buckets.pop(key, (float(count), now))
+        tokens = min(float(count), tokens + (now - updated_at) * refill_rate)
+
+        if tokens >= 1:
+            result = RateLimitResult(allowed=True)
+            tokens -= 1
+        else:
+            result = RateLimitResult(allowed=False, retry_after=(1 - tokens) / refill_rate)
+
+        self._buckets[key] = (tokens, now)
+        # 超过容量时淘汰最久未访问的键
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return result
+
+
+class RateLimiter:
+    """分布式限流器"""
+
+    def __init__(self):
+        self._script = None
+        self._local = LocalTokenBucket()
+
+    async def hit(self, scope: str, identity: str, rate: str) -> RateLimitResult:
+        """记录一次请求并判断是否超限
+
+        Args:
+            scope: 限流范围,如 "generate"/"sync"/"auth"
+            identity: 调用方标识,如 "user:1"/"ip:1.2.3.4"
+            rate: 限流规则,如 "5/minute"
+
+        Returns:
+            限流判断结果
+        """
+        count, period = parse_rate(rate)
+        key = f"ratelimit:{scope}:{identity}"
+
+        if redis_available():
+            try:
+                if self._script is None:
+                    self._script = get_redis().register_script(_GCRA_SCRIPT)
+                allowed, wait_ms = await self._script(keys=[key], args=[period * 1000 / count, count])
+                return RateLimitResult(allowed=bool(allowed), retry_after=int(wait_ms) / 1000)
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+        return self._local.hit(key, count, period)
+
+
+def retry_after_header(result: RateLimitResult) -> str:
+    """Retry-After响应头的值(向上取整的秒数,至少为1)"""
+    return str(max(1, math.ceil(result.retry_after)))
+
+
+# 全局限流器实例
+limiter = RateLimiter()
@@ -0,0 +1,56 @@
+"""Redis连接模块"""
+import time
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# 全局Redis客户端(惰性创建,进程内复用连接池)
+_client: Optional[aioredis.Redis] = None
+
+# Redis不可用时的熔断截止时间,期间直接走本地降级逻辑,避免每次请求都等待连接超时
+_unavailable_until: float = 0.0
+
+
+def get_redis() -> aioredis.Redis:
+    """获取Redis客户端
+
+    Returns:
+        Redis异步客户端
+    """
+    global _client
+    if _client is None:
+        _client = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def redis_available() -> bool:
+    """Redis当前是否可用(未处于熔断期)"""
+    return time.monotonic() >= _unavailable_until
+
+
+def mark_redis_unavailable(error: Exception) -> None:
+    """标记Redis不可用,在冷却期内跳过Redis调用
+
+    Args:
+        error: 导致失败的异常
+    """
+    global _unavailable_until
+    if redis_available():
+        logger.warning(f"Redis不可用,{settings.REDIS_RETRY_INTERVAL}秒内使用本地降级: {error}")
+    _unavailable_until = time.monotonic() + settings.REDIS_RETRY_INTERVAL
+
+
+async def close_redis() -> None:
+    """关闭Redis连接池"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,200 @@
+"""容错组件 - 重试策略与熔断器
+
+- RetryPolicy: 去相关抖动(decorrelated jitter)退避,优先遵循上游返回的 Retry-After
+- CircuitBreaker: 按接口熔断,连续失败达到阈值后快速失败,冷却后放行单个探测请求
+"""
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+from app.core.logging import logger
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 响应头
+
+    Args:
+        value: 响应头的值,可以是秒数或HTTP日期
+
+    Returns:
+        需要等待的秒数,无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """重试策略"""
+
+    def __init__(self, base_delay: float, max_delay: float):
+        """初始化重试策略
+
+        Args:
+            base_delay: 最小等待秒数
+            max_delay: 最大等待秒数
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, previous_delay: Optional[float] = None, retry_after: Optional[float] = None) -> float:
+        """计算下次重试前的等待秒数
+
+        去相关抖动: sleep = min(max_delay, random(base_delay, previous_delay * 3)),
+        与固定指数退避相比,多个客户端的重试时间更分散。
+
+        Args:
+            previous_delay: 上一次的等待秒数,首次重试时为None
+            retry_after: 上游通过 Retry-After 要求的等待秒数
+
+        Returns:
+            等待秒数
+        """
+        if retry_after is not None:
+            return retry_after
+        previous = previous_delay if previous_delay is not None else self.base_delay
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开,请求被快速拒绝"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} 暂时不可用(熔断中),请 {retry_in:.0f} 秒后重试")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """熔断器
+
+    - closed: 正常放行,记录连续失败次数
+    - open: 连续失败达到阈值后打开,冷却期内直接抛出 CircuitOpenError
+    - half_open: 冷却结束后只放行一个探测请求,成功则关闭,失败则重新打开
+
+    可作为异步上下文管理器使用,退出时根据异常自动记录结果。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+    ):
+        """初始化熔断器
+
+        Args:
+            name: 名称(接口标识),用于日志与错误信息
+            failure_threshold: 连续失败多少次后打开
+            recovery_timeout: 打开后多少秒进入半开状态
+            is_failure: 判断异常是否计为接口故障,默认所有异常都计入
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.is_failure = is_failure or (lambda e: True)
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        """请求前检查
+
+        Raises:
+            CircuitOpenError: 熔断器打开,或半开状态下已有探测请求在进行
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.OPEN:
+            raise CircuitOpenError(self.name, self._opened_at + self.recovery_timeout - time.monotonic())
+        if self._probe_in_flight:
+            raise CircuitOpenError(self.name, self.recovery_timeout)
+        self._probe_in_flight = True
+
+    def release(self) -> None:
+        """请求被取消时释放探测名额,不计入成功或失败"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info(f"熔断器 {self.name} 探测成功,恢复正常")
+        self.failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        half_open = self._probe_in_flight
+        self._probe_in_flight = False
+        self.failures += 1
+        if half_open or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            logger.warning(f"熔断器 {self.name} 打开: 连续失败 {self.failures} 次,{self.recovery_timeout} 秒后探测")
+
+    async def __aenter__(self) -> "CircuitBreaker":
+        self.before_call()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if isinstance(exc, asyncio.CancelledError):
+            self.release()
+        elif exc is None or not self.is_failure(exc):
+            # 非故障类错误(如参数错误)说明接口本身可用
+            self.record_success()
+        else:
+            self.record_failure()
+        return False
+
+
+# 按接口共享的熔断器(进程内)
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(
+    name: str,
+    failure_threshold: int,
+    recovery_timeout: float,
+    is_failure: Optional[Callable[[BaseException], bool]] = None,
+) -> CircuitBreaker:
+    """获取指定接口的熔断器,不存在时创建
+
+    Args:
+        name: 接口标识
+        failure_threshold: 连续失败阈值
+        recovery_timeout: 冷却秒数
+        is_failure: 故障判断函数
+
+    Returns:
+        熔断器
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, recovery_timeout, is_failure)
+    return breaker
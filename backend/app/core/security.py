@@ -1,17 +1,56 @@
 """安全模块 - JWT认证、密码哈希、数据加密"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 
 from cryptography.fernet import Fernet
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 import hashlib
 from app.core.config import settings
 
-# 密码哈希上下文
-# 使用 pbkdf2_sha256 避免 bcrypt 的 72 字节限制
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+T = TypeVar("T")
+
+# 密码哈希上下文(惰性创建,passlib 导入较慢,只有认证接口需要)
+_pwd_context = None
+
+
+def get_password_context():
+    """获取密码哈希上下文
+
+    使用 pbkdf2_sha256 避免 bcrypt 的 72 字节限制;
+    min_rounds/max_rounds 与默认轮数一致: 调整 PASSWORD_HASH_ROUNDS 后,旧哈希会在下次登录时自动重算。
+
+    Returns:
+        passlib CryptContext
+    """
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(
+            schemes=["pbkdf2_sha256"],
+            deprecated="auto",
+            pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+            pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+            pbkdf2_sha256__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+        )
+    return _pwd_context
+
+
+# 密码哈希专用线程池(惰性创建)
+# pbkdf2 计算期间会释放GIL,放到线程池中执行不会阻塞事件循环
+_hash_executor: Optional[ThreadPoolExecutor] = None
+# 已提交(执行中+排队)的哈希任务数,任务结束时在线程池线程中减少,读写需持有锁
+_pending_hash_jobs = 0
+_pending_hash_lock = threading.Lock()
+
+
+class PasswordHasherBusyError(Exception):
+    """密码哈希任务排队已满,请求被拒绝(负载保护)"""
+
 
 # Fernet加密实例(用于加密API Key和AppSecret)
 fernet = Fernet(settings.ENCRYPTION_KEY.encode())
@@ -27,7 +66,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         密码是否匹配
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -39,7 +78,94 @@ def get_password_hash(password: str) -> str:
     Returns:
         哈希后的密码
     """
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
+
+
+def _hash_job_done(_future: Optional[Future]) -> None:
+    """线程池任务结束(完成、出错或未开始即取消)时释放排队名额"""
+    global _pending_hash_jobs
+    with _pending_hash_lock:
+        _pending_hash_jobs -= 1
+
+
+async def _run_hash_job(func: Callable[..., T], *args) -> T:
+    """在密码哈希线程池中执行任务
+    
+    排队任务超过 PASSWORD_HASH_MAX_PENDING 时直接拒绝,
+    避免登录洪峰时请求无限堆积、延迟失控。
+    名额在线程池任务真正结束时释放: 请求被取消(如客户端断开)时线程仍在计算,仍然占用名额。
+    
+    Args:
+        func: 要执行的函数
+        *args: 函数参数
+        
+    Returns:
+        函数返回值
+        
+    Raises:
+        PasswordHasherBusyError: 排队已满时抛出
+    """
+    global _hash_executor, _pending_hash_jobs
+    
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash",
+        )
+    
+    with _pending_hash_lock:
+        if _pending_hash_jobs >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise PasswordHasherBusyError("密码校验服务繁忙,请稍后重试")
+        _pending_hash_jobs += 1
+    try:
+        future = _hash_executor.submit(func, *args)
+    except BaseException:
+        _hash_job_done(None)
+        raise
+    future.add_done_callback(_hash_job_done)
+    return await asyncio.wrap_future(future)
+
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+) -> tuple[bool, Optional[str]]:
+    """在线程池中验证密码,并在哈希参数过期时返回新哈希
+    
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希后的密码
+        
+    Returns:
+        (密码是否匹配, 需要更新时的新哈希,否则为None)
+        
+    Raises:
+        PasswordHasherBusyError: 排队已满时抛出
+    """
+    return await _run_hash_job(get_password_context().verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """在线程池中生成密码哈希
+    
+    Args:
+        password: 明文密码
+        
+    Returns:
+        哈希后的密码
+        
+    Raises:
+        PasswordHasherBusyError: 排队已满时抛出
+    """
+    return await _run_hash_job(get_password_context().hash, password)
+
+
+def shutdown_password_hasher() -> None:
+    """关闭密码哈希线程池"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+        _hash_executor = None
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
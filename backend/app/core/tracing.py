@@ -0,0 +1,199 @@
+"""链路追踪模块 - 轻量级分阶段耗时统计
+
+对外API与OpenTelemetry保持一致(get_tracer / start_as_current_span / set_attribute),
+默认是no-op实现,不产生任何开销。开启 TRACING_ENABLED 后:
+- 记录每个Span的耗时,供 ServerTimingMiddleware 写入 Server-Timing 响应头
+- 如果安装了 opentelemetry-api,同时创建对应的OTel Span,交由其SDK导出
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from app.core.config import settings
+
+
+@dataclass
+class StageTiming:
+    """单个阶段的耗时记录"""
+    name: str
+    duration_ms: float
+
+
+# 当前请求的阶段耗时收集器(由中间件在请求开始时设置)
+_stage_timings: ContextVar[Optional[list[StageTiming]]] = ContextVar("stage_timings", default=None)
+
+
+class NoOpSpan:
+    """空Span - 追踪关闭时使用"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+    def end(self) -> None:
+        pass
+
+
+_NOOP_SPAN = NoOpSpan()
+
+
+class Span(NoOpSpan):
+    """记录耗时的Span"""
+
+    def __init__(self, name: str, attributes: Optional[dict[str, Any]] = None, otel_span: Any = None):
+        self.name = name
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.start_time = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self._otel_span = otel_span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+        if self._otel_span is not None:
+            self._otel_span.set_attribute(key, value)
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.attributes["error"] = type(exception).__name__
+        if self._otel_span is not None:
+            self._otel_span.record_exception(exception)
+
+    def is_recording(self) -> bool:
+        return self.duration_ms is None
+
+    def end(self) -> None:
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self.start_time) * 1000
+        timings = _stage_timings.get()
+        if timings is not None:
+            timings.append(StageTiming(self.name, self.duration_ms))
+
+
+class Tracer:
+    """追踪器 - 与 opentelemetry.trace.Tracer 的常用接口兼容"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._otel_tracer: Any = None
+        self._otel_resolved = False
+
+    def _get_otel_tracer(self) -> Any:
+        """惰性获取OpenTelemetry追踪器,未安装时返回None"""
+        if not self._otel_resolved:
+            self._otel_resolved = True
+            try:
+                from opentelemetry import trace as otel_trace
+                self._otel_tracer = otel_trace.get_tracer(self.name)
+            except ImportError:
+                self._otel_tracer = None
+        return self._otel_tracer
+
+    @contextmanager
+    def start_as_current_span(
+        self,
+        name: str,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> Iterator[NoOpSpan]:
+        """开始一个Span并在退出上下文时结束
+
+        Args:
+            name: Span名称,建议使用 "组件.阶段" 格式
+            attributes: 初始属性
+
+        Yields:
+            Span对象(追踪关闭时为NoOpSpan)
+        """
+        if not settings.TRACING_ENABLED:
+            yield _NOOP_SPAN
+            return
+
+        otel_tracer = self._get_otel_tracer()
+        otel_cm = (
+            otel_tracer.start_as_current_span(name, attributes=attributes)
+            if otel_tracer is not None
+            else nullcontext()
+        )
+
+        with otel_cm as otel_span:
+            span = Span(name, attributes, otel_span)
+            try:
+                yield span
+            except BaseException as e:
+                span.record_exception(e)
+                raise
+            finally:
+                span.end()
+
+
+_tracers: dict[str, Tracer] = {}
+
+
+def get_tracer(name: str) -> Tracer:
+    """获取指定名称的追踪器(同名复用)
+
+    Args:
+        name: 追踪器名称,通常为模块名 __name__
+
+    Returns:
+        追踪器实例
+    """
+    tracer = _tracers.get(name)
+    if tracer is None:
+        tracer = _tracers[name] = Tracer(name)
+    return tracer
+
+
+def start_stage_collection() -> tuple[list[StageTiming], Any]:
+    """为当前上下文开启阶段耗时收集
+
+    Returns:
+        (耗时列表, 用于恢复上下文的token)
+    """
+    timings: list[StageTiming] = []
+    token = _stage_timings.set(timings)
+    return timings, token
+
+
+def stop_stage_collection(token: Any) -> None:
+    """结束阶段耗时收集,恢复之前的上下文"""
+    _stage_timings.reset(token)
+
+
+def get_stage_timings() -> list[StageTiming]:
+    """获取当前上下文已记录的阶段耗时"""
+    return list(_stage_timings.get() or [])
+
+
+def format_server_timing(timings: list[StageTiming]) -> str:
+    """格式化为 Server-Timing 响应头的值
+
+    同名阶段(如多次LLM重试)追加序号以便区分。
+
+    Args:
+        timings: 阶段耗时列表
+
+    Returns:
+        形如 "llm.attempt;dur=1234.5, markdown.to_html;dur=3.2" 的字符串
+    """
+    seen: dict[str, int] = {}
+    parts = []
+    for timing in timings:
+        count = seen.get(timing.name, 0)
+        seen[timing.name] = count + 1
+        name = timing.name if count == 0 else f"{timing.name}.{count + 1}"
+        parts.append(f"{name};dur={timing.duration_ms:.1f}")
+    return ", ".join(parts)
@@ -1,26 +1,78 @@
 """FastAPI应用入口"""
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.v1 import api_keys, article, auth, health, styles, users, wechat
+from app.api.v1 import admin, api_keys, article, auth, health, styles, tasks, users, wechat
 from app.core.config import settings
-from app.core.db import create_db_and_tables
+from app.core.db import async_session_maker, create_db_and_tables, engine
 from app.core.logging import logger
+from app.core.redis import close_redis
+from app.core.security import PasswordHasherBusyError, shutdown_password_hasher
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.services.article_search import ArticleSearchService
+from app.services.article_status import ArticleStatusService
+from app.services.blob_sweeper import blob_sweeper
+from app.services.health_monitor import health_monitor
+from app.services.llm_gateway import llm_gateway
+from app.services.prompt_similarity import PromptSimilarityService
+from app.services.style_cache import StyleCache
+from app.services.sync_retry_worker import sync_retry_worker
+from app.services.sync_scheduler import sync_scheduler
+from app.services.task_progress import progress_broker
+from app.services.warmup import warm_up
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:  # pragma: no cover - 取决于部署环境
+    DefaultJSONResponse = JSONResponse
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理
     
-    在应用启动时创建数据库表
+    在应用启动时创建数据库表,预加载系统样式并预热惰性加载的依赖
     """
     logger.info("应用启动中...")
     await create_db_and_tables()
+    async with engine.begin() as conn:
+        # 搜索后端按进程记录,每个worker都需要执行
+        await ArticleSearchService.setup(conn)
+        await ArticleStatusService.setup(conn)
     logger.info("数据库表已创建/验证")
+    async with async_session_maker() as session:
+        count = await StyleCache.preload_system_styles(session)
+    logger.info(f"已预加载 {count} 个系统样式")
+    if settings.STARTUP_WARMUP:
+        warm_up()
+    if settings.PROMPT_SIMILARITY_ENABLED:
+        await PromptSimilarityService.backfill()
+    if settings.SYNC_RETRY_ENABLED:
+        sync_retry_worker.start()
+    if settings.SCHEDULED_SYNC_ENABLED:
+        sync_scheduler.start()
+    if settings.ARTICLE_BLOB_SWEEP_INTERVAL > 0:
+        blob_sweeper.start()
+    # 首轮检查完成后才标记为就绪
+    await health_monitor.check_once()
+    health_monitor.accepting = True
+    health_monitor.start()
     yield
     logger.info("应用关闭中...")
+    # 先标记为未就绪,负载均衡在关闭期间不再转发新请求
+    await health_monitor.stop()
+    await sync_retry_worker.stop()
+    await sync_scheduler.stop()
+    await blob_sweeper.stop()
+    await progress_broker.stop()
+    await llm_gateway.close()
+    await close_redis()
+    shutdown_password_hasher()
 
 
 # 创建FastAPI应用
@@ -29,6 +81,8 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="微信公众号文章智能生成与同步系统 - 后端API",
     lifespan=lifespan,
+    # orjson序列化大文本字段(content_raw/content_html)明显快于标准库json
+    default_response_class=DefaultJSONResponse,
 )
 
 # 配置CORS
@@ -38,8 +92,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag", "X-Reused-Article"],
 )
 
+# 响应压缩(位于Server-Timing内层,压缩耗时计入total)
+app.add_middleware(CompressionMiddleware)
+
+# 分阶段耗时(Server-Timing)
+app.add_middleware(ServerTimingMiddleware)
+
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError) -> JSONResponse:
+    """密码哈希排队已满时返回503,提示客户端稍后重试"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
 # 注册路由
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
@@ -47,7 +119,9 @@ app.include_router(api_keys.router, prefix="/api/v1")
 app.include_router(wechat.router, prefix="/api/v1")
 app.include_router(styles.router, prefix="/api/v1")
 app.include_router(article.router, prefix="/api/v1")
+app.include_router(tasks.router, prefix="/api/v1")
 app.include_router(health.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -0,0 +1,47 @@
+"""Server-Timing中间件 - 将请求内各阶段耗时写入响应头"""
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.tracing import (
+    StageTiming,
+    format_server_timing,
+    start_stage_collection,
+    stop_stage_collection,
+)
+
+
+class ServerTimingMiddleware:
+    """Server-Timing中间件
+
+    使用纯ASGI实现(而非BaseHTTPMiddleware),保证端点与中间件处于同一上下文,
+    端点内记录的Span耗时可以直接被收集。追踪关闭时直接透传请求。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_stage_collection()
+        start_time = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start_time) * 1000
+                header_value = format_server_timing(timings + [StageTiming("total", total_ms)])
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", header_value)
+                logger.debug(f"{scope['method']} {scope['path']} Server-Timing: {header_value}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_stage_collection(token)
@@ -1,9 +1,15 @@
 """数据库模型"""
 from app.models.user import User
 from app.models.style import Style
-from app.models.article import Article
+from app.models.article import Article, ArticleStatus
+from app.models.article_status_count import ArticleStatusCount
 from app.models.task import Task
 from app.models.wechat_config import WechatConfig
 from app.models.user_api_key import UserApiKey
+from app.models.prompt_signature import PromptBucket, PromptSignature
+from app.models.usage_daily import UsageDaily
 
-__all__ = ["User", "Style", "Article", "Task", "WechatConfig", "UserApiKey"]
+__all__ = [
+    "User", "Style", "Article", "ArticleStatus", "ArticleStatusCount", "Task", "WechatConfig", "UserApiKey",
+    "PromptSignature", "PromptBucket", "UsageDaily",
+]
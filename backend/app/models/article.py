@@ -1,14 +1,44 @@
 """文章模型"""
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 
+from sqlalchemy import Column, Index, LargeBinary, text
+from sqlalchemy import Enum as SAEnum
 from sqlmodel import Field, SQLModel
 
 
+class ArticleStatus(str, Enum):
+    """文章状态(状态转换见 ArticleStatusService)"""
+    GENERATING = "generating"  # 生成中
+    GENERATED = "generated"  # 已生成,未同步
+    GENERATION_FAILED = "generation_failed"  # 生成失败(终态)
+    SYNCING = "syncing"  # 同步中(next_attempt_at 为租约到期时间)
+    SYNCED = "synced"  # 已同步
+    SYNC_FAILED = "sync_failed"  # 同步失败(next_attempt_at 不为空时等待自动重试)
+
+
+# 仍有后续处理的状态(生成/同步进行中或等待重试),部分索引只收录这些行
+PENDING_STATUSES = (ArticleStatus.GENERATING, ArticleStatus.SYNCING, ArticleStatus.SYNC_FAILED)
+
+_PENDING_CONDITION = text(
+    "status IN (" + ", ".join(f"'{s.value}'" for s in PENDING_STATUSES) + ")"
+)
+
+
 class Article(SQLModel, table=True):
     """文章表"""
     
     __tablename__ = "articles"
+    __table_args__ = (
+        Index(
+            "ix_articles_user_status_pending",
+            "user_id",
+            "status",
+            postgresql_where=_PENDING_CONDITION,
+            sqlite_where=_PENDING_CONDITION,
+        ),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True, description="用户ID")
@@ -17,13 +47,30 @@ class Article(SQLModel, table=True):
     title: str = Field(max_length=200, description="文章标题")
     prompt_input: str = Field(description="用户输入的原始Prompt")
     content_raw: str = Field(description="LLM生成的原始Markdown")
-    content_html: str = Field(description="渲染后的HTML")
+    content_html: str = Field(description="渲染后的HTML(紧凑存储模式下为空)")
+    
+    # 紧凑存储(ARTICLE_COMPACT_STORAGE)
+    content_body: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary), description="压缩后的HTML")
+    content_blob: Optional[str] = Field(default=None, max_length=64, description="Blob存储中的内容摘要(大正文)")
+    content_codec: Optional[str] = Field(default=None, max_length=10, description="压缩算法: zstd/zlib,为空表示HTML存于content_html")
+    shell_omitted: bool = Field(default=False, description="是否只保存正文,读取时按样式重新包装")
+    style_version: Optional[int] = Field(default=None, description="渲染时的样式版本号")
     
     # 同步状态
-    status: str = Field(
-        default="draft",
-        max_length=20,
-        description="状态: draft/synced/failed"
+    status: ArticleStatus = Field(
+        default=ArticleStatus.GENERATING,
+        # 以字符串存储(不使用数据库原生枚举类型),新增状态无需修改列类型
+        sa_column=Column(
+            SAEnum(
+                ArticleStatus,
+                native_enum=False,
+                length=20,
+                values_callable=lambda statuses: [s.value for s in statuses],
+            ),
+            nullable=False,
+            default=ArticleStatus.GENERATING,
+        ),
+        description="状态: generating/generated/generation_failed/syncing/synced/sync_failed",
     )
     wechat_media_id: Optional[str] = Field(default=None, max_length=100, description="微信草稿ID")
     
@@ -31,6 +78,8 @@ class Article(SQLModel, table=True):
     generation_error: Optional[str] = Field(default=None, description="生成失败的错误信息")
     sync_error_message: Optional[str] = Field(default=None, description="同步失败的错误信息")
     retry_count: int = Field(default=0, description="同步重试次数")
+    next_attempt_at: Optional[datetime] = Field(default=None, index=True, description="下次自动重试同步的时间")
+    scheduled_at: Optional[datetime] = Field(default=None, index=True, description="定时同步时间(UTC)")
     
     # 时间戳
     created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
@@ -42,7 +91,7 @@ class Article(SQLModel, table=True):
             "example": {
                 "title": "如何提高工作效率",
                 "prompt_input": "写一篇关于提高工作效率的文章",
-                "status": "draft",
+                "status": "generated",
                 "retry_count": 0,
             }
         }
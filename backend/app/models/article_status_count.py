@@ -0,0 +1,12 @@
+"""文章状态计数模型 - 按用户、按状态维护的文章数量"""
+from sqlmodel import Field, SQLModel
+
+
+class ArticleStatusCount(SQLModel, table=True):
+    """文章状态计数表(每个用户每种状态一行,随状态转换增量更新)"""
+
+    __tablename__ = "article_status_counts"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True, description="用户ID")
+    status: str = Field(max_length=20, primary_key=True, description="文章状态")
+    count: int = Field(default=0, description="文章数量")
@@ -0,0 +1,35 @@
+"""Prompt签名模型 - 用于检测近似重复的生成请求"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer, LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+class PromptSignature(SQLModel, table=True):
+    """Prompt的MinHash签名(每篇文章一行)"""
+    
+    __tablename__ = "prompt_signatures"
+    
+    article_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True),
+        description="文章ID",
+    )
+    user_id: int = Field(foreign_key="users.id", description="用户ID")
+    signature: bytes = Field(sa_column=Column(LargeBinary, nullable=False), description="MinHash签名(64×4字节)")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
+
+
+class PromptBucket(SQLModel, table=True):
+    """LSH分桶(每篇文章 LSH_BANDS 行),签名某一段相同的文章落入同一个桶"""
+    
+    __tablename__ = "prompt_buckets"
+    __table_args__ = (Index("ix_prompt_buckets_user_bucket", "user_id", "bucket"),)
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(description="用户ID")
+    bucket: int = Field(sa_column=Column(BigInteger, nullable=False), description="分桶键")
+    article_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False, index=True),
+        description="文章ID",
+    )
@@ -15,6 +15,7 @@ class Style(SQLModel, table=True):
     description: Optional[str] = Field(default=None, max_length=500, description="样式描述")
     prompt_instruction: str = Field(description="LLM风格指令")
     css_content: str = Field(description="HTML渲染样式")
+    model: Optional[str] = Field(default=None, max_length=100, description="生成使用的LLM模型,为空时使用默认模型")
     
     # 样式归属
     is_system: bool = Field(default=False, description="是否系统预设样式")
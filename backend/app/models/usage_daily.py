@@ -0,0 +1,38 @@
+"""用量日汇总模型 - 按用户、按天预聚合的生成/同步计数与LLM用量"""
+from datetime import date
+
+from sqlalchemy import BigInteger, Column
+from sqlmodel import Field, SQLModel
+
+
+class UsageDaily(SQLModel, table=True):
+    """用量日汇总表(每个用户每天一行,由生成与同步流程增量更新)"""
+
+    __tablename__ = "usage_daily"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True, description="用户ID")
+    day: date = Field(primary_key=True, index=True, description="日期(UTC)")
+
+    # 文章计数
+    articles_generated: int = Field(default=0, description="生成成功的文章数")
+    generation_failed: int = Field(default=0, description="生成失败次数")
+    articles_synced: int = Field(default=0, description="同步成功次数")
+    sync_failed: int = Field(default=0, description="同步失败次数")
+
+    # LLM用量
+    llm_calls: int = Field(default=0, description="LLM调用次数")
+    prompt_tokens: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0), description="输入Token数")
+    completion_tokens: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0), description="输出Token数")
+    cached_tokens: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0), description="命中前缀缓存的输入Token数")
+
+    # 生成耗时直方图(成功生成的文章,按耗时上限分桶计数),用于估算分位数
+    latency_total_ms: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0), description="生成总耗时(毫秒)")
+    latency_le_1s: int = Field(default=0, description="耗时≤1秒")
+    latency_le_2s: int = Field(default=0, description="耗时≤2秒")
+    latency_le_5s: int = Field(default=0, description="耗时≤5秒")
+    latency_le_10s: int = Field(default=0, description="耗时≤10秒")
+    latency_le_20s: int = Field(default=0, description="耗时≤20秒")
+    latency_le_30s: int = Field(default=0, description="耗时≤30秒")
+    latency_le_60s: int = Field(default=0, description="耗时≤60秒")
+    latency_le_120s: int = Field(default=0, description="耗时≤120秒")
+    latency_gt_120s: int = Field(default=0, description="耗时>120秒")
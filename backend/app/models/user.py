@@ -15,6 +15,7 @@ class User(SQLModel, table=True):
     email: Optional[str] = Field(default=None, max_length=100, description="邮箱")
     password_hash: str = Field(description="密码哈希")
     is_active: bool = Field(default=True, description="账号是否激活")
+    is_admin: bool = Field(default=False, description="是否管理员(可查看全站用量统计)")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="更新时间")
     
@@ -1,14 +1,40 @@
 """文章相关的Pydantic模型"""
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
+from app.models.article import ArticleStatus
+
 
 class ArticleCreate(BaseModel):
     """文章创建模型"""
     style_id: int = Field(..., description="使用的样式ID")
     prompt_input: str = Field(..., min_length=1, description="用户输入的原始Prompt")
+    target_length: Optional[int] = Field(None, ge=100, le=10000, description="目标字数,为空时由模型决定")
+    generation_mode: Literal["single", "sectioned"] = Field(
+        "single", description="生成模式: single 一次生成全文, sectioned 先生成大纲再并发生成各小节(适合长文)"
+    )
+    reuse_existing: bool = Field(
+        False, description="存在使用同一样式、Prompt近似的已生成文章时直接返回该文章,不再调用LLM"
+    )
+
+
+class ArticleSimilarQuery(BaseModel):
+    """相似文章查询模型"""
+    prompt_input: str = Field(..., min_length=1, description="准备提交的Prompt")
+    style_id: Optional[int] = Field(None, description="只查找使用该样式的文章")
+
+
+class SimilarArticle(BaseModel):
+    """Prompt近似的已生成文章"""
+    id: int
+    title: str
+    prompt_input: str
+    style_id: int
+    status: ArticleStatus
+    created_at: datetime
+    similarity: float = Field(..., description="Prompt相似度估计(0~1)")
 
 
 class ArticleUpdate(BaseModel):
@@ -17,6 +43,24 @@ class ArticleUpdate(BaseModel):
     content_html: Optional[str] = Field(None, description="编辑后的HTML内容")
 
 
+class ArticleSchedule(BaseModel):
+    """文章定时同步模型"""
+    scheduled_at: datetime = Field(..., description="定时同步时间,不带时区时按UTC处理")
+
+
+class MarkdownSplice(BaseModel):
+    """Markdown文本替换补丁: 把原文 [start, end) 替换为 text"""
+    start: int = Field(..., ge=0, description="起始偏移(字符)")
+    end: int = Field(..., ge=0, description="结束偏移(字符,不含)")
+    text: str = Field("", description="替换后的文本")
+
+
+class ArticleMarkdownPatch(BaseModel):
+    """文章Markdown增量编辑模型"""
+    patches: list[MarkdownSplice] = Field(..., min_length=1, max_length=500, description="补丁列表,偏移均基于编辑前的原文")
+    base_hash: Optional[str] = Field(None, description="编辑前 content_raw 的SHA-256,不一致时拒绝编辑")
+
+
 class ArticleResponse(BaseModel):
     """文章响应模型"""
     id: int
@@ -26,11 +70,13 @@ class ArticleResponse(BaseModel):
     prompt_input: str
     content_raw: str
     content_html: str
-    status: str
+    status: ArticleStatus
     wechat_media_id: Optional[str]
     generation_error: Optional[str]
     sync_error_message: Optional[str]
     retry_count: int
+    next_attempt_at: Optional[datetime] = None
+    scheduled_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     synced_at: Optional[datetime]
@@ -43,9 +89,51 @@ class ArticleListResponse(BaseModel):
     """文章列表响应模型"""
     id: int
     title: str
-    status: str
+    status: ArticleStatus
+    scheduled_at: Optional[datetime] = None
     created_at: datetime
     synced_at: Optional[datetime]
     
     class Config:
         from_attributes = True
+
+
+class ArticleImportItem(BaseModel):
+    """文章导入模型(NDJSON中的一行,导出文件中的其他字段会被忽略)"""
+    title: str = Field(..., min_length=1, max_length=200, description="文章标题")
+    style_id: int = Field(..., description="样式ID,需为系统样式或自己的样式")
+    prompt_input: str = Field("", description="原始Prompt")
+    content_raw: str = Field(..., description="Markdown内容")
+    content_html: Optional[str] = Field(None, description="HTML内容,为空时按样式渲染Markdown")
+    created_at: Optional[datetime] = Field(None, description="创建时间,为空时使用导入时间")
+
+
+class ArticleImportError(BaseModel):
+    """导入失败的行"""
+    line: int
+    error: str
+
+
+class ArticleImportResult(BaseModel):
+    """文章导入结果"""
+    imported: int = Field(..., description="导入成功的文章数")
+    failed: int = Field(..., description="导入失败的行数")
+    errors: list[ArticleImportError] = Field(default_factory=list, description="失败详情(最多返回前100条)")
+
+
+class ArticleSearchHit(BaseModel):
+    """文章搜索结果"""
+    id: int
+    title: str
+    status: ArticleStatus
+    created_at: datetime
+    updated_at: datetime
+    rank: float = Field(..., description="相关度,越大越相关")
+    title_highlight: str = Field(..., description="标题(HTML转义,关键词以<mark>标出)")
+    snippet: str = Field(..., description="正文中命中关键词附近的摘要(HTML转义,关键词以<mark>标出)")
+
+
+class ArticleSearchPage(BaseModel):
+    """文章搜索结果页"""
+    items: list[ArticleSearchHit]
+    next_cursor: Optional[str] = Field(None, description="下一页游标,为空表示没有更多结果")
@@ -11,6 +11,7 @@ class StyleBase(BaseModel):
     description: Optional[str] = Field(None, max_length=500, description="样式描述")
     prompt_instruction: str = Field(..., min_length=1, description="LLM风格指令")
     css_content: str = Field(..., min_length=1, description="HTML渲染样式")
+    model: Optional[str] = Field(None, max_length=100, description="生成使用的LLM模型,为空时使用默认模型")
 
 
 class StyleCreate(StyleBase):
@@ -24,6 +25,7 @@ class StyleUpdate(BaseModel):
     description: Optional[str] = Field(None, max_length=500, description="样式描述")
     prompt_instruction: Optional[str] = Field(None, min_length=1, description="LLM风格指令")
     css_content: Optional[str] = Field(None, min_length=1, description="HTML渲染样式")
+    model: Optional[str] = Field(None, max_length=100, description="生成使用的LLM模型")
     preview_image: Optional[str] = Field(None, max_length=500, description="样式预览图路径")
 
 
@@ -0,0 +1,52 @@
+"""用量统计相关的Pydantic模型"""
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class UsageTotals(BaseModel):
+    """一段时间内的用量合计"""
+    articles_generated: int = 0
+    generation_failed: int = 0
+    articles_synced: int = 0
+    sync_failed: int = 0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_avg_ms: Optional[float] = Field(None, description="平均生成耗时(毫秒)")
+    latency_p50_ms: Optional[float] = Field(None, description="生成耗时中位数(由直方图估算)")
+    latency_p95_ms: Optional[float] = Field(None, description="生成耗时p95(由直方图估算)")
+    latency_p99_ms: Optional[float] = Field(None, description="生成耗时p99(由直方图估算)")
+
+
+class UsageDay(UsageTotals):
+    """单日用量"""
+    day: date
+
+
+class UsageReport(BaseModel):
+    """用量报表"""
+    start: date
+    end: date
+    user_id: Optional[int] = Field(None, description="为空时为全部用户合计")
+    totals: UsageTotals
+    days: list[UsageDay] = Field(description="有用量的日期,按日期升序")
+
+
+class UserUsage(UsageTotals):
+    """单个用户在时间范围内的用量"""
+    user_id: int
+    username: str
+
+
+class PromptCacheReport(BaseModel):
+    """Prompt前缀缓存命中统计(当前进程自启动以来)"""
+    calls: int
+    hit_calls: int = Field(description="至少命中部分缓存的调用数")
+    prompt_tokens: int
+    cached_tokens: int
+    cached_ratio: float = Field(description="缓存Token占输入Token的比例")
+    avg_hit_latency_ms: Optional[float] = Field(None, description="命中缓存时的平均耗时(毫秒)")
+    avg_miss_latency_ms: Optional[float] = Field(None, description="未命中缓存时的平均耗时(毫秒)")
@@ -27,6 +27,7 @@ class UserResponse(UserBase):
     id: int
     email: Optional[str]
     is_active: bool
+    is_admin: bool = False
     created_at: datetime
     
     class Config:
@@ -0,0 +1,67 @@
+"""生产环境服务入口 - 多worker运行uvicorn
+
+用法: python -m app.server
+
+- 安装了 uvloop / httptools(uvicorn[standard])时使用它们作为事件循环与HTTP解析器
+- worker数、连接上限、keep-alive与优雅关闭时长由 SERVER_* 配置决定
+- 收到SIGTERM后停止接收新连接,等待进行中的请求完成(最长 SERVER_GRACEFUL_TIMEOUT 秒),
+  再执行lifespan关闭流程(标记未就绪、停止后台任务、关闭连接池)
+
+开发环境请使用 python -m app.main(单进程,DEBUG时自动重载)。
+"""
+import asyncio
+import importlib.util
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+async def _prepare_database() -> None:
+    """在启动worker前建表并执行升级步骤,避免多个worker同时执行create_all产生冲突"""
+    import app.models  # noqa: F401  注册全部表
+    from app.core.db import create_db_and_tables, engine
+    from app.services.article_search import ArticleSearchService
+    from app.services.article_status import ArticleStatusService
+
+    await create_db_and_tables()
+    async with engine.begin() as conn:
+        await ArticleSearchService.setup(conn)
+        await ArticleStatusService.setup(conn)
+    await engine.dispose()
+
+
+def main() -> None:
+    """启动生产服务"""
+    workers = settings.get_worker_count()
+    loop = "uvloop" if _installed("uvloop") else "asyncio"
+    http = "httptools" if _installed("httptools") else "h11"
+
+    if workers > 1:
+        asyncio.run(_prepare_database())
+
+    logger.info(
+        f"启动服务: workers={workers}, loop={loop}, http={http}, "
+        f"limit_concurrency={settings.SERVER_LIMIT_CONCURRENCY}"
+    )
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=settings.BACKEND_PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+    )
+
+
+if __name__ == "__main__":
+    main()
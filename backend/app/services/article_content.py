@@ -0,0 +1,122 @@
+"""文章内容存储服务 - 紧凑存储模式下的HTML压缩、外部存储与还原"""
+import asyncio
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.article import Article
+from app.models.style import Style
+from app.services.blob_store import blob_store
+from app.services.style_cache import StyleCache
+from app.services.style_service import StyleService
+from app.utils.compression import compress, decompress
+
+
+class ArticleContentService:
+    """文章内容存储服务类
+
+    启用 ARTICLE_COMPACT_STORAGE 后:
+    - 渲染结果只保存正文(不含 <style> 外壳),读取时按 style_id/style_version 重新包装
+    - 正文压缩后存入 content_body,压缩后超过 ARTICLE_BLOB_THRESHOLD 的存入Blob存储
+    - content_html 列留空;content_raw 仍原样保存,搜索与导出不受影响
+
+    未启用时行为与原来一致。已有的行(content_codec 为空)始终按原样读取。
+    """
+
+    @staticmethod
+    async def set_rendered(article: Article, body_html: str, style: Style) -> None:
+        """保存渲染结果
+
+        Args:
+            article: 文章对象
+            body_html: 正文HTML(不含样式外壳)
+            style: 渲染使用的样式
+        """
+        if not settings.ARTICLE_COMPACT_STORAGE:
+            ArticleContentService._store_inline(article, StyleService.wrap_html(body_html, style.css_content))
+            return
+        await ArticleContentService._store_compact(article, body_html, shell_omitted=True)
+        article.style_version = style.version
+
+    @staticmethod
+    async def set_document(article: Article, html: str) -> None:
+        """保存完整HTML文档(如用户直接编辑的HTML)
+
+        Args:
+            article: 文章对象
+            html: 完整HTML
+        """
+        if not settings.ARTICLE_COMPACT_STORAGE:
+            ArticleContentService._store_inline(article, html)
+            return
+        await ArticleContentService._store_compact(article, html, shell_omitted=False)
+
+    @staticmethod
+    def _store_inline(article: Article, html: str) -> None:
+        article.content_html = html
+        article.content_body = None
+        article.content_blob = None
+        article.content_codec = None
+        article.shell_omitted = False
+
+    @staticmethod
+    async def _store_compact(article: Article, html: str, shell_omitted: bool) -> None:
+        data, codec = compress(html.encode("utf-8"), settings.ARTICLE_COMPRESSION_LEVEL)
+        if len(data) >= settings.ARTICLE_BLOB_THRESHOLD:
+            article.content_blob = await asyncio.to_thread(blob_store.put, data)
+            article.content_body = None
+        else:
+            article.content_body = data
+            article.content_blob = None
+        article.content_codec = codec
+        article.content_html = ""
+        article.shell_omitted = shell_omitted
+
+    @staticmethod
+    async def get_html(session: AsyncSession, article: Article) -> str:
+        """读取文章的完整HTML
+
+        Args:
+            session: 数据库会话
+            article: 文章对象
+
+        Returns:
+            完整HTML
+        """
+        if article.content_codec is None:
+            return article.content_html
+
+        if article.content_blob is not None:
+            data = await asyncio.to_thread(blob_store.get, article.content_blob)
+        else:
+            data = article.content_body or b""
+        html = decompress(data, article.content_codec).decode("utf-8")
+        if not article.shell_omitted:
+            return html
+
+        style: Optional[Style] = None
+        if article.style_version is not None:
+            style = await StyleCache.get_style_version(session, article.style_id, article.style_version)
+        if style is None:
+            # 只保留样式的当前版本,样式更新后使用最新CSS
+            logger.debug(f"样式版本已更新,使用当前样式渲染: article_id={article.id}")
+            style = await StyleCache.get_style(session, article.style_id)
+        return StyleService.wrap_html(html, style.css_content if style else "")
+
+    @staticmethod
+    async def hydrate(session: AsyncSession, article: Article) -> Article:
+        """为响应填充 content_html,不标记为修改(不会写回数据库)
+
+        Args:
+            session: 数据库会话
+            article: 文章对象
+
+        Returns:
+            同一文章对象
+        """
+        if article.content_codec is not None:
+            set_committed_value(article, "content_html", await ArticleContentService.get_html(session, article))
+        return article
@@ -0,0 +1,357 @@
+"""文章全文搜索服务
+
+- PostgreSQL: articles.search_vector 生成列(标题权重A、正文权重B)+ GIN索引;
+  已安装zhparser时使用其 chinese 配置分词,否则使用 simple 配置,并借助 pg_trgm 的
+  GIN三元组索引加速中文子串匹配(ILIKE)
+- SQLite: FTS5外部内容表 article_search(trigram分词,支持中文子串),由触发器与 articles 同步;
+  FTS5不可用时退化为LIKE扫描
+
+搜索结果按相关度排序,使用 (相关度, ID) 游标分页;高亮在Python中完成,各数据库结果一致。
+"""
+import base64
+import html
+import json
+import re
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.article import Article
+from app.schemas.article import ArticleSearchHit, ArticleSearchPage
+
+# 单次查询最多使用的关键词数
+_MAX_TERMS = 8
+
+# trigram分词只能匹配不少于3个字符的关键词,更短的关键词使用LIKE
+_TRIGRAM_MIN_CHARS = 3
+
+# 摘要长度(字符)
+_SNIPPET_CHARS = 120
+
+# 文本检索配置名只允许标识符(会拼接进DDL)
+_CONFIG_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def encode_cursor(rank: float, article_id: int) -> str:
+    """编码分页游标"""
+    return base64.urlsafe_b64encode(json.dumps([rank, article_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """解码分页游标
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        rank, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(article_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("无效的分页游标") from e
+
+
+def split_terms(query: str) -> list[str]:
+    """按空白切分关键词,去重并保持顺序"""
+    terms: list[str] = []
+    for term in query.split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:_MAX_TERMS]
+
+
+class ArticleSearchService:
+    """文章全文搜索服务类"""
+
+    # 当前数据库使用的实现: postgresql / fts5 / like,为空表示尚未初始化
+    _backend: Optional[str] = None
+    _ts_config: str = "simple"
+    _trigram: bool = False
+
+    @classmethod
+    async def setup(cls, conn: AsyncConnection) -> None:
+        """创建搜索所需的列、索引或FTS表(幂等)
+
+        Args:
+            conn: 数据库连接(事务中)
+        """
+        if conn.dialect.name == "postgresql":
+            await cls._setup_postgresql(conn)
+        elif conn.dialect.name == "sqlite":
+            await cls._setup_sqlite(conn)
+        else:
+            cls._backend = "like"
+        logger.info(f"文章搜索: backend={cls._backend}, ts_config={cls._ts_config}, trigram={cls._trigram}")
+
+    @classmethod
+    async def _setup_postgresql(cls, conn: AsyncConnection) -> None:
+        # pg_trgm需要建扩展权限,失败时只回滚保存点
+        try:
+            async with conn.begin_nested():
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except DBAPIError as e:
+            logger.warning(f"无法启用pg_trgm,中文子串搜索将不使用索引: {e}")
+        result = await conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+        cls._trigram = result.first() is not None
+
+        config = settings.ARTICLE_SEARCH_TS_CONFIG
+        if config is None:
+            result = await conn.execute(text("SELECT 1 FROM pg_ts_config WHERE cfgname = 'chinese'"))
+            config = "chinese" if result.first() is not None else "simple"
+        if not _CONFIG_NAME.match(config):
+            raise ValueError(f"无效的文本检索配置: {config}")
+        cls._ts_config = config
+
+        # 生成列的分词配置记录在列注释中,配置变化时重建
+        result = await conn.execute(text(
+            "SELECT col_description('articles'::regclass, attnum) FROM pg_attribute "
+            "WHERE attrelid = 'articles'::regclass AND attname = 'search_vector' AND NOT attisdropped"
+        ))
+        row = result.first()
+        if row is not None and row[0] != config:
+            logger.info(f"文本检索配置变化({row[0]} -> {config}),重建 search_vector")
+            await conn.execute(text("ALTER TABLE articles DROP COLUMN search_vector"))
+            row = None
+        if row is None:
+            await conn.execute(text(
+                "ALTER TABLE articles ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+                f"setweight(to_tsvector('{config}', coalesce(title, '')), 'A') || "
+                f"setweight(to_tsvector('{config}', coalesce(content_raw, '')), 'B')) STORED"
+            ))
+            await conn.execute(text(f"COMMENT ON COLUMN articles.search_vector IS '{config}'"))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_articles_search_vector ON articles USING gin (search_vector)"
+        ))
+        if cls._trigram:
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_articles_title_trgm ON articles USING gin (title gin_trgm_ops)"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_articles_content_trgm ON articles USING gin (content_raw gin_trgm_ops)"
+            ))
+        cls._backend = "postgresql"
+
+    @classmethod
+    async def _setup_sqlite(cls, conn: AsyncConnection) -> None:
+        result = await conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_search'"
+        ))
+        exists = result.first() is not None
+        if not exists:
+            try:
+                await conn.execute(text(
+                    "CREATE VIRTUAL TABLE article_search USING fts5("
+                    "title, content_raw, content='articles', content_rowid='id', tokenize='trigram')"
+                ))
+            except DBAPIError as e:
+                # SQLite未编译FTS5或版本低于3.34(无trigram分词)
+                logger.warning(f"FTS5不可用,文章搜索使用LIKE扫描: {e}")
+                cls._backend = "like"
+                return
+
+        for statement in (
+            "CREATE TRIGGER IF NOT EXISTS articles_search_insert AFTER INSERT ON articles BEGIN "
+            "INSERT INTO article_search(rowid, title, content_raw) VALUES (new.id, new.title, new.content_raw); END",
+            "CREATE TRIGGER IF NOT EXISTS articles_search_delete AFTER DELETE ON articles BEGIN "
+            "INSERT INTO article_search(article_search, rowid, title, content_raw) "
+            "VALUES ('delete', old.id, old.title, old.content_raw); END",
+            "CREATE TRIGGER IF NOT EXISTS articles_search_update AFTER UPDATE OF title, content_raw ON articles BEGIN "
+            "INSERT INTO article_search(article_search, rowid, title, content_raw) "
+            "VALUES ('delete', old.id, old.title, old.content_raw); "
+            "INSERT INTO article_search(rowid, title, content_raw) VALUES (new.id, new.title, new.content_raw); END",
+        ):
+            await conn.execute(text(statement))
+        if not exists:
+            # 为已有文章建立索引
+            await conn.execute(text("INSERT INTO article_search(article_search) VALUES ('rebuild')"))
+        cls._backend = "fts5"
+
+    @classmethod
+    async def search(
+        cls,
+        session: AsyncSession,
+        user_id: int,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> ArticleSearchPage:
+        """搜索用户的文章
+
+        多个关键词(空白分隔)需全部命中,每个关键词可出现在标题或正文中。
+        相关度 = 全文检索得分 + 标题命中的关键词比例。
+
+        Args:
+            session: 数据库会话
+            user_id: 用户ID
+            query: 搜索词
+            limit: 每页数量
+            cursor: 上一页返回的游标
+
+        Returns:
+            搜索结果页
+
+        Raises:
+            ValueError: 游标无效
+        """
+        terms = split_terms(query)
+        if not terms:
+            return ArticleSearchPage(items=[], next_cursor=None)
+        after = decode_cursor(cursor) if cursor else None
+
+        if cls._backend is None:
+            async with session.bind.begin() as conn:
+                await cls.setup(conn)
+
+        params: dict = {"user_id": user_id, "limit": limit + 1}
+        for i, term in enumerate(terms):
+            params[f"term_{i}"] = term
+            params[f"pattern_{i}"] = _like_pattern(term)
+
+        if cls._backend == "postgresql":
+            sql = cls._postgresql_query(terms, params)
+        elif cls._backend == "fts5":
+            sql = cls._fts5_query(terms, params)
+        else:
+            sql = cls._like_query(terms)
+
+        if after is not None:
+            params["after_rank"], params["after_id"] = after
+            cursor_condition = "WHERE rank < :after_rank OR (rank = :after_rank AND id < :after_id)"
+        else:
+            cursor_condition = ""
+        result = await session.execute(
+            text(f"SELECT id, rank FROM ({sql}) AS hits {cursor_condition} ORDER BY rank DESC, id DESC LIMIT :limit"),
+            params,
+        )
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        articles: dict[int, Article] = {}
+        if rows:
+            result = await session.execute(select(Article).where(Article.id.in_([row.id for row in rows])))
+            articles = {article.id: article for article in result.scalars().all()}
+
+        items = []
+        for row in rows:
+            article = articles.get(row.id)
+            if article is None:
+                continue
+            items.append(ArticleSearchHit(
+                id=article.id,
+                title=article.title,
+                status=article.status,
+                created_at=article.created_at,
+                updated_at=article.updated_at,
+                rank=float(row.rank),
+                title_highlight=highlight(article.title, terms),
+                snippet=snippet(article.content_raw, terms),
+            ))
+        next_cursor = encode_cursor(float(rows[-1].rank), rows[-1].id) if has_more else None
+        return ArticleSearchPage(items=items, next_cursor=next_cursor)
+
+    @staticmethod
+    def _title_score(terms: list[str], operator: str = "LIKE") -> str:
+        """标题命中的关键词比例(0~1)"""
+        hits = " + ".join(
+            f"(CASE WHEN a.title {operator} :pattern_{i} ESCAPE '\\' THEN 1 ELSE 0 END)" for i in range(len(terms))
+        )
+        return f"({hits}) * {1.0 / len(terms)!r}"
+
+    @classmethod
+    def _postgresql_query(cls, terms: list[str], params: dict) -> str:
+        params["ts_config"] = cls._ts_config
+        params["query"] = " ".join(terms)
+        conditions = " AND ".join(
+            f"(a.search_vector @@ plainto_tsquery(CAST(:ts_config AS regconfig), :term_{i}) "
+            f"OR a.title ILIKE :pattern_{i} OR a.content_raw ILIKE :pattern_{i})"
+            for i in range(len(terms))
+        )
+        return (
+            "SELECT a.id AS id, "
+            "CAST(ts_rank_cd(a.search_vector, plainto_tsquery(CAST(:ts_config AS regconfig), :query)) "
+            f"AS double precision) + {cls._title_score(terms, 'ILIKE')} AS rank "
+            f"FROM articles a WHERE a.user_id = :user_id AND {conditions}"
+        )
+
+    @classmethod
+    def _fts5_query(cls, terms: list[str], params: dict) -> str:
+        long_terms = [t for t in terms if len(t) >= _TRIGRAM_MIN_CHARS]
+        short_conditions = "".join(
+            f" AND (a.title LIKE :pattern_{i} ESCAPE '\\' OR a.content_raw LIKE :pattern_{i} ESCAPE '\\')"
+            for i, term in enumerate(terms)
+            if len(term) < _TRIGRAM_MIN_CHARS
+        )
+        if not long_terms:
+            return cls._like_query(terms)
+        # 每个关键词作为短语,双引号转义
+        params["match"] = " AND ".join('"' + t.replace('"', '""') + '"' for t in long_terms)
+        return (
+            f"SELECT a.id AS id, -bm25(article_search, 10.0, 1.0) + {cls._title_score(terms)} AS rank "
+            "FROM article_search JOIN articles a ON a.id = article_search.rowid "
+            f"WHERE article_search MATCH :match AND a.user_id = :user_id{short_conditions}"
+        )
+
+    @classmethod
+    def _like_query(cls, terms: list[str]) -> str:
+        conditions = " AND ".join(
+            f"(a.title LIKE :pattern_{i} ESCAPE '\\' OR a.content_raw LIKE :pattern_{i} ESCAPE '\\')"
+            for i in range(len(terms))
+        )
+        return (
+            f"SELECT a.id AS id, {cls._title_score(terms)} AS rank "
+            f"FROM articles a WHERE a.user_id = :user_id AND {conditions}"
+        )
+
+
+def _term_regex(terms: list[str]) -> re.Pattern:
+    return re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+
+
+def highlight(content: str, terms: list[str]) -> str:
+    """转义HTML并用 <mark> 标出关键词
+
+    Args:
+        content: 原文
+        terms: 关键词
+
+    Returns:
+        高亮后的HTML片段
+    """
+    parts = []
+    cursor = 0
+    for match in _term_regex(terms).finditer(content):
+        parts.append(html.escape(content[cursor:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        cursor = match.end()
+    parts.append(html.escape(content[cursor:]))
+    return "".join(parts)
+
+
+def snippet(content: str, terms: list[str], length: int = _SNIPPET_CHARS) -> str:
+    """截取首个关键词附近的正文并高亮
+
+    Args:
+        content: 正文
+        terms: 关键词
+        length: 摘要长度(字符)
+
+    Returns:
+        高亮后的摘要
+    """
+    match = _term_regex(terms).search(content)
+    start = 0 if match is None else max(0, match.start() - length // 3)
+    end = min(len(content), start + length)
+    fragment = " ".join(content[start:end].split())
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(content) else ""
+    return f"{prefix}{highlight(fragment, terms)}{suffix}"
@@ -0,0 +1,165 @@
+"""文章状态服务 - 状态转换校验与按用户、按状态的文章计数
+
+状态转换:
+    generating -> generated / generation_failed
+    generated / synced / sync_failed -> syncing / sync_failed
+    syncing -> synced / sync_failed / syncing(同步租约过期后重新领取)
+generation_failed 为终态。
+
+每次转换与文章状态在同一事务中更新 article_status_counts,统计接口不扫描文章表。
+"""
+from typing import Optional
+
+from sqlalchemy import func, insert, select as sa_select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlmodel import select
+
+from app.core.logging import logger
+from app.models.article import Article, ArticleStatus
+from app.models.article_status_count import ArticleStatusCount
+from app.utils.sql import upsert_insert
+
+# 允许的状态转换
+TRANSITIONS: dict[ArticleStatus, frozenset[ArticleStatus]] = {
+    ArticleStatus.GENERATING: frozenset({ArticleStatus.GENERATED, ArticleStatus.GENERATION_FAILED}),
+    ArticleStatus.GENERATION_FAILED: frozenset(),
+    # 同步前置步骤(如获取AccessToken)失败时直接记为同步失败
+    ArticleStatus.GENERATED: frozenset({ArticleStatus.SYNCING, ArticleStatus.SYNC_FAILED}),
+    ArticleStatus.SYNCED: frozenset({ArticleStatus.SYNCING, ArticleStatus.SYNC_FAILED}),
+    ArticleStatus.SYNC_FAILED: frozenset({ArticleStatus.SYNCING, ArticleStatus.SYNC_FAILED}),
+    ArticleStatus.SYNCING: frozenset({ArticleStatus.SYNCED, ArticleStatus.SYNC_FAILED, ArticleStatus.SYNCING}),
+}
+
+# 可以发起同步的状态(同步中的文章只在租约过期后由重试Worker重新领取)
+SYNCABLE_STATUSES = (ArticleStatus.GENERATED, ArticleStatus.SYNCED, ArticleStatus.SYNC_FAILED)
+
+# 旧版本的状态值: draft -> generated;failed 按是否有正文区分生成失败与同步失败
+_LEGACY_STATUS_UPDATES = (
+    ("status = 'draft'", ArticleStatus.GENERATED),
+    ("status = 'failed' AND content_raw = ''", ArticleStatus.GENERATION_FAILED),
+    ("status = 'failed'", ArticleStatus.SYNC_FAILED),
+)
+
+# (user_id, status) 部分索引
+_PENDING_INDEX = next(i for i in Article.__table__.indexes if i.name == "ix_articles_user_status_pending")
+
+
+class InvalidStatusTransition(ValueError):
+    """不允许的文章状态转换"""
+
+    def __init__(self, current: ArticleStatus, target: ArticleStatus):
+        super().__init__(f"文章状态不能从 {current.value} 变为 {target.value}")
+        self.current = current
+        self.target = target
+
+
+class ArticleStatusService:
+    """文章状态服务类"""
+
+    @staticmethod
+    def can_transition(current: ArticleStatus, target: ArticleStatus) -> bool:
+        """是否允许从 current 转换到 target"""
+        return target in TRANSITIONS[current]
+
+    @staticmethod
+    async def _adjust(session: AsyncSession, user_id: int, deltas: dict[ArticleStatus, int]) -> None:
+        """调整用户各状态的文章计数(不提交)"""
+        table = ArticleStatusCount.__table__
+        for status, delta in deltas.items():
+            if not delta:
+                continue
+            stmt = upsert_insert(session)(table).values(user_id=user_id, status=status.value, count=delta)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.status],
+                set_={"count": table.c.count + stmt.excluded.count},
+            )
+            await session.execute(stmt)
+
+    @staticmethod
+    async def created(session: AsyncSession, user_id: int, status: ArticleStatus, count: int = 1) -> None:
+        """记录新建的文章(与文章一起提交)
+
+        Args:
+            session: 数据库会话
+            user_id: 用户ID
+            status: 文章的初始状态
+            count: 文章数量
+        """
+        await ArticleStatusService._adjust(session, user_id, {status: count})
+
+    @staticmethod
+    async def deleted(session: AsyncSession, article: Article) -> None:
+        """记录删除的文章(与删除一起提交)"""
+        await ArticleStatusService._adjust(session, article.user_id, {article.status: -1})
+
+    @staticmethod
+    async def transition(session: AsyncSession, article: Article, target: ArticleStatus) -> None:
+        """转换文章状态并更新计数(不提交)
+
+        Args:
+            session: 数据库会话
+            article: 文章对象
+            target: 目标状态
+
+        Raises:
+            InvalidStatusTransition: 不允许的状态转换
+        """
+        current = article.status
+        if not ArticleStatusService.can_transition(current, target):
+            raise InvalidStatusTransition(current, target)
+        article.status = target
+        if current != target:
+            await ArticleStatusService._adjust(session, article.user_id, {current: -1, target: 1})
+
+    @staticmethod
+    async def counts(session: AsyncSession, user_id: Optional[int] = None) -> dict[str, int]:
+        """各状态的文章数量
+
+        Args:
+            session: 数据库会话
+            user_id: 只统计该用户,为空时合计全部用户
+
+        Returns:
+            状态 -> 数量(包含所有状态,没有文章的状态为0)
+        """
+        query = select(ArticleStatusCount.status, func.sum(ArticleStatusCount.count)).group_by(
+            ArticleStatusCount.status
+        )
+        if user_id is not None:
+            query = query.where(ArticleStatusCount.user_id == user_id)
+        result = await session.execute(query)
+        counts = {status.value: 0 for status in ArticleStatus}
+        counts.update({status: int(count) for status, count in result.all()})
+        return counts
+
+    @staticmethod
+    async def setup(conn: AsyncConnection) -> None:
+        """建表后的升级步骤(幂等)
+
+        - 为已有的 articles 表补建 (user_id, status) 部分索引(create_all 不会为已存在的表建索引)
+        - 计数表为空而已有文章时(首次升级),转换旧版本的状态值并按现有文章初始化计数
+
+        由应用启动流程在建表后调用;多worker部署时 app.server 还会在启动worker前先执行一次。
+
+        Args:
+            conn: 数据库连接(处于事务中)
+        """
+        await conn.run_sync(lambda sync_conn: _PENDING_INDEX.create(sync_conn, checkfirst=True))
+
+        has_counts = (await conn.execute(sa_select(ArticleStatusCount.user_id).limit(1))).first()
+        has_articles = (await conn.execute(sa_select(Article.id).limit(1))).first()
+        if has_counts or not has_articles:
+            return
+
+        for condition, status in _LEGACY_STATUS_UPDATES:
+            await conn.execute(text(f"UPDATE articles SET status = :status WHERE {condition}"), {"status": status.value})
+
+        articles = Article.__table__
+        await conn.execute(
+            insert(ArticleStatusCount.__table__).from_select(
+                ["user_id", "status", "count"],
+                sa_select(articles.c.user_id, articles.c.status, func.count())
+                .group_by(articles.c.user_id, articles.c.status),
+            )
+        )
+        logger.info("已初始化文章状态计数")
@@ -0,0 +1,186 @@
+"""文章同步服务 - 同步到微信草稿箱并维护同步状态与重试计划"""
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.tracing import get_tracer
+from app.models.article import Article, ArticleStatus
+from app.models.wechat_config import WechatConfig
+from app.services.article_content import ArticleContentService
+from app.services.article_status import ArticleStatusService
+from app.services.task_progress import report_progress, track_task
+from app.services.usage_stats import UsageStatsService
+from app.services.wechat_service import QUOTA_ERRCODES, RETRYABLE_ERRCODES, WechatService
+
+tracer = get_tracer(__name__)
+
+
+class ArticleSyncService:
+    """文章同步服务类"""
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """判断同步错误是否值得稍后重试
+
+        沿异常链(__cause__)查找微信错误码:配置错误、内容不合规等致命错误不重试,
+        网络错误、系统繁忙、限频等临时错误重试。
+
+        Args:
+            error: 同步时抛出的异常
+
+        Returns:
+            是否可重试
+        """
+        current: Optional[BaseException] = error
+        while current is not None:
+            errcode = getattr(current, "errcode", None)
+            if errcode is not None:
+                return errcode in RETRYABLE_ERRCODES
+            if isinstance(current, (httpx.TransportError, TimeoutError)):
+                return True
+            current = current.__cause__
+        # 未识别的错误(如封面图下载失败)按临时错误处理
+        return True
+
+    @staticmethod
+    def _errcode(error: BaseException) -> Optional[int]:
+        current: Optional[BaseException] = error
+        while current is not None:
+            errcode = getattr(current, "errcode", None)
+            if errcode is not None:
+                return errcode
+            current = current.__cause__
+        return None
+
+    @staticmethod
+    def next_retry_delay(retry_count: int, error: Optional[BaseException] = None) -> float:
+        """计算下次重试前的等待秒数(指数退避 + 抖动)
+
+        Args:
+            retry_count: 已失败次数(从1开始)
+            error: 本次失败的异常,配额类错误使用最大等待时间
+
+        Returns:
+            等待秒数
+        """
+        if error is not None and ArticleSyncService._errcode(error) in QUOTA_ERRCODES:
+            delay = settings.SYNC_RETRY_MAX_DELAY
+        else:
+            delay = min(
+                settings.SYNC_RETRY_MAX_DELAY,
+                settings.SYNC_RETRY_BASE_DELAY * 2 ** max(0, retry_count - 1),
+            )
+        # 等幅抖动:一半固定、一半随机,避免大量文章在同一时刻集中重试
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    @staticmethod
+    def schedule_retry(article: Article, error: BaseException) -> None:
+        """记录同步失败原因并安排下次重试(状态转换由调用方负责)
+
+        Args:
+            article: 文章对象
+            error: 同步失败的异常
+        """
+        article.sync_error_message = str(error)
+        article.retry_count += 1
+
+        if (
+            settings.SYNC_RETRY_ENABLED
+            and article.retry_count < settings.SYNC_RETRY_MAX_ATTEMPTS
+            and ArticleSyncService.is_retryable(error)
+        ):
+            delay = ArticleSyncService.next_retry_delay(article.retry_count, error)
+            article.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        else:
+            article.next_attempt_at = None
+
+    @staticmethod
+    async def sync(
+        session: AsyncSession,
+        article: Article,
+        wechat_config: WechatConfig,
+        max_retries: Optional[int] = None,
+    ) -> Article:
+        """同步文章到微信草稿箱并提交状态
+
+        启用重试队列时只在请求内尝试一次,失败后由 SyncRetryWorker 按计划重试。
+        同步过程记录为 sync_wechat 任务并推送进度。
+
+        Args:
+            session: 数据库会话
+            article: 文章对象
+            wechat_config: 用户的微信配置
+            max_retries: 请求内重试次数,默认根据是否启用重试队列决定
+
+        Returns:
+            同步后的文章
+
+        Raises:
+            Exception: 同步失败时抛出(失败状态已提交)
+        """
+        if max_retries is None:
+            max_retries = 1 if settings.SYNC_RETRY_ENABLED else settings.WECHAT_MAX_RETRIES
+
+        async with track_task(article.user_id, "sync_wechat", article.id):
+            return await ArticleSyncService._sync(session, article, wechat_config, max_retries)
+
+    @staticmethod
+    async def _sync(
+        session: AsyncSession,
+        article: Article,
+        wechat_config: WechatConfig,
+        max_retries: int,
+    ) -> Article:
+        """执行同步(任务记录由 sync 负责)
+
+        开始前先提交 syncing 状态,next_attempt_at 记为租约到期时间:
+        进程在同步中途退出时,租约到期后由 SyncRetryWorker 重新领取。
+        """
+        await ArticleStatusService.transition(session, article, ArticleStatus.SYNCING)
+        article.next_attempt_at = datetime.utcnow() + timedelta(seconds=settings.SYNC_RETRY_LEASE_SECONDS)
+        await session.commit()
+
+        try:
+            with tracer.start_as_current_span("wechat.sync"):
+                await report_progress("syncing", 10)
+                content_html = await ArticleContentService.get_html(session, article)
+                wechat_service = WechatService(wechat_config)
+                media_id = await wechat_service.sync_article_with_retry(
+                    article.title,
+                    content_html,
+                    max_retries=max_retries,
+                )
+        except Exception as e:
+            ArticleSyncService.schedule_retry(article, e)
+            await ArticleStatusService.transition(session, article, ArticleStatus.SYNC_FAILED)
+            await UsageStatsService.record_sync(session, article.user_id, False)
+            await session.commit()
+            await session.refresh(article)
+            raise
+
+        # 更新文章状态
+        article.wechat_media_id = media_id
+        await ArticleStatusService.transition(session, article, ArticleStatus.SYNCED)
+        article.synced_at = datetime.utcnow()
+        article.sync_error_message = None
+        article.next_attempt_at = None
+        # 重试次数只统计连续失败,成功后重新计数
+        article.retry_count = 0
+
+        # 更新微信配置统计
+        wechat_config.total_synced += 1
+        wechat_config.last_sync_at = datetime.utcnow()
+        await UsageStatsService.record_sync(session, article.user_id, True)
+
+        with tracer.start_as_current_span("db.save_sync"):
+            await session.commit()
+            await session.refresh(article)
+            await session.refresh(wechat_config)
+
+        logger.info(f"文章同步成功: article_id={article.id}, title={article.title}")
+        return article
@@ -0,0 +1,280 @@
+"""文章批量导出/导入服务 - 流式处理,内存占用与文章总数无关"""
+import json
+import re
+import zipfile
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.db import async_session_maker
+from app.models.article import Article, ArticleStatus
+from app.models.style import Style
+from app.schemas.article import ArticleImportError, ArticleImportItem, ArticleImportResult
+from app.services.article_content import ArticleContentService
+from app.services.article_status import ArticleStatusService
+from app.services.prompt_similarity import PromptSimilarityService
+from app.services.style_cache import StyleCache
+from app.services.style_service import StyleService
+
+# 导出的字段(content_html为带样式的完整HTML)
+EXPORT_FIELDS = (
+    "id", "title", "style_id", "prompt_input", "content_raw", "status",
+    "wechat_media_id", "created_at", "updated_at", "synced_at",
+)
+
+# 每累计该字节数向客户端发送一次,减少小块写入
+_FLUSH_BYTES = 64 * 1024
+
+# 导入结果中最多返回的错误条数
+_MAX_REPORTED_ERRORS = 100
+
+# 文件名中不允许的字符
+_UNSAFE_FILENAME = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def _describe_error(error: ValueError) -> str:
+    """把校验错误压缩为一行说明"""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(map(str, item['loc'])) or 'JSON'}: {item['msg']}" for item in error.errors()
+        )
+    return str(error)
+
+
+class ImportLineTooLarge(Exception):
+    """导入文件中单行超过 ARTICLE_IMPORT_MAX_LINE_BYTES"""
+
+
+class _ZipStream:
+    """zipfile的只写目标,写入内容暂存后由导出循环取走
+
+    不提供 tell/seek,zipfile 会按不可寻址流处理(使用数据描述符),无需回写文件头。
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ArticleTransferService:
+    """文章批量导出/导入服务类"""
+
+    @staticmethod
+    async def _iter_articles(user_id: int) -> AsyncIterator[tuple[Article, str]]:
+        """按ID顺序遍历用户的文章
+
+        使用服务端游标(stream_scalars + yield_per)分批读取,处理完的对象立即从会话中移除。
+        读取样式等辅助查询使用另一个会话,不与游标共用连接。
+
+        Args:
+            user_id: 用户ID
+
+        Yields:
+            (文章, 完整HTML)
+        """
+        async with async_session_maker() as session, async_session_maker() as lookup_session:
+            articles = await session.stream_scalars(
+                select(Article)
+                .where(Article.user_id == user_id)
+                .order_by(Article.id)
+                .execution_options(yield_per=settings.ARTICLE_EXPORT_BATCH_SIZE)
+            )
+            async for article in articles:
+                html = await ArticleContentService.get_html(lookup_session, article)
+                yield article, html
+                session.expunge(article)
+
+    @staticmethod
+    def _to_record(article: Article, html: str) -> dict:
+        record = {field: getattr(article, field) for field in EXPORT_FIELDS}
+        record["content_html"] = html
+        return record
+
+    @staticmethod
+    async def export_ndjson(user_id: int) -> AsyncIterator[bytes]:
+        """导出为NDJSON(每行一篇文章)
+
+        Args:
+            user_id: 用户ID
+
+        Yields:
+            NDJSON数据块
+        """
+        buffer: list[bytes] = []
+        size = 0
+        async for article, html in ArticleTransferService._iter_articles(user_id):
+            line = json.dumps(
+                ArticleTransferService._to_record(article, html), ensure_ascii=False, default=str
+            ).encode("utf-8") + b"\n"
+            buffer.append(line)
+            size += len(line)
+            if size >= _FLUSH_BYTES:
+                yield b"".join(buffer)
+                buffer.clear()
+                size = 0
+        if buffer:
+            yield b"".join(buffer)
+
+    @staticmethod
+    def _filename(article: Article) -> str:
+        title = _UNSAFE_FILENAME.sub("_", article.title).strip("_")[:50]
+        return f"{article.id}-{title}" if title else str(article.id)
+
+    @staticmethod
+    async def export_zip(user_id: int) -> AsyncIterator[bytes]:
+        """导出为zip: markdown/<id>-<标题>.md 与 html/<id>-<标题>.html
+
+        Args:
+            user_id: 用户ID
+
+        Yields:
+            zip数据块
+        """
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            async for article, html in ArticleTransferService._iter_articles(user_id):
+                name = ArticleTransferService._filename(article)
+                date_time = article.updated_at.timetuple()[:6]
+                for path, content in ((f"markdown/{name}.md", article.content_raw), (f"html/{name}.html", html)):
+                    info = zipfile.ZipInfo(path, date_time=date_time)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    archive.writestr(info, content)
+                data = stream.drain()
+                if data:
+                    yield data
+        # 关闭时写入中央目录
+        data = stream.drain()
+        if data:
+            yield data
+
+    @staticmethod
+    async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """把请求体数据块切分为行
+
+        Raises:
+            ImportLineTooLarge: 单行超过 ARTICLE_IMPORT_MAX_LINE_BYTES
+        """
+        pending = bytearray()
+        async for chunk in chunks:
+            # 只在新数据中查找换行,长行跨多个数据块时不重复扫描
+            search_from = len(pending)
+            pending.extend(chunk)
+            start = 0
+            while (end := pending.find(b"\n", search_from)) != -1:
+                yield bytes(pending[start:end])
+                start = search_from = end + 1
+            del pending[:start]
+            if len(pending) > settings.ARTICLE_IMPORT_MAX_LINE_BYTES:
+                raise ImportLineTooLarge(f"单行超过 {settings.ARTICLE_IMPORT_MAX_LINE_BYTES} 字节")
+        if pending:
+            yield bytes(pending)
+
+    @staticmethod
+    async def import_ndjson(
+        session: AsyncSession,
+        user_id: int,
+        chunks: AsyncIterator[bytes],
+    ) -> ArticleImportResult:
+        """从NDJSON流导入文章
+
+        逐行解析,每 ARTICLE_IMPORT_BATCH_SIZE 篇批量插入并提交一次,已提交的对象从会话中移除。
+        导入的文章均为已生成(未同步)状态;无效的行跳过并记录错误,不影响其他行。
+
+        Args:
+            session: 数据库会话
+            user_id: 用户ID
+            chunks: 请求体数据块
+
+        Returns:
+            导入结果
+
+        Raises:
+            ImportLineTooLarge: 单行超过 ARTICLE_IMPORT_MAX_LINE_BYTES(之前的批次已提交)
+        """
+        styles: dict[int, Optional[Style]] = {}
+        batch: list[Article] = []
+        imported = 0
+        failed = 0
+        errors: list[ArticleImportError] = []
+
+        async def flush() -> None:
+            nonlocal imported
+            if batch:
+                session.add_all(batch)
+                await ArticleStatusService.created(session, user_id, ArticleStatus.GENERATED, len(batch))
+                if settings.PROMPT_SIMILARITY_ENABLED:
+                    # 先分配ID再建立Prompt签名,与文章一起提交
+                    await session.flush()
+                    for article in batch:
+                        PromptSimilarityService.index(session, article)
+                await session.commit()
+                session.expunge_all()
+                imported += len(batch)
+                batch.clear()
+
+        line_number = 0
+        async for line in ArticleTransferService._iter_lines(chunks):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                item = ArticleImportItem.model_validate_json(line)
+                if item.style_id not in styles:
+                    style = await StyleCache.get_style(session, item.style_id)
+                    if style is not None and not style.is_system and style.user_id != user_id:
+                        style = None
+                    styles[item.style_id] = style
+                style = styles[item.style_id]
+                if style is None:
+                    raise ValueError(f"样式不存在或无权使用: {item.style_id}")
+                batch.append(await ArticleTransferService._build_article(user_id, item, style))
+            except ValueError as e:
+                # 包括JSON格式错误与字段校验失败(ValidationError)
+                failed += 1
+                if len(errors) < _MAX_REPORTED_ERRORS:
+                    errors.append(ArticleImportError(line=line_number, error=_describe_error(e)))
+                continue
+
+            if len(batch) >= settings.ARTICLE_IMPORT_BATCH_SIZE:
+                await flush()
+
+        await flush()
+        return ArticleImportResult(imported=imported, failed=failed, errors=errors)
+
+    @staticmethod
+    async def _build_article(user_id: int, item: ArticleImportItem, style: Style) -> Article:
+        now = datetime.utcnow()
+        created_at = item.created_at or now
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        article = Article(
+            user_id=user_id,
+            style_id=style.id,
+            title=item.title,
+            prompt_input=item.prompt_input,
+            content_raw=item.content_raw,
+            content_html="",
+            status=ArticleStatus.GENERATED,
+            created_at=created_at,
+            updated_at=now,
+        )
+        if item.content_html is not None:
+            await ArticleContentService.set_document(article, item.content_html)
+        else:
+            await ArticleContentService.set_rendered(article, StyleService.render_body(item.content_raw), style)
+        return article
@@ -0,0 +1,109 @@
+"""Blob存储 - 本地文件系统上的内容寻址存储"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from app.core.config import settings
+
+
+class BlobStore:
+    """内容寻址Blob存储
+
+    按内容SHA-256存放在 <root>/<前2位>/<后续2位>/<摘要>,相同内容只保存一份。
+    写入先落临时文件再原子重命名,并发写入同一内容是安全的。
+    多实例部署时 root 需指向共享存储。
+
+    Blob不随文章删除或内容替换立即删除(同一内容可能被多篇文章引用),
+    由 BlobSweeper 定期清理修改时间早于宽限期且不再被引用的Blob。
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def put(self, data: bytes) -> str:
+        """写入数据(同步,调用方应在线程池中执行)
+
+        Args:
+            data: 数据
+
+        Returns:
+            内容摘要
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if path.exists():
+            # 刷新修改时间,避免即将被新文章引用的Blob被清理
+            try:
+                os.utime(path)
+                return digest
+            except FileNotFoundError:
+                pass
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """读取数据(同步)
+
+        Raises:
+            FileNotFoundError: Blob不存在
+        """
+        return self._path(digest).read_bytes()
+
+    def list_stale(self, older_than: float) -> list[str]:
+        """列出修改时间早于指定时间的Blob(同步)
+
+        Args:
+            older_than: 时间戳(秒)
+
+        Returns:
+            内容摘要列表
+        """
+        if not self.root.is_dir():
+            return []
+        digests = []
+        for path in self.root.glob("??/??/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                if path.stat().st_mtime < older_than:
+                    digests.append(path.name)
+            except FileNotFoundError:
+                continue
+        return digests
+
+    def delete_if_stale(self, digest: str, older_than: float) -> bool:
+        """修改时间仍早于指定时间时删除Blob(同步)
+
+        Args:
+            digest: 内容摘要
+            older_than: 时间戳(秒)
+
+        Returns:
+            是否已删除
+        """
+        path = self._path(digest)
+        try:
+            if path.stat().st_mtime >= older_than:
+                return False
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+
+# 全局Blob存储实例
+blob_store = BlobStore(settings.ARTICLE_BLOB_DIR)
@@ -0,0 +1,88 @@
+"""Blob清理 - 后台周期性删除不再被文章引用的Blob"""
+import asyncio
+import time
+from typing import Optional
+
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.db import async_session_maker
+from app.core.logging import logger
+from app.models.article import Article
+from app.services.blob_store import blob_store
+
+# 每次查询引用关系的摘要数量
+_QUERY_CHUNK = 500
+
+
+class BlobSweeper:
+    """未引用Blob清理
+
+    文章删除、重新渲染或替换内容时不立即删除旧Blob(内容寻址,可能仍被其他文章引用,
+    且写入Blob在事务提交之前,回滚后同样会留下无主Blob),由本任务统一回收:
+    1. 列出修改时间早于宽限期的Blob
+    2. 查询文章表中仍被引用的摘要
+    3. 删除未被引用的Blob,删除前再次确认修改时间
+
+    BlobStore.put 遇到已存在的Blob时会刷新修改时间,因此步骤2之后才提交引用的文章
+    一定在宽限期内写过Blob,不会被误删。多实例同时清理是安全的。
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """启动后台循环"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="blob-sweeper")
+
+    async def stop(self) -> None:
+        """停止后台循环"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ARTICLE_BLOB_SWEEP_INTERVAL)
+            try:
+                await self.sweep_once()
+            except Exception as e:
+                logger.error(f"Blob清理失败: {e}", exc_info=True)
+
+    async def sweep_once(self) -> int:
+        """执行一轮清理
+
+        Returns:
+            删除的Blob数量
+        """
+        cutoff = time.time() - settings.ARTICLE_BLOB_GRACE_SECONDS
+        candidates = await asyncio.to_thread(blob_store.list_stale, cutoff)
+        if not candidates:
+            return 0
+
+        referenced: set[str] = set()
+        async with async_session_maker() as session:
+            for i in range(0, len(candidates), _QUERY_CHUNK):
+                result = await session.execute(
+                    select(Article.content_blob)
+                    .where(Article.content_blob.in_(candidates[i:i + _QUERY_CHUNK]))
+                    .distinct()
+                )
+                referenced.update(result.scalars().all())
+
+        deleted = 0
+        for digest in candidates:
+            if digest not in referenced and await asyncio.to_thread(blob_store.delete_if_stale, digest, cutoff):
+                deleted += 1
+        if deleted:
+            logger.info(f"已清理 {deleted} 个未引用的Blob")
+        return deleted
+
+
+# 全局实例
+blob_sweeper = BlobSweeper()
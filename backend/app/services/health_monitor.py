@@ -0,0 +1,198 @@
+"""健康监控 - 后台周期性检查依赖状态,探针接口只读取缓存结果"""
+import asyncio
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+import httpx
+from redis.exceptions import RedisError
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.logging import logger
+from app.core.redis import get_redis
+from app.core.resilience import CircuitBreaker
+from app.services.llm_gateway import llm_gateway
+
+OK = "ok"
+DEGRADED = "degraded"  # 不可用但有降级方案,不影响就绪
+DOWN = "down"
+
+
+@dataclass
+class ComponentHealth:
+    """单个依赖的检查结果"""
+    status: str
+    detail: dict = field(default_factory=dict)
+    latency_ms: float = 0.0
+    checked_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+
+class HealthMonitor:
+    """健康监控
+
+    - database: SELECT 1 与连接池统计,不可用时实例未就绪
+    - redis: PING,不可用时各功能走本地降级,记为 degraded
+    - llm / wechat: 上游可达性(非5xx响应即视为可达),按 HEALTH_UPSTREAM_CHECK_INTERVAL 较低频率检查
+
+    /health/live 与 /health/ready 只读取 snapshot,不访问任何依赖。
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.components: dict[str, ComponentHealth] = {}
+        self.last_check: Optional[float] = None  # monotonic
+        self._last_upstream_check: Optional[float] = None
+        self.accepting = False  # 启动预热完成后置为True,关闭时置为False
+
+    def start(self) -> None:
+        """启动后台检查"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        """停止后台检查并标记为未就绪"""
+        self.accepting = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        # 首轮检查由启动流程完成
+        while True:
+            await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL)
+            try:
+                await self.check_once()
+            except Exception as e:
+                logger.error(f"健康检查失败: {e}", exc_info=True)
+
+    async def check_once(self, include_upstreams: Optional[bool] = None) -> None:
+        """执行一轮检查
+
+        Args:
+            include_upstreams: 是否检查上游,默认按 HEALTH_UPSTREAM_CHECK_INTERVAL 决定
+        """
+        async with self._lock:
+            now = time.monotonic()
+            if include_upstreams is None:
+                include_upstreams = settings.HEALTH_CHECK_UPSTREAMS and (
+                    self._last_upstream_check is None
+                    or now - self._last_upstream_check >= settings.HEALTH_UPSTREAM_CHECK_INTERVAL
+                )
+
+            checks: dict[str, Callable[[], Awaitable[ComponentHealth]]] = {
+                "database": self._check_database,
+                "redis": self._check_redis,
+            }
+            if include_upstreams:
+                checks["llm"] = self._check_llm
+                checks["wechat"] = self._check_wechat
+                self._last_upstream_check = now
+
+            results = await asyncio.gather(*(self._timed(check) for check in checks.values()))
+            for name, result in zip(checks, results):
+                previous = self.components.get(name)
+                if previous is not None and previous.status != result.status:
+                    logger.warning(f"依赖状态变化: {name} {previous.status} -> {result.status} {result.detail}")
+                self.components[name] = result
+            self.last_check = time.monotonic()
+
+    async def ensure_checked(self) -> None:
+        """尚未检查过时(如后台任务未启动)执行一次检查"""
+        if self.last_check is None:
+            await self.check_once(include_upstreams=False)
+
+    @staticmethod
+    async def _timed(check: Callable[[], Awaitable[ComponentHealth]]) -> ComponentHealth:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(check(), timeout=settings.HEALTH_CHECK_TIMEOUT)
+        except asyncio.TimeoutError:
+            result = ComponentHealth(DOWN, {"error": f"检查超时({settings.HEALTH_CHECK_TIMEOUT}s)"})
+        except Exception as e:
+            result = ComponentHealth(DOWN, {"error": str(e)})
+        result.latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    @staticmethod
+    async def _check_database() -> ComponentHealth:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        pool = engine.pool
+        detail = {
+            # SQLite等使用的连接池没有这些统计
+            name: getattr(pool, name)()
+            for name in ("size", "checkedin", "checkedout", "overflow")
+            if hasattr(pool, name)
+        }
+        return ComponentHealth(OK, detail)
+
+    @staticmethod
+    async def _check_redis() -> ComponentHealth:
+        try:
+            await get_redis().ping()
+        except (RedisError, OSError) as e:
+            return ComponentHealth(DEGRADED, {"error": str(e), "fallback": "local"})
+        return ComponentHealth(OK)
+
+    @staticmethod
+    async def _reachable(client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """请求URL,返回错误描述;收到非5xx响应即视为可达"""
+        try:
+            response = await client.get(url)
+        except httpx.HTTPError as e:
+            return f"{type(e).__name__}: {e}"
+        if response.status_code >= 500:
+            return f"HTTP {response.status_code}"
+        return None
+
+    async def _check_llm(self) -> ComponentHealth:
+        async with httpx.AsyncClient(timeout=settings.HEALTH_CHECK_TIMEOUT) as client:
+            errors = await asyncio.gather(*(
+                self._reachable(client, f"{backend.base_url}/models") for backend in llm_gateway.backends
+            ))
+        backends = {}
+        for backend, error in zip(llm_gateway.backends, errors):
+            backends[backend.name] = {"reachable": error is None, "breaker": backend.breaker.state}
+            if error:
+                backends[backend.name]["error"] = error
+        healthy = any(
+            info["reachable"] and info["breaker"] != CircuitBreaker.OPEN for info in backends.values()
+        )
+        return ComponentHealth(OK if healthy else DEGRADED, {"backends": backends})
+
+    async def _check_wechat(self) -> ComponentHealth:
+        async with httpx.AsyncClient(timeout=settings.HEALTH_CHECK_TIMEOUT) as client:
+            error = await self._reachable(client, f"{settings.WECHAT_API_BASE_URL.rstrip('/')}/cgi-bin/token")
+        if error:
+            return ComponentHealth(DEGRADED, {"error": error})
+        return ComponentHealth(OK)
+
+    def is_ready(self) -> bool:
+        """是否可以接收流量: 已完成启动、检查结果未过期且数据库可用"""
+        if not self.accepting or self.last_check is None:
+            return False
+        if time.monotonic() - self.last_check > settings.HEALTH_CHECK_INTERVAL * 3:
+            return False
+        database = self.components.get("database")
+        return database is not None and database.status == OK
+
+    def snapshot(self) -> dict:
+        """当前缓存的健康状态"""
+        age = None if self.last_check is None else round(time.monotonic() - self.last_check, 1)
+        return {
+            "ready": self.is_ready(),
+            "checked_seconds_ago": age,
+            "components": {name: asdict(result) for name, result in self.components.items()},
+        }
+
+
+# 全局监控实例
+health_monitor = HealthMonitor()
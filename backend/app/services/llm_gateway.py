@@ -0,0 +1,370 @@
+"""LLM网关 - 多后端注册、健康评分、自动故障转移与对冲请求
+
+所有后端均为OpenAI兼容接口(/chat/completions)。后端通过 LLM_BACKENDS 配置,
+未配置时只有一个由 SILICONFLOW_BASE_URL / SILICONFLOW_MODEL 构成的默认后端。
+
+- 与用户API Key同一提供商(UserApiKey.provider)的后端使用用户的Key
+- 其他提供商的后端只有在配置了自己的 api_key 时才会作为故障转移候选
+- 传入 on_delta 时以流式(SSE)请求,生成过程中回调文本增量,结果结构与非流式响应相同
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.resilience import CircuitBreaker, CircuitOpenError
+from app.services.prompt_templates import PromptTemplates, SystemPrefix
+
+# 这些状态码说明请求本身或凭证有问题,换后端也无济于事,直接向上抛出
+NON_FAILOVER_STATUS_CODES = {400, 401, 403, 422}
+
+# 流式生成的文本增量回调
+DeltaCallback = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class LLMBackend:
+    """LLM后端及其健康状态"""
+    name: str
+    provider: str
+    base_url: str
+    model: str
+    api_key: Optional[str] = None
+    prompt_cache: Optional[str] = None  # 前缀缓存提示方式,为空时按提供商选择
+
+    # 健康状态(进程内)
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=100))
+    error_rate: float = 0.0  # 错误率的指数移动平均
+    breaker: CircuitBreaker = field(init=False)
+
+    def __post_init__(self):
+        self.breaker = CircuitBreaker(
+            f"LLM后端 {self.name}",
+            settings.LLM_BACKEND_FAILURE_THRESHOLD,
+            settings.LLM_BACKEND_COOLDOWN,
+        )
+
+    def latency_p95(self) -> Optional[float]:
+        """最近请求的p95延迟(毫秒),样本不足时返回None"""
+        if len(self.latencies_ms) < 10:
+            return None
+        ordered = sorted(self.latencies_ms)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def health_score(self) -> float:
+        """健康评分,越小越好;熔断期内为无穷大"""
+        if self.breaker.state == CircuitBreaker.OPEN:
+            return float("inf")
+        if self.latencies_ms:
+            avg_latency = sum(self.latencies_ms) / len(self.latencies_ms)
+        else:
+            avg_latency = 0.0
+        return avg_latency * (1 + 5 * self.error_rate)
+
+    def record_success(self, latency_ms: float) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.error_rate *= 0.9
+        self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        self.error_rate = self.error_rate * 0.9 + 0.1
+        self.breaker.record_failure()
+
+
+@dataclass
+class LLMCall:
+    """一次LLM调用的结果"""
+    result: dict
+    backend: LLMBackend
+    model: str
+    latency_ms: float
+
+
+class LLMGateway:
+    """LLM网关类"""
+
+    def __init__(self, backends: list[LLMBackend]):
+        self.backends = backends
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_settings(cls) -> "LLMGateway":
+        """根据配置创建网关"""
+        configs = settings.LLM_BACKENDS or [{
+            "name": "siliconflow",
+            "provider": "siliconflow",
+            "base_url": settings.SILICONFLOW_BASE_URL,
+            "model": settings.SILICONFLOW_MODEL,
+        }]
+        backends = [
+            LLMBackend(
+                name=config.get("name", config["provider"]),
+                provider=config["provider"],
+                base_url=config["base_url"].rstrip("/"),
+                model=config["model"],
+                api_key=config.get("api_key"),
+                prompt_cache=config.get("prompt_cache"),
+            )
+            for config in configs
+        ]
+        return cls(backends)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共享的HTTP客户端,复用连接"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.LLM_TIMEOUT)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def primary_backend(self, provider: str) -> Optional[LLMBackend]:
+        """获取指定提供商的首个后端"""
+        return next((b for b in self.backends if b.provider == provider), None)
+
+    def candidates(self, provider: str) -> list[LLMBackend]:
+        """按健康评分排序的可用后端
+
+        Args:
+            provider: 用户API Key所属提供商
+
+        Returns:
+            候选后端列表(健康的在前)
+        """
+        usable = [b for b in self.backends if b.provider == provider or b.api_key]
+        # sorted 为稳定排序,评分相同时保持配置顺序
+        return sorted(usable, key=lambda b: b.health_score())
+
+    async def _call(
+        self,
+        backend: LLMBackend,
+        payload: dict,
+        user_api_key: str,
+        provider: str,
+        model: Optional[str],
+        prefix: Optional[SystemPrefix] = None,
+        on_delta: Optional[DeltaCallback] = None,
+    ) -> LLMCall:
+        """调用单个后端
+        
+        Raises:
+            CircuitOpenError: 该后端处于熔断状态
+        """
+        backend.breaker.before_call()
+        api_key = user_api_key if backend.provider == provider else backend.api_key
+        # 样式指定的模型只适用于同一提供商的后端
+        request_model = model if model and backend.provider == provider else backend.model
+        # 前缀缓存提示因提供商而异,故障转移时按实际后端改写
+        payload = PromptTemplates.apply_cache_hint(
+            payload, prefix, PromptTemplates.cache_hint(backend.provider, backend.prompt_cache)
+        )
+
+        url = f"{backend.base_url}/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        body = {**payload, "model": request_model}
+
+        start = time.perf_counter()
+        try:
+            if on_delta is None:
+                response = await self.client.post(url, headers=headers, json=body)
+                response.raise_for_status()
+                result = response.json()
+            else:
+                result = await self._stream(url, headers, body, on_delta)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in NON_FAILOVER_STATUS_CODES:
+                # 请求本身的问题,后端是可用的
+                backend.breaker.record_success()
+            else:
+                backend.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # 对冲请求中被取消的一方不计入健康状态
+            backend.breaker.release()
+            raise
+        except Exception:
+            backend.record_failure()
+            raise
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        backend.record_success(latency_ms)
+        return LLMCall(result=result, backend=backend, model=request_model, latency_ms=latency_ms)
+
+    async def _stream(self, url: str, headers: dict, body: dict, on_delta: DeltaCallback) -> dict:
+        """流式请求,按 LLM_STREAM_PROGRESS_INTERVAL 合并文本增量后回调
+
+        Returns:
+            与非流式响应结构相同的结果(choices[0].message.content 与 usage)
+
+        Raises:
+            httpx.HTTPStatusError: 上游返回错误状态码(已读取响应体)
+            ValueError: 事件数据无法解析
+        """
+        body = {**body, "stream": True, "stream_options": {"include_usage": True}}
+        async with self.client.stream("POST", url, headers=headers, json=body) as response:
+            if response.is_error:
+                # 读取错误响应体,供调用方区分配额耗尽与短时限流
+                await response.aread()
+                response.raise_for_status()
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                # 后端忽略了stream参数,按普通响应处理
+                await response.aread()
+                return response.json()
+
+            parts: list[str] = []
+            pending: list[str] = []
+            usage: Optional[dict] = None
+            last_flush = time.monotonic()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get("usage") or usage
+                for choice in chunk.get("choices") or ():
+                    text = (choice.get("delta") or {}).get("content")
+                    if text:
+                        parts.append(text)
+                        pending.append(text)
+                if pending and time.monotonic() - last_flush >= settings.LLM_STREAM_PROGRESS_INTERVAL:
+                    await on_delta("".join(pending))
+                    pending.clear()
+                    last_flush = time.monotonic()
+            if pending:
+                await on_delta("".join(pending))
+
+        return {
+            "choices": [{"message": {"role": "assistant", "content": "".join(parts)}}],
+            "usage": usage,
+        }
+
+    async def _hedged_call(
+        self,
+        primary: LLMBackend,
+        secondary: LLMBackend,
+        payload: dict,
+        user_api_key: str,
+        provider: str,
+        model: Optional[str],
+        prefix: Optional[SystemPrefix] = None,
+        on_delta: Optional[DeltaCallback] = None,
+    ) -> LLMCall:
+        """对冲请求:主后端超过其p95仍未返回时向备用后端再发一次,取先成功者并取消另一个"""
+        p95 = primary.latency_p95()
+        hedge_delay = max(p95 or 0, settings.LLM_HEDGE_MIN_DELAY_MS) / 1000
+
+        primary_task = asyncio.create_task(
+            self._call(primary, payload, user_api_key, provider, model, prefix, on_delta)
+        )
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=hedge_delay)
+        except asyncio.CancelledError:
+            # 调用方在等待期间被取消时,不留下仍在进行的上游请求
+            primary_task.cancel()
+            raise
+        if done:
+            error = primary_task.exception()
+            if error is None:
+                return primary_task.result()
+            if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in NON_FAILOVER_STATUS_CODES:
+                raise error
+            # 主后端提前失败,直接改用备用后端
+            return await self._call(secondary, payload, user_api_key, provider, model, prefix, on_delta)
+
+        logger.info(f"LLM后端 {primary.name} 超过 {hedge_delay:.1f}s 未返回,对冲请求 {secondary.name}")
+        secondary_task = asyncio.create_task(
+            self._call(secondary, payload, user_api_key, provider, model, prefix, on_delta)
+        )
+        pending = {primary_task, secondary_task}
+        last_error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    async def chat_completion(
+        self,
+        payload: dict,
+        user_api_key: str,
+        provider: str = "siliconflow",
+        model: Optional[str] = None,
+        prefix: Optional[SystemPrefix] = None,
+        on_delta: Optional[DeltaCallback] = None,
+    ) -> LLMCall:
+        """发送对话补全请求,失败时自动切换到下一个健康的后端
+
+        Args:
+            payload: 请求体(不含model)
+            user_api_key: 用户的API Key明文
+            provider: 用户API Key所属提供商
+            model: 指定模型(如样式配置的模型),为空时使用后端默认模型
+            prefix: 系统提示的稳定前缀,用于按后端添加前缀缓存提示
+            on_delta: 流式接收时的文本增量回调;故障转移与对冲时各后端的增量都会回调
+
+        Returns:
+            调用结果
+
+        Raises:
+            httpx.HTTPStatusError: 请求或凭证错误(4xx),或所有后端均失败时的最后一个错误
+            httpx.RequestError: 所有后端均失败且最后一个错误为网络、解码或重定向错误
+            CircuitOpenError: 所有后端均处于熔断状态
+            ValueError: 没有可用后端时抛出
+        """
+        candidates = self.candidates(provider)
+        if not candidates:
+            raise ValueError(f"没有可用的LLM后端: provider={provider}")
+
+        last_error: Optional[BaseException] = None
+
+        if settings.LLM_HEDGE_ENABLED and len(candidates) >= 2:
+            try:
+                return await self._hedged_call(
+                    candidates[0], candidates[1], payload, user_api_key, provider, model, prefix, on_delta
+                )
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code in NON_FAILOVER_STATUS_CODES:
+                    raise
+                last_error = e
+            except (httpx.RequestError, ValueError, CircuitOpenError) as e:
+                last_error = e
+            candidates = candidates[2:]
+
+        for backend in candidates:
+            try:
+                return await self._call(backend, payload, user_api_key, provider, model, prefix, on_delta)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code in NON_FAILOVER_STATUS_CODES:
+                    raise
+                last_error = e
+            except (httpx.RequestError, ValueError, CircuitOpenError) as e:
+                last_error = e
+            logger.warning(f"LLM后端 {backend.name} 调用失败,尝试下一个后端: {last_error}")
+
+        raise last_error
+
+
+# 全局网关实例(健康状态在进程内共享)
+llm_gateway = LLMGateway.from_settings()
@@ -6,30 +6,46 @@ import httpx
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.resilience import CircuitOpenError, RetryPolicy, parse_retry_after
 from app.core.security import decrypt_sensitive_data
+from app.core.tracing import get_tracer
+from app.services.llm_gateway import llm_gateway
+from app.services.prompt_builder import OutlineSection, PromptBuilder, PromptPlan
+from app.services.prompt_templates import PromptCacheStats, PromptTemplates
+from app.services.task_progress import report_progress
+from app.services.usage_stats import record_llm_usage
+
+tracer = get_tracer(__name__)
+
+# 配额/余额不足的错误标识(与短时限流区分,前者重试无意义)
+QUOTA_ERROR_MARKERS = ("insufficient_quota", "quota", "balance", "余额", "额度")
 
 
 class MCPService:
-    """MCP服务类 - 调用硅基流动LLM API"""
+    """MCP服务类 - 通过LLM网关调用OpenAI兼容的LLM API"""
     
-    # 并发控制信号量
-    _semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENT)
+    # 并发控制信号量(进程内,多worker部署时按worker数平分 LLM_MAX_CONCURRENT)
+    _semaphore = asyncio.Semaphore(settings.per_worker(settings.LLM_MAX_CONCURRENT))
     
-    def __init__(self, api_key_encrypted: str):
+    def __init__(self, api_key_encrypted: str, provider: str = "siliconflow"):
         """初始化MCP服务
         
         Args:
             api_key_encrypted: 加密的API Key
+            provider: API Key所属的LLM提供商
         """
         self.api_key = decrypt_sensitive_data(api_key_encrypted)
-        self.base_url = settings.SILICONFLOW_BASE_URL
-        self.model = settings.SILICONFLOW_MODEL
+        self.provider = provider
     
     async def generate_article(
         self,
         prompt: str,
         style_instruction: str,
         max_retries: int = None,
+        model: Optional[str] = None,
+        target_length: Optional[int] = None,
+        mode: str = "single",
+        style_key: Optional[tuple[int, int]] = None,
     ) -> str:
         """生成文章内容
         
@@ -37,6 +53,10 @@ class MCPService:
             prompt: 用户输入的主题/关键词
             style_instruction: 样式风格指令
             max_retries: 最大重试次数
+            model: 指定模型(样式配置),为空时使用后端默认模型
+            target_length: 目标字数,用于确定输出Token上限
+            mode: 生成模式,single 一次生成全文,sectioned 先生成大纲再并发生成各小节
+            style_key: (样式ID, 样式版本),同一样式版本复用稳定的系统提示前缀
             
         Returns:
             生成的Markdown内容
@@ -47,68 +67,166 @@ class MCPService:
         if max_retries is None:
             max_retries = settings.LLM_MAX_RETRIES
         
+        if mode == "sectioned":
+            return await self._generate_sectioned(
+                prompt, style_instruction, max_retries, model, target_length, style_key
+            )
+        
+        plan = PromptBuilder.build(prompt, style_instruction, target_length, style_key)
         # 使用信号量控制并发
         async with self._semaphore:
-            return await self._generate_with_retry(prompt, style_instruction, max_retries)
+            await report_progress("generating", 10)
+            return await self._generate_with_retry(plan, max_retries, model)
     
-    async def _generate_with_retry(
+    async def _generate_sectioned(
         self,
         prompt: str,
         style_instruction: str,
         max_retries: int,
+        model: Optional[str],
+        target_length: Optional[int],
+        style_key: Optional[tuple[int, int]] = None,
     ) -> str:
-        """带重试的生成逻辑
+        """先生成大纲,再并发生成各小节并拼接为完整Markdown
+        
+        每次LLM调用单独占用并发信号量,小节数超过信号量容量时排队执行。
+        大纲无法解析出至少两个小节时退回一次生成全文。
         
         Args:
             prompt: 用户输入
             style_instruction: 样式指令
-            max_retries: 最大重试次数
+            max_retries: 每次调用的最大重试次数
+            model: 指定模型
+            target_length: 全文目标字数
+            style_key: (样式ID, 样式版本)
             
         Returns:
-            生成的内容
+            拼接后的Markdown内容
         """
-        # 构建完整的Prompt
-        system_prompt = f"""你是一位专业的公众号文章写作助手。请根据用户的主题和要求,生成一篇高质量的公众号文章。
-
-写作风格要求: {style_instruction}
-
-请用Markdown格式输出文章内容,包括标题、段落、列表等。"""
+        outline_plan = PromptBuilder.build_outline(prompt, style_instruction, target_length, style_key)
+        with tracer.start_as_current_span("llm.outline"):
+            async with self._semaphore:
+                await report_progress("outlining", 5)
+                outline_text = await self._generate_with_retry(outline_plan, max_retries, model)
+        
+        title, sections = PromptBuilder.parse_outline(outline_text)
+        if len(sections) < 2:
+            logger.warning("大纲解析失败,退回一次生成全文")
+            plan = PromptBuilder.build(prompt, style_instruction, target_length, style_key)
+            async with self._semaphore:
+                await report_progress("generating", 10)
+                return await self._generate_with_retry(plan, max_retries, model)
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt},
-        ]
+        title = title or prompt[:50]
+        section_length = target_length // len(sections) if target_length else None
+        logger.info(f"大纲生成完成: {title},共 {len(sections)} 个小节,开始并发生成")
+        await report_progress("generating", 15, sections_done=0, sections_total=len(sections))
+        sections_done = 0
+        
+        async def generate_section(index: int, section: OutlineSection) -> str:
+            nonlocal sections_done
+            plan = PromptBuilder.build_section(
+                prompt, style_instruction, title, sections, index, section_length, style_key
+            )
+            with tracer.start_as_current_span("llm.section", attributes={"llm.section": index + 1}):
+                async with self._semaphore:
+                    body = await self._generate_with_retry(plan, max_retries, model)
+            sections_done += 1
+            await report_progress(
+                "generating",
+                15 + 65 * sections_done // len(sections),
+                sections_done=sections_done,
+                sections_total=len(sections),
+            )
+            return body
+        
+        tasks = [asyncio.create_task(generate_section(i, s)) for i, s in enumerate(sections)]
+        try:
+            bodies = await asyncio.gather(*tasks)
+        except BaseException:
+            # 任一小节失败时取消其余小节,避免继续消耗配额
+            for task in tasks:
+                task.cancel()
+            raise
         
+        return PromptBuilder.stitch_sections(title, sections, bodies)
+    
+    async def _generate_with_retry(
+        self,
+        plan: PromptPlan,
+        max_retries: int,
+        model: Optional[str] = None,
+    ) -> str:
+        """带重试的生成逻辑
+        
+        每次尝试由LLM网关在各后端间自动故障转移,全部后端失败后才计为一次失败。
+        
+        Args:
+            plan: 构建好的请求参数
+            max_retries: 最大重试次数
+            model: 指定模型
+            
+        Returns:
+            生成的内容
+        """
+        policy = RetryPolicy(settings.LLM_RETRY_BASE_DELAY, settings.LLM_RETRY_MAX_DELAY)
         last_error = None
+        wait_time = None
+        streamed_tokens = 0
+        
+        async def on_delta(text: str) -> None:
+            nonlocal streamed_tokens
+            tokens = PromptBuilder.estimate_tokens(text)
+            streamed_tokens += tokens
+            await report_progress("generating", tokens=tokens)
         
         for attempt in range(max_retries):
+            retry_after = None
             try:
                 logger.info(f"调用LLM生成文章(尝试 {attempt + 1}/{max_retries})")
                 
-                # 调用硅基流动API
-                async with httpx.AsyncClient(timeout=settings.LLM_TIMEOUT) as client:
-                    response = await client.post(
-                        f"{self.base_url}/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json",
-                        },
-                        json={
-                            "model": self.model,
-                            "messages": messages,
+                with tracer.start_as_current_span(
+                    "llm.attempt",
+                    attributes={
+                        "llm.attempt": attempt + 1,
+                        "llm.prompt_tokens_estimated": plan.prompt_tokens,
+                        "llm.max_tokens": plan.max_tokens,
+                    },
+                ) as span:
+                    call = await llm_gateway.chat_completion(
+                        {
+                            "messages": plan.messages,
                             "temperature": 0.7,
-                            "max_tokens": 4000,
+                            "max_tokens": plan.max_tokens,
                         },
+                        self.api_key,
+                        provider=self.provider,
+                        model=model,
+                        prefix=plan.prefix,
+                        on_delta=on_delta if settings.LLM_STREAM_PROGRESS else None,
                     )
-                    response.raise_for_status()
-                    result = response.json()
+                    span.set_attribute("llm.backend", call.backend.name)
+                    span.set_attribute("llm.model", call.model)
+                    self._record_usage(call.result.get("usage"), plan.prompt_tokens, call.latency_ms, span)
                 
                 # 提取生成的内容
-                content = result["choices"][0]["message"]["content"]
-                logger.info(f"文章生成成功,长度: {len(content)} 字符")
+                content = call.result["choices"][0]["message"]["content"]
+                usage = call.result.get("usage") or {}
+                # 生成过程中按估算值推送,完成后按实际用量校正(含失败尝试与对冲请求的部分输出)
+                completion_tokens = usage.get("completion_tokens") or PromptBuilder.estimate_tokens(content)
+                await report_progress("generating", tokens=completion_tokens - streamed_tokens)
+                logger.info(
+                    f"文章生成成功,长度: {len(content)} 字符,"
+                    f"后端: {call.backend.name},耗时: {call.latency_ms:.0f}ms"
+                )
                 
                 return content
             
+            except CircuitOpenError as e:
+                # 所有后端均在熔断中,快速失败而不是等待超时
+                logger.error(f"LLM服务熔断中: {e}")
+                raise Exception(f"LLM服务暂时不可用,请 {e.retry_in:.0f} 秒后重试") from e
+            
             except httpx.HTTPStatusError as e:
                 last_error = e
                 
@@ -118,11 +236,20 @@ class MCPService:
                     logger.error(error_msg)
                     raise Exception(error_msg)
                 
-                elif e.response.status_code == 429:
+                elif self.is_quota_error(e.response):
                     error_msg = "API配额耗尽,请充值后重试"
                     logger.error(error_msg)
                     raise Exception(error_msg)
                 
+                elif e.response.status_code == 429:
+                    # 短时限流: 按 Retry-After 等待后重试,等待时间过长时直接失败
+                    retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                    if retry_after is not None and retry_after > settings.LLM_RETRY_MAX_DELAY:
+                        error_msg = f"LLM请求过于频繁,请 {retry_after:.0f} 秒后重试"
+                        logger.error(error_msg)
+                        raise Exception(error_msg)
+                    logger.warning(f"LLM请求被限流,Retry-After: {retry_after}")
+                
                 else:
                     logger.warning(f"HTTP错误 {e.response.status_code}: {e}")
             
@@ -134,10 +261,10 @@ class MCPService:
                 last_error = e
                 logger.warning(f"生成失败: {e}")
             
-            # 重试前等待(指数退避)
+            # 重试前等待(去相关抖动退避,限流时遵循Retry-After)
             if attempt < max_retries - 1:
-                wait_time = 2 ** attempt
-                logger.info(f"等待 {wait_time} 秒后重试...")
+                wait_time = policy.next_delay(wait_time, retry_after)
+                logger.info(f"等待 {wait_time:.1f} 秒后重试...")
                 await asyncio.sleep(wait_time)
         
         # 所有重试都失败
@@ -145,16 +272,73 @@ class MCPService:
         logger.error(error_msg)
         raise Exception(error_msg)
     
+    @staticmethod
+    def is_quota_error(response: httpx.Response) -> bool:
+        """判断是否为配额/余额不足错误
+        
+        402 一律视为配额错误;429 需根据错误体区分配额耗尽与短时限流。
+        
+        Args:
+            response: 上游错误响应
+            
+        Returns:
+            是否为配额错误
+        """
+        if response.status_code == 402:
+            return True
+        if response.status_code != 429:
+            return False
+        try:
+            body = response.text.lower()
+        except Exception:
+            return False
+        return any(marker in body for marker in QUOTA_ERROR_MARKERS)
+    
+    @staticmethod
+    def _record_usage(usage: Optional[dict], estimated_prompt_tokens: int, latency_ms: float, span) -> None:
+        """记录响应中的Token用量,用于成本与延迟分析
+        
+        Args:
+            usage: 响应的 usage 字段(部分提供商不返回)
+            estimated_prompt_tokens: 本地估算的输入Token数
+            latency_ms: 调用耗时(毫秒)
+            span: 当前追踪span
+        """
+        cached_tokens = PromptTemplates.cached_tokens(usage)
+        record_llm_usage(usage, cached_tokens)
+        if not usage:
+            logger.info(f"LLM响应未返回usage,估算输入Token: {estimated_prompt_tokens}")
+            return
+        
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        span.set_attribute("llm.prompt_tokens", prompt_tokens)
+        span.set_attribute("llm.completion_tokens", completion_tokens)
+        span.set_attribute("llm.cached_tokens", cached_tokens)
+        PromptCacheStats.record(prompt_tokens, cached_tokens, latency_ms)
+        
+        tokens_per_second = completion_tokens / (latency_ms / 1000) if latency_ms > 0 else 0
+        logger.info(
+            f"LLM Token用量: 输入 {prompt_tokens}(估算 {estimated_prompt_tokens},命中缓存 {cached_tokens}),"
+            f"输出 {completion_tokens},合计 {usage.get('total_tokens', prompt_tokens + completion_tokens)},"
+            f"生成速度 {tokens_per_second:.1f} tokens/s"
+        )
+    
     async def validate_api_key(self) -> bool:
         """验证API Key是否有效
         
         Returns:
             API Key是否有效
         """
+        backend = llm_gateway.primary_backend(self.provider)
+        if backend is None:
+            logger.error(f"API Key验证失败: 未配置提供商 {self.provider} 的LLM后端")
+            return False
+        
         try:
             async with httpx.AsyncClient(timeout=10.0) as client:
                 response = await client.get(
-                    f"{self.base_url}/models",
+                    f"{backend.base_url}/models",
                     headers={"Authorization": f"Bearer {self.api_key}"},
                 )
                 response.raise_for_status()
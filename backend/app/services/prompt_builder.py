@@ -0,0 +1,290 @@
+"""Prompt构建服务 - 本地估算Token数,控制输入长度与输出上限"""
+import math
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.prompt_templates import PromptTemplates, SystemPrefix
+
+# CJK统一表意文字、全角标点等,中文模型的分词器中大致一字一Token
+_CJK_PATTERN = re.compile("[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+# 截断时优先在这些位置断开
+_BREAK_CHARS = "\n。！？；.!?;"
+
+# 每条消息的格式开销(role标记、分隔符等)
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+_tiktoken_encoding = None
+
+
+def _get_tiktoken_encoding():
+    """懒加载tiktoken编码器,未安装时返回None"""
+    global _tiktoken_encoding
+    if _tiktoken_encoding is None:
+        try:
+            import tiktoken
+        except ImportError:
+            logger.warning("未安装tiktoken,改用启发式Token估算")
+            return None
+        _tiktoken_encoding = tiktoken.get_encoding(settings.LLM_TIKTOKEN_ENCODING)
+    return _tiktoken_encoding
+
+
+# 大纲中的小节标题行
+_SECTION_HEADING = re.compile(r"^##\s+(.+?)\s*$")
+
+
+@dataclass
+class OutlineSection:
+    """大纲中的一个小节"""
+    heading: str
+    points: list[str]
+
+
+@dataclass
+class PromptPlan:
+    """构建好的请求参数"""
+    messages: list[dict]
+    max_tokens: int
+    prompt_tokens: int  # 估算的输入Token数
+    truncated: bool  # 用户输入是否被截断
+    prefix: Optional[SystemPrefix] = None  # 系统提示的稳定前缀(用于提供商前缀缓存)
+
+
+class PromptBuilder:
+    """Prompt构建类"""
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """估算文本的Token数
+
+        LLM_TOKENIZER 为 tiktoken 且已安装时精确计数;
+        否则按 CJK字符每字1个Token、其他字符每4个约1个Token 估算(偏保守)。
+
+        Args:
+            text: 文本
+
+        Returns:
+            估算的Token数
+        """
+        if not text:
+            return 0
+        if settings.LLM_TOKENIZER == "tiktoken":
+            encoding = _get_tiktoken_encoding()
+            if encoding is not None:
+                return len(encoding.encode(text))
+
+        cjk_count = len(_CJK_PATTERN.findall(text))
+        return cjk_count + math.ceil((len(text) - cjk_count) / 4)
+
+    @staticmethod
+    def truncate(text: str, max_tokens: int) -> str:
+        """按Token预算截断文本,尽量在句子或换行处断开
+
+        Args:
+            text: 原文本
+            max_tokens: Token预算
+
+        Returns:
+            截断后的文本(未超出预算时原样返回)
+        """
+        if PromptBuilder.estimate_tokens(text) <= max_tokens:
+            return text
+
+        # 二分查找不超出预算的最长前缀
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if PromptBuilder.estimate_tokens(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        prefix = text[:low]
+
+        # 在末尾20%范围内寻找断句位置
+        cut = max(prefix.rfind(ch) for ch in _BREAK_CHARS)
+        if cut >= len(prefix) * 0.8:
+            prefix = prefix[:cut + 1]
+        return prefix.rstrip()
+
+    @staticmethod
+    def output_tokens_for_length(target_length: int) -> int:
+        """根据目标字数估算需要的输出Token数
+
+        Args:
+            target_length: 目标字数
+
+        Returns:
+            输出Token数(含Markdown标记与长度浮动余量)
+        """
+        return math.ceil(target_length * settings.LLM_OUTPUT_TOKEN_MARGIN) + settings.LLM_OUTPUT_TOKEN_RESERVE
+
+    @staticmethod
+    def build(
+        prompt: str,
+        style_instruction: str,
+        target_length: Optional[int] = None,
+        style_key: Optional[tuple[int, int]] = None,
+    ) -> PromptPlan:
+        """构建文章生成请求
+
+        Args:
+            prompt: 用户输入的主题/关键词
+            style_instruction: 样式风格指令
+            target_length: 目标字数,为空时不限制
+            style_key: (样式ID, 样式版本),用于复用系统提示前缀
+
+        Returns:
+            请求参数
+        """
+        prefix = PromptTemplates.prefix("article", style_instruction, style_key)
+        length_requirement = f"文章正文长度约 {target_length} 字。" if target_length else ""
+
+        max_tokens = settings.LLM_MAX_OUTPUT_TOKENS
+        if target_length:
+            max_tokens = min(max_tokens, PromptBuilder.output_tokens_for_length(target_length))
+        return PromptBuilder._plan(prefix, length_requirement, prompt, max_tokens)
+
+    @staticmethod
+    def _plan(prefix: SystemPrefix, variable: str, prompt: str, max_tokens: int) -> PromptPlan:
+        """拼接系统提示(稳定前缀在前,每次变化的内容在后),截断用户输入并按上下文窗口限制输出上限"""
+        system_prompt = f"{prefix.text}\n\n{variable}" if variable else prefix.text
+        user_prompt = PromptBuilder.truncate(prompt, settings.LLM_MAX_INPUT_TOKENS)
+        truncated = len(user_prompt) < len(prompt)
+        if truncated:
+            logger.warning(f"用户输入超出 {settings.LLM_MAX_INPUT_TOKENS} Token,已截断: {len(prompt)} -> {len(user_prompt)} 字符")
+
+        prompt_tokens = (
+            PromptBuilder.estimate_tokens(system_prompt)
+            + PromptBuilder.estimate_tokens(user_prompt)
+            + 2 * _MESSAGE_OVERHEAD_TOKENS
+        )
+        # 不超出上下文窗口剩余空间
+        max_tokens = max(1, min(max_tokens, settings.LLM_CONTEXT_WINDOW - prompt_tokens))
+
+        return PromptPlan(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=max_tokens,
+            prompt_tokens=prompt_tokens,
+            truncated=truncated,
+            prefix=prefix,
+        )
+
+    @staticmethod
+    def build_outline(
+        prompt: str,
+        style_instruction: str,
+        target_length: Optional[int] = None,
+        style_key: Optional[tuple[int, int]] = None,
+    ) -> PromptPlan:
+        """构建大纲生成请求(分节生成模式的第一步)
+
+        Args:
+            prompt: 用户输入的主题/关键词
+            style_instruction: 样式风格指令
+            target_length: 全文目标字数
+            style_key: (样式ID, 样式版本),用于复用系统提示前缀
+
+        Returns:
+            请求参数
+        """
+        prefix = PromptTemplates.prefix("outline", style_instruction, style_key)
+        length_requirement = f"全文计划约 {target_length} 字,请据此安排小节数量。" if target_length else ""
+        return PromptBuilder._plan(prefix, length_requirement, prompt, settings.LLM_OUTLINE_MAX_TOKENS)
+
+    @staticmethod
+    def parse_outline(text: str) -> tuple[Optional[str], list[OutlineSection]]:
+        """解析大纲文本
+
+        Args:
+            text: 模型输出的大纲
+
+        Returns:
+            (文章标题, 小节列表),超出 LLM_SECTION_MAX 的小节被丢弃
+        """
+        title: Optional[str] = None
+        sections: list[OutlineSection] = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            heading = _SECTION_HEADING.match(line)
+            if heading:
+                sections.append(OutlineSection(heading=heading.group(1), points=[]))
+            elif line.startswith("# ") and title is None and not sections:
+                title = line[2:].strip()
+            elif sections and line[0] in "-*":
+                sections[-1].points.append(line[1:].strip())
+        return title, sections[:settings.LLM_SECTION_MAX]
+
+    @staticmethod
+    def build_section(
+        prompt: str,
+        style_instruction: str,
+        title: str,
+        sections: list[OutlineSection],
+        index: int,
+        target_length: Optional[int] = None,
+        style_key: Optional[tuple[int, int]] = None,
+    ) -> PromptPlan:
+        """构建单个小节的生成请求
+
+        请求中包含完整大纲,使各小节在并发生成时仍能保持衔接、避免内容重复。
+        大纲与本节分工位于系统提示前缀之后,同一文章的各小节共享前缀缓存。
+
+        Args:
+            prompt: 用户输入的主题/关键词
+            style_instruction: 样式风格指令
+            title: 文章标题
+            sections: 全部小节
+            index: 本小节序号
+            target_length: 本小节目标字数
+            style_key: (样式ID, 样式版本),用于复用系统提示前缀
+
+        Returns:
+            请求参数
+        """
+        prefix = PromptTemplates.prefix("section", style_instruction, style_key)
+        section = sections[index]
+        outline = "\n".join(f"{i + 1}. {s.heading}" for i, s in enumerate(sections))
+        points = "\n".join(f"- {p}" for p in section.points) or "- 围绕小节标题展开"
+        length_requirement = f"\n本节长度约 {target_length} 字。" if target_length else ""
+        assignment = f"""文章标题: {title}
+文章大纲:
+{outline}
+
+你负责第 {index + 1} 节「{section.heading}」,要点:
+{points}
+{length_requirement}"""
+
+        max_tokens = settings.LLM_MAX_OUTPUT_TOKENS
+        if target_length:
+            max_tokens = min(max_tokens, PromptBuilder.output_tokens_for_length(target_length))
+        return PromptBuilder._plan(prefix, assignment.rstrip(), prompt, max_tokens)
+
+    @staticmethod
+    def stitch_sections(title: str, sections: list[OutlineSection], bodies: list[str]) -> str:
+        """将各小节正文拼接为完整Markdown
+
+        Args:
+            title: 文章标题
+            sections: 小节列表
+            bodies: 与小节一一对应的正文
+
+        Returns:
+            完整的Markdown内容
+        """
+        parts = [f"# {title}"]
+        for section, body in zip(sections, bodies):
+            lines = body.strip().splitlines()
+            # 模型偶尔仍会输出本节标题,去掉重复的标题行
+            if lines and lines[0].lstrip().startswith("#"):
+                lines = lines[1:]
+            parts.append(f"## {section.heading}\n\n" + "\n".join(lines).strip())
+        return "\n\n".join(parts) + "\n"
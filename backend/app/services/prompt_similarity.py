@@ -0,0 +1,158 @@
+"""相似Prompt检测服务 - 按用户索引历史Prompt,生成前查找近似重复的文章"""
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.db import async_session_maker
+from app.core.logging import logger
+from app.models.article import Article, ArticleStatus
+from app.models.prompt_signature import PromptBucket, PromptSignature
+from app.schemas.article import SimilarArticle
+from app.utils import minhash
+
+# 启动时补建签名的批大小
+_BACKFILL_BATCH_SIZE = 500
+
+# 没有正文的文章不参与相似检测
+_UNGENERATED_STATUSES = (ArticleStatus.GENERATING, ArticleStatus.GENERATION_FAILED)
+
+
+class PromptSimilarityService:
+    """相似Prompt检测服务类
+
+    每篇生成成功的文章保存一份Prompt的MinHash签名,并按LSH分段写入 prompt_buckets。
+    查询时只取与新Prompt至少共享一个桶的文章(一次索引查询),再用签名估计相似度过滤。
+    """
+
+    @staticmethod
+    def index(session: AsyncSession, article: Article) -> bool:
+        """为文章的Prompt建立签名(不提交)
+
+        Args:
+            session: 数据库会话
+            article: 已分配ID的文章(或含 id/user_id/prompt_input 的查询行)
+
+        Returns:
+            是否建立了签名(Prompt只含标点等无效字符时不建立)
+        """
+        sig = minhash.signature(article.prompt_input)
+        if not sig:
+            return False
+        session.add(PromptSignature(article_id=article.id, user_id=article.user_id, signature=minhash.pack(sig)))
+        session.add_all(
+            PromptBucket(user_id=article.user_id, bucket=bucket, article_id=article.id)
+            for bucket in minhash.buckets(sig)
+        )
+        return True
+
+    @staticmethod
+    async def remove(session: AsyncSession, article_id: int) -> None:
+        """删除文章的签名(不提交)
+
+        Args:
+            session: 数据库会话
+            article_id: 文章ID
+        """
+        await session.execute(delete(PromptBucket).where(PromptBucket.article_id == article_id))
+        await session.execute(delete(PromptSignature).where(PromptSignature.article_id == article_id))
+
+    @staticmethod
+    async def find_similar(
+        session: AsyncSession,
+        user_id: int,
+        prompt: str,
+        style_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[SimilarArticle]:
+        """查找用户以前生成过的近似文章
+
+        Args:
+            session: 数据库会话
+            user_id: 用户ID
+            prompt: 新的Prompt
+            style_id: 只返回使用该样式的文章,为空时不限
+            limit: 最多返回数量,默认 PROMPT_SIMILARITY_MAX_CANDIDATES
+
+        Returns:
+            相似度不低于 PROMPT_SIMILARITY_THRESHOLD 的文章,按相似度从高到低排序
+        """
+        sig = minhash.signature(prompt)
+        if not sig:
+            return []
+
+        candidates = (
+            select(PromptBucket.article_id)
+            .where(PromptBucket.user_id == user_id, PromptBucket.bucket.in_(minhash.buckets(sig)))
+            .distinct()
+        )
+        # 只取列表所需的列,不加载正文
+        query = (
+            select(
+                Article.id, Article.title, Article.prompt_input, Article.style_id,
+                Article.status, Article.created_at, PromptSignature.signature,
+            )
+            .join(PromptSignature, PromptSignature.article_id == Article.id)
+            .where(Article.id.in_(candidates), Article.status.not_in(_UNGENERATED_STATUSES))
+        )
+        if style_id is not None:
+            query = query.where(Article.style_id == style_id)
+        result = await session.execute(query)
+
+        matches = []
+        for row in result.all():
+            score = minhash.similarity(sig, minhash.unpack(row.signature))
+            if score >= settings.PROMPT_SIMILARITY_THRESHOLD:
+                matches.append(SimilarArticle(
+                    id=row.id,
+                    title=row.title,
+                    prompt_input=row.prompt_input,
+                    style_id=row.style_id,
+                    status=row.status,
+                    created_at=row.created_at,
+                    similarity=score,
+                ))
+        matches.sort(key=lambda m: (m.similarity, m.created_at), reverse=True)
+        return matches[:limit or settings.PROMPT_SIMILARITY_MAX_CANDIDATES]
+
+    @staticmethod
+    async def backfill() -> int:
+        """为尚无签名的已生成文章补建签名
+
+        多个worker同时执行时,主键冲突的批次会回滚并跳过(已由其他worker完成)。
+
+        Returns:
+            补建的签名数量
+        """
+        indexed = 0
+        last_id = 0
+        while True:
+            async with async_session_maker() as session:
+                result = await session.execute(
+                    select(Article.id, Article.user_id, Article.prompt_input)
+                    .outerjoin(PromptSignature, PromptSignature.article_id == Article.id)
+                    .where(
+                        PromptSignature.article_id.is_(None),
+                        Article.id > last_id,
+                        Article.status.not_in(_UNGENERATED_STATUSES),
+                        Article.content_raw != "",
+                    )
+                    .order_by(Article.id)
+                    .limit(_BACKFILL_BATCH_SIZE)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                count = sum(PromptSimilarityService.index(session, row) for row in rows)
+                try:
+                    await session.commit()
+                    indexed += count
+                except IntegrityError:
+                    await session.rollback()
+        if indexed:
+            logger.info(f"已补建 {indexed} 个Prompt签名")
+        return indexed
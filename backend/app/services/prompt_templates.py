@@ -0,0 +1,239 @@
+"""Prompt模板服务 - 稳定的系统提示前缀与提供商前缀缓存提示
+
+支持前缀缓存的提供商(OpenAI、DeepSeek、SiliconFlow、Anthropic兼容网关等)只有在请求开头的
+内容逐字节一致时才能命中缓存。系统提示按 角色 → 样式指令 → 任务说明 的固定顺序拼成前缀,
+字数要求、大纲等每次变化的内容一律放在前缀之后。同一 (样式ID, 样式版本, 任务类型) 的前缀
+只构建一次,不同任务类型共享 角色+样式指令 部分。
+"""
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from app.core.config import settings
+
+# 模板文本变更时递增,使旧的缓存键失效
+TEMPLATE_VERSION = 1
+
+# 通用写作角色
+ROLE = "你是一位专业的公众号文章写作助手。"
+
+# 各任务类型的说明(位于样式指令之后)
+_TASKS = {
+    "article": (
+        "请根据用户的主题和要求,生成一篇高质量的公众号文章。\n"
+        "请用Markdown格式输出文章内容,包括标题、段落、列表等。"
+    ),
+    "outline": (
+        "请根据用户的主题和要求,为一篇公众号文章拟定大纲。\n"
+        "只输出大纲,格式如下,包含 3 到 {section_max} 个小节,不要输出正文:\n"
+        "# 文章标题\n"
+        "## 小节标题\n"
+        "- 本节要点"
+    ),
+    "section": (
+        "你正在与其他写作者分工完成一篇公众号文章,只负责其中一个小节。\n"
+        "请用Markdown格式只输出本节正文,不要输出本节标题,不要重复其他小节的内容。"
+    ),
+}
+
+# 前缀缓存提示方式
+CACHE_HINT_NONE = "none"  # 只保证前缀稳定(DeepSeek、SiliconFlow等自动缓存)
+CACHE_HINT_PROMPT_CACHE_KEY = "prompt_cache_key"  # OpenAI: 按缓存键路由到同一缓存
+CACHE_HINT_CACHE_CONTROL = "cache_control"  # Anthropic兼容: 在前缀末尾标记缓存断点
+
+# 未在后端配置中指定 prompt_cache 时按提供商选择
+_DEFAULT_CACHE_HINTS = {
+    "openai": CACHE_HINT_PROMPT_CACHE_KEY,
+    "anthropic": CACHE_HINT_CACHE_CONTROL,
+    "openrouter": CACHE_HINT_CACHE_CONTROL,
+}
+
+
+@dataclass(frozen=True)
+class SystemPrefix:
+    """构建好的系统提示前缀"""
+    kind: str  # 任务类型: article/outline/section
+    style_id: Optional[int]
+    style_version: Optional[int]
+    text: str
+    digest: str  # 前缀文本的哈希
+
+    @property
+    def cache_key(self) -> str:
+        """提供商缓存键(同一前缀的请求使用同一键)"""
+        style = f"s{self.style_id}v{self.style_version}" if self.style_id is not None else "adhoc"
+        return f"{self.kind}:{style}:t{TEMPLATE_VERSION}:{self.digest[:12]}"
+
+
+class PromptTemplates:
+    """Prompt模板类"""
+
+    _prefixes: "OrderedDict[tuple, SystemPrefix]" = OrderedDict()
+    _lock = Lock()
+
+    @staticmethod
+    def _build(kind: str, style_instruction: str, style_id: Optional[int], style_version: Optional[int]) -> SystemPrefix:
+        task = _TASKS[kind].format(section_max=settings.LLM_SECTION_MAX)
+        text = f"{ROLE}\n\n写作风格要求: {style_instruction}\n\n{task}"
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return SystemPrefix(kind=kind, style_id=style_id, style_version=style_version, text=text, digest=digest)
+
+    @classmethod
+    def prefix(
+        cls,
+        kind: str,
+        style_instruction: str,
+        style_key: Optional[tuple[int, int]] = None,
+    ) -> SystemPrefix:
+        """获取系统提示前缀
+
+        Args:
+            kind: 任务类型: article/outline/section
+            style_instruction: 样式风格指令
+            style_key: (样式ID, 样式版本),修改样式指令会增加版本号;为空时不缓存
+
+        Returns:
+            系统提示前缀
+        """
+        if style_key is None or settings.PROMPT_PREFIX_CACHE_SIZE <= 0:
+            return cls._build(kind, style_instruction, None, None)
+
+        key = (kind, *style_key, settings.LLM_SECTION_MAX)
+        with cls._lock:
+            prefix = cls._prefixes.get(key)
+            if prefix is not None:
+                cls._prefixes.move_to_end(key)
+                return prefix
+
+        prefix = cls._build(kind, style_instruction, *style_key)
+        with cls._lock:
+            cls._prefixes[key] = prefix
+            while len(cls._prefixes) > settings.PROMPT_PREFIX_CACHE_SIZE:
+                cls._prefixes.popitem(last=False)
+        return prefix
+
+    @staticmethod
+    def cache_hint(provider: str, configured: Optional[str] = None) -> str:
+        """确定后端使用的前缀缓存提示方式
+
+        Args:
+            provider: 后端所属提供商
+            configured: 后端配置中的 prompt_cache,为空时按提供商选择
+
+        Returns:
+            CACHE_HINT_* 之一
+        """
+        if not settings.PROMPT_CACHE_HINTS_ENABLED:
+            return CACHE_HINT_NONE
+        return configured or _DEFAULT_CACHE_HINTS.get(provider, CACHE_HINT_NONE)
+
+    @staticmethod
+    def apply_cache_hint(payload: dict, prefix: Optional[SystemPrefix], hint: str) -> dict:
+        """按提示方式改写请求体(不修改原请求体)
+
+        Args:
+            payload: 请求体,第一条消息为以前缀开头的系统提示
+            prefix: 系统提示前缀,为空时原样返回
+            hint: CACHE_HINT_* 之一
+
+        Returns:
+            改写后的请求体
+        """
+        if prefix is None or hint == CACHE_HINT_NONE:
+            return payload
+        if hint == CACHE_HINT_PROMPT_CACHE_KEY:
+            return {**payload, "prompt_cache_key": prefix.cache_key}
+        if hint == CACHE_HINT_CACHE_CONTROL:
+            messages = payload["messages"]
+            system = messages[0]["content"]
+            if not isinstance(system, str) or not system.startswith(prefix.text):
+                return payload
+            # 前缀单独作为一个内容块并标记缓存断点,其余内容不参与缓存
+            blocks = [{"type": "text", "text": prefix.text, "cache_control": {"type": "ephemeral"}}]
+            rest = system[len(prefix.text):]
+            if rest:
+                blocks.append({"type": "text", "text": rest})
+            return {**payload, "messages": [{**messages[0], "content": blocks}, *messages[1:]]}
+        return payload
+
+    @staticmethod
+    def cached_tokens(usage: Optional[dict]) -> int:
+        """从响应的usage中读取命中缓存的输入Token数
+
+        兼容 OpenAI/SiliconFlow(prompt_tokens_details.cached_tokens)、
+        DeepSeek(prompt_cache_hit_tokens) 与 Anthropic兼容网关(cache_read_input_tokens)。
+
+        Args:
+            usage: 响应的 usage 字段
+
+        Returns:
+            命中缓存的Token数,未返回时为0
+        """
+        if not usage:
+            return 0
+        details = usage.get("prompt_tokens_details") or {}
+        return (
+            details.get("cached_tokens")
+            or usage.get("prompt_cache_hit_tokens")
+            or usage.get("cache_read_input_tokens")
+            or 0
+        )
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空前缀缓存(测试用)"""
+        with cls._lock:
+            cls._prefixes.clear()
+
+
+class PromptCacheStats:
+    """前缀缓存命中统计(进程内),按缓存命中与否分别累计延迟,用于评估节省的成本与延迟"""
+
+    _lock = Lock()
+    calls = 0
+    hit_calls = 0  # 至少命中部分缓存的调用数
+    prompt_tokens = 0
+    cached_tokens = 0
+    hit_latency_ms = 0.0
+    miss_latency_ms = 0.0
+
+    @classmethod
+    def record(cls, prompt_tokens: int, cached_tokens: int, latency_ms: float) -> None:
+        """记录一次调用"""
+        with cls._lock:
+            cls.calls += 1
+            cls.prompt_tokens += prompt_tokens
+            cls.cached_tokens += cached_tokens
+            if cached_tokens:
+                cls.hit_calls += 1
+                cls.hit_latency_ms += latency_ms
+            else:
+                cls.miss_latency_ms += latency_ms
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """当前统计
+
+        Returns:
+            调用数、缓存Token占比,以及命中/未命中缓存时的平均延迟(毫秒)
+        """
+        with cls._lock:
+            miss_calls = cls.calls - cls.hit_calls
+            return {
+                "calls": cls.calls,
+                "hit_calls": cls.hit_calls,
+                "prompt_tokens": cls.prompt_tokens,
+                "cached_tokens": cls.cached_tokens,
+                "cached_ratio": round(cls.cached_tokens / cls.prompt_tokens, 4) if cls.prompt_tokens else 0.0,
+                "avg_hit_latency_ms": round(cls.hit_latency_ms / cls.hit_calls, 1) if cls.hit_calls else None,
+                "avg_miss_latency_ms": round(cls.miss_latency_ms / miss_calls, 1) if miss_calls else None,
+            }
+
+    @classmethod
+    def reset(cls) -> None:
+        """清空统计(测试用)"""
+        with cls._lock:
+            cls.calls = cls.hit_calls = cls.prompt_tokens = cls.cached_tokens = 0
+            cls.hit_latency_ms = cls.miss_latency_ms = 0.0
@@ -0,0 +1,250 @@
+"""样式缓存服务 - 系统样式进程内常驻,自定义样式Redis读穿缓存"""
+import json
+from typing import Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import get_redis, mark_redis_unavailable, redis_available
+from app.models.style import Style
+
+# 按ID读取当前版本的样式: KEYS[1] 为版本指针键,数据键为 "<指针键>:v<版本号>"
+# 一次往返同时完成版本解析与数据读取
+_GET_CURRENT_SCRIPT = """
+local version = redis.call('GET', KEYS[1])
+if not version then
+    return false
+end
+return redis.call('GET', KEYS[1] .. ':v' .. version)
+"""
+
+# 写入样式缓存: KEYS[1] 为版本指针键,KEYS[2] 为数据键, ARGV 为 (版本号, 数据, 过期秒数)
+# 指针只允许前进,读到旧数据的请求晚于样式更新写回时不会覆盖新版本
+_STORE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]))
+local version = tonumber(ARGV[1])
+if current and current > version then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+
+class StyleCache:
+    """样式缓存类
+
+    - 系统样式几乎不变,启动时加载到进程内存
+    - 自定义样式按 (style_id, version) 缓存在Redis,另有版本指针指向当前版本
+    - 每个用户的自定义样式列表单独缓存,增删改时失效
+    """
+
+    # 系统样式(进程内)
+    _system_styles: dict[int, Style] = {}
+    _system_loaded: bool = False
+
+    _get_current_script = None
+    _store_script = None
+
+    @staticmethod
+    def _pointer_key(style_id: int) -> str:
+        return f"style:{style_id}"
+
+    @staticmethod
+    def _data_key(style_id: int, version: int) -> str:
+        return f"style:{style_id}:v{version}"
+
+    @staticmethod
+    def _user_list_key(user_id: int) -> str:
+        return f"styles:user:{user_id}"
+
+    @staticmethod
+    def _dump(style: Style) -> str:
+        return json.dumps(style.model_dump(mode="json"), ensure_ascii=False)
+
+    @staticmethod
+    def _load(data: str) -> Style:
+        return Style.model_validate(json.loads(data))
+
+    @classmethod
+    async def preload_system_styles(cls, session: AsyncSession) -> int:
+        """加载系统样式到进程内存
+
+        Args:
+            session: 数据库会话
+
+        Returns:
+            加载的样式数量
+        """
+        result = await session.execute(select(Style).where(Style.is_system == True))
+        cls._system_styles = {style.id: style for style in result.scalars().all()}
+        cls._system_loaded = True
+        return len(cls._system_styles)
+
+    @classmethod
+    async def get_style(cls, session: AsyncSession, style_id: int) -> Optional[Style]:
+        """按ID获取样式(读穿缓存)
+
+        返回的对象不绑定会话,只能用于读取;需要修改样式时请直接查询数据库。
+
+        Args:
+            session: 数据库会话
+            style_id: 样式ID
+
+        Returns:
+            样式对象,不存在时返回None
+        """
+        style = cls._system_styles.get(style_id)
+        if style is not None:
+            return style
+
+        if redis_available():
+            try:
+                if cls._get_current_script is None:
+                    cls._get_current_script = get_redis().register_script(_GET_CURRENT_SCRIPT)
+                cached = await cls._get_current_script(keys=[cls._pointer_key(style_id)])
+                if cached:
+                    return cls._load(cached)
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+        result = await session.execute(select(Style).where(Style.id == style_id))
+        style = result.scalar_one_or_none()
+        if style is not None:
+            await cls._store(style)
+        return style
+
+    @classmethod
+    async def get_style_version(cls, session: AsyncSession, style_id: int, version: int) -> Optional[Style]:
+        """获取指定版本的样式
+
+        只保存当前版本,请求的版本已过期时返回None
+
+        Args:
+            session: 数据库会话
+            style_id: 样式ID
+            version: 样式版本号
+
+        Returns:
+            样式对象
+        """
+        style = cls._system_styles.get(style_id)
+        if style is not None:
+            return style if style.version == version else None
+
+        if redis_available():
+            try:
+                cached = await get_redis().get(cls._data_key(style_id, version))
+                if cached:
+                    return cls._load(cached)
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+        style = await cls.get_style(session, style_id)
+        return style if style is not None and style.version == version else None
+
+    @classmethod
+    async def _store(cls, style: Style) -> None:
+        """写入缓存(版本数据 + 版本指针),版本号低于当前指针时放弃写入"""
+        if not redis_available():
+            return
+        try:
+            if cls._store_script is None:
+                cls._store_script = get_redis().register_script(_STORE_SCRIPT)
+            await cls._store_script(
+                keys=[cls._pointer_key(style.id), cls._data_key(style.id, style.version)],
+                args=[style.version, cls._dump(style), settings.STYLE_CACHE_TTL],
+            )
+        except (RedisError, OSError) as e:
+            mark_redis_unavailable(e)
+
+    @classmethod
+    async def list_styles(cls, session: AsyncSession, user_id: int) -> list[Style]:
+        """获取用户可用的样式列表(系统样式 + 用户自定义样式)
+
+        Args:
+            session: 数据库会话
+            user_id: 用户ID
+
+        Returns:
+            样式列表,系统样式在前,各自按创建时间倒序
+        """
+        if not cls._system_loaded:
+            await cls.preload_system_styles(session)
+        system_styles = sorted(cls._system_styles.values(), key=lambda s: s.created_at, reverse=True)
+
+        return system_styles + await cls._list_user_styles(session, user_id)
+
+    @classmethod
+    async def _list_user_styles(cls, session: AsyncSession, user_id: int) -> list[Style]:
+        """获取用户自定义样式列表(读穿缓存)"""
+        key = cls._user_list_key(user_id)
+
+        if redis_available():
+            try:
+                cached = await get_redis().get(key)
+                if cached is not None:
+                    return [Style.model_validate(item) for item in json.loads(cached)]
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+        result = await session.execute(
+            select(Style)
+            .where(Style.user_id == user_id, Style.is_system == False)
+            .order_by(Style.created_at.desc())
+        )
+        styles = list(result.scalars().all())
+
+        if redis_available():
+            try:
+                payload = json.dumps([s.model_dump(mode="json") for s in styles], ensure_ascii=False)
+                await get_redis().set(key, payload, ex=settings.STYLE_CACHE_TTL)
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+        return styles
+
+    @classmethod
+    async def invalidate(
+        cls,
+        style_id: Optional[int],
+        user_id: Optional[int],
+        version: Optional[int] = None,
+        new_version: Optional[int] = None,
+    ) -> None:
+        """样式变更后使缓存失效
+
+        传入 new_version 时版本指针不删除而是前移到新版本,此后读到旧版本的请求无法再写回缓存
+
+        Args:
+            style_id: 变更的样式ID(新建样式时为None)
+            user_id: 样式所属用户ID
+            version: 变更前的版本号
+            new_version: 变更后的版本号(删除样式时传 version + 1)
+        """
+        keys = []
+        if style_id is not None:
+            if new_version is None:
+                keys.append(cls._pointer_key(style_id))
+            if version is not None:
+                keys.append(cls._data_key(style_id, version))
+        if user_id is not None:
+            keys.append(cls._user_list_key(user_id))
+        if not keys and new_version is None:
+            return
+
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                if keys:
+                    pipe.delete(*keys)
+                if style_id is not None and new_version is not None:
+                    pipe.set(cls._pointer_key(style_id), new_version, ex=settings.STYLE_CACHE_TTL)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            # 删除失败时依赖TTL过期,记录日志便于排查
+            mark_redis_unavailable(e)
+            logger.warning(f"样式缓存失效失败,将在TTL后过期: {keys}")
@@ -1,16 +1,98 @@
-"""样式服务 - 处理Markdown到HTML的转换"""
-import re
-from typing import Optional
+"""样式服务 - 处理Markdown到HTML的转换
 
-import markdown
-from bs4 import BeautifulSoup
+markdown(含codehilite引用的Pygments)与bs4导入较慢,在首次使用时才导入,
+启动时可通过 StyleService.warm_up 预先加载。
+"""
+import re
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
 
+from app.core.config import settings
 from app.core.logging import logger
+from app.core.tracing import get_tracer
+from app.utils.markdown_blocks import block_hash, requires_full_render, split_blocks
+
+if TYPE_CHECKING:
+    import markdown
+
+tracer = get_tracer(__name__)
+
+MARKDOWN_EXTENSIONS = [
+    'extra',  # 支持表格、代码块等
+    'codehilite',  # 代码高亮
+    'toc',  # 目录
+]
+
+# 分块渲染时在每块末尾追加的哨兵段落,用于保留块与下一块之间的原始分隔符
+_SENTINEL_TEXT = "mdblocksentinel"
+_BLOCK_SENTINEL = f"<p>{_SENTINEL_TEXT}</p>"
+
+# 分块渲染时标题锚点ID的占位前缀,拼接后再按全文统一去重
+_ID_MARKER = "@@toc@@"
+_MARKED_ID = re.compile(r' id="@@toc@@([^"]*)"')
+
+# 标题提取
+_H1 = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+_H2 = re.compile(r'^##\s+(.+)$', re.MULTILINE)
+
+# 预热用的样例,覆盖代码高亮、表格与目录
+_WARM_UP_MARKDOWN = """# 预热
+
+| a | b |
+| - | - |
+| 1 | 2 |
+
+```python
+print("warm up")
+```
+"""
+
+
+def _marked_slugify(value: str, separator: str) -> str:
+    from markdown.extensions.toc import slugify
+
+    return _ID_MARKER + slugify(value, separator)
 
 
 class StyleService:
     """样式服务类"""
     
+    # 复用的Markdown转换器(扩展初始化开销较大;渲染为同步调用,单线程内复用是安全的)
+    _converter: Optional["markdown.Markdown"] = None
+    _block_converter: Optional["markdown.Markdown"] = None
+    
+    # 块级渲染缓存: 块哈希 -> HTML(LRU)
+    _block_cache: OrderedDict[str, str] = OrderedDict()
+    
+    @classmethod
+    def _convert(cls, markdown_content: str) -> str:
+        if cls._converter is None:
+            import markdown
+
+            cls._converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        return cls._converter.reset().convert(markdown_content)
+    
+    @classmethod
+    def _convert_block(cls, block: str) -> str:
+        """渲染单个块,返回带尾部分隔符、标题ID待定的HTML"""
+        if cls._block_converter is None:
+            import markdown
+            from markdown.extensions.toc import TocExtension
+
+            cls._block_converter = markdown.Markdown(extensions=[
+                'extra',
+                'codehilite',
+                TocExtension(slugify=_marked_slugify),
+            ])
+        html = cls._block_converter.reset().convert(f"{block}\n\n{_SENTINEL_TEXT}")
+        return html[:-len(_BLOCK_SENTINEL)]
+    
+    @classmethod
+    def warm_up(cls) -> None:
+        """预热: 导入markdown/Pygments并初始化转换器,避免首个请求承担这部分开销"""
+        cls._convert(_WARM_UP_MARKDOWN)
+        cls._convert_block(_WARM_UP_MARKDOWN)
+    
     @staticmethod
     def markdown_to_html(markdown_content: str, css_content: str) -> str:
         """将Markdown转换为带样式的HTML
@@ -22,16 +104,80 @@ class StyleService:
         Returns:
             渲染后的HTML
         """
-        # 使用markdown库转换
-        html_content = markdown.markdown(
-            markdown_content,
-            extensions=[
-                'extra',  # 支持表格、代码块等
-                'codehilite',  # 代码高亮
-                'toc',  # 目录
-            ]
+        return StyleService.wrap_html(StyleService.render_body(markdown_content), css_content)
+    
+    @classmethod
+    def render_body(cls, markdown_content: str) -> str:
+        """整篇渲染Markdown正文(不含样式外壳)
+        
+        Args:
+            markdown_content: Markdown内容
+            
+        Returns:
+            正文HTML
+        """
+        with tracer.start_as_current_span(
+            "markdown.to_html",
+            attributes={"markdown.length": len(markdown_content)},
+        ):
+            return cls._convert(markdown_content)
+    
+    @classmethod
+    def render_body_incremental(cls, markdown_content: str) -> str:
+        """分块渲染Markdown正文,只重新渲染缓存中没有的块
+        
+        编辑长文时大部分块不变,自动保存只需渲染改动的块。输出与整篇渲染一致:
+        标题锚点ID在拼接后按全文顺序去重;含引用式链接、脚注等跨块语法时退回整篇渲染。
+        
+        Args:
+            markdown_content: Markdown内容
+            
+        Returns:
+            正文HTML
+        """
+        blocks = split_blocks(markdown_content)
+        if requires_full_render(blocks):
+            return cls.render_body(markdown_content)
+        
+        rendered = []
+        misses = 0
+        with tracer.start_as_current_span(
+            "markdown.render_blocks",
+            attributes={"markdown.blocks": len(blocks)},
+        ) as span:
+            for block in blocks:
+                key = block_hash(block)
+                html = cls._block_cache.get(key)
+                if html is None:
+                    misses += 1
+                    html = cls._convert_block(block)
+                    cls._block_cache[key] = html
+                    if len(cls._block_cache) > settings.MARKDOWN_BLOCK_CACHE_SIZE:
+                        cls._block_cache.popitem(last=False)
+                else:
+                    cls._block_cache.move_to_end(key)
+                rendered.append(html)
+            span.set_attribute("markdown.rendered_blocks", misses)
+        
+        from markdown.extensions.toc import unique
+        
+        used_ids: set[str] = set()
+        return _MARKED_ID.sub(
+            lambda m: f' id="{unique(m.group(1), used_ids)}"',
+            "".join(rendered).strip(),
         )
+    
+    @staticmethod
+    def wrap_html(html_content: str, css_content: str) -> str:
+        """用样式外壳包装正文HTML
         
+        Args:
+            html_content: 正文HTML
+            css_content: CSS样式
+            
+        Returns:
+            完整HTML
+        """
         # 包装HTML并应用样式
         full_html = f"""
 <!DOCTYPE html>
@@ -64,12 +210,12 @@ class StyleService:
             提取的标题,如果没有则返回None
         """
         # 查找第一个一级标题
-        match = re.search(r'^#\s+(.+)$', markdown_content, re.MULTILINE)
+        match = _H1.search(markdown_content)
         if match:
             return match.group(1).strip()
         
         # 查找第一个二级标题
-        match = re.search(r'^##\s+(.+)$', markdown_content, re.MULTILINE)
+        match = _H2.search(markdown_content)
         if match:
             return match.group(1).strip()
         
@@ -92,6 +238,8 @@ class StyleService:
         Returns:
             图片URL列表
         """
+        from bs4 import BeautifulSoup
+        
         soup = BeautifulSoup(html_content, 'html.parser')
         images = []
         
@@ -113,6 +261,8 @@ class StyleService:
         Returns:
             替换后的HTML
         """
+        from bs4 import BeautifulSoup
+        
         soup = BeautifulSoup(html_content, 'html.parser')
         
         for img in soup.find_all('img'):
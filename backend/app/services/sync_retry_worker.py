@@ -0,0 +1,118 @@
+"""同步重试Worker - 后台批量重试到期的失败同步"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.db import async_session_maker
+from app.core.logging import logger
+from app.models.article import Article, ArticleStatus
+from app.models.wechat_config import WechatConfig
+from app.services.article_status import ArticleStatusService
+from app.services.article_sync import ArticleSyncService
+
+
+class SyncRetryWorker:
+    """同步重试Worker
+
+    周期性地领取 next_attempt_at 已到期的同步失败文章,以及同步租约已过期(进程在同步中途退出)
+    的同步中文章,并重新同步。
+    领取时使用 SELECT ... FOR UPDATE SKIP LOCKED,把文章转为同步中并把 next_attempt_at 推后一个租约时长后立即提交,
+    多个进程同时运行时不会重复处理同一篇文章,也不会在调用微信接口期间长时间持有行锁。
+    进程在处理中途退出时,租约到期后文章会被重新领取。
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """启动后台循环"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="sync-retry-worker")
+            logger.info("同步重试Worker已启动")
+
+    async def stop(self) -> None:
+        """停止后台循环"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                logger.error(f"同步重试批处理失败: {e}", exc_info=True)
+                processed = 0
+            # 本批处理满时立即继续,否则等待下一个轮询周期
+            if processed < settings.SYNC_RETRY_BATCH_SIZE:
+                await asyncio.sleep(settings.SYNC_RETRY_POLL_INTERVAL)
+
+    async def _claim_due(self) -> list[int]:
+        """领取一批到期的文章,返回文章ID列表"""
+        now = datetime.utcnow()
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Article)
+                .where(
+                    Article.status.in_((ArticleStatus.SYNC_FAILED, ArticleStatus.SYNCING)),
+                    Article.next_attempt_at <= now,
+                )
+                .order_by(Article.next_attempt_at)
+                .limit(settings.SYNC_RETRY_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            articles = result.scalars().all()
+
+            # 领取即转为同步中,手动同步在租约期内会被拒绝,避免重复创建草稿
+            lease_until = now + timedelta(seconds=settings.SYNC_RETRY_LEASE_SECONDS)
+            for article in articles:
+                await ArticleStatusService.transition(session, article, ArticleStatus.SYNCING)
+                article.next_attempt_at = lease_until
+            await session.commit()
+
+            return [article.id for article in articles]
+
+    async def drain_once(self) -> int:
+        """处理一批到期的重试
+
+        Returns:
+            本批领取的文章数量
+        """
+        article_ids = await self._claim_due()
+        for article_id in article_ids:
+            await self._retry(article_id)
+        return len(article_ids)
+
+    async def _retry(self, article_id: int) -> None:
+        """重新同步单篇文章"""
+        async with async_session_maker() as session:
+            article = await session.get(Article, article_id)
+            if article is None or article.status not in (ArticleStatus.SYNC_FAILED, ArticleStatus.SYNCING):
+                return
+
+            result = await session.execute(
+                select(WechatConfig).where(WechatConfig.user_id == article.user_id)
+            )
+            wechat_config = result.scalar_one_or_none()
+            if wechat_config is None:
+                article.next_attempt_at = None
+                await ArticleStatusService.transition(session, article, ArticleStatus.SYNC_FAILED)
+                await session.commit()
+                return
+
+            logger.info(f"自动重试同步: article_id={article_id}, 第 {article.retry_count + 1} 次")
+            try:
+                await ArticleSyncService.sync(session, article, wechat_config, max_retries=1)
+            except Exception as e:
+                logger.warning(f"自动重试同步失败: article_id={article_id}: {e}")
+
+
+# 全局Worker实例
+sync_retry_worker = SyncRetryWorker()
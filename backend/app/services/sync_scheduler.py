@@ -0,0 +1,173 @@
+"""定时同步调度器 - 按公众号分组批量同步到期的定时文章"""
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.db import async_session_maker
+from app.core.logging import logger
+from app.models.article import Article, ArticleStatus
+from app.models.wechat_config import WechatConfig
+from app.services.article_status import SYNCABLE_STATUSES, ArticleStatusService
+from app.services.article_sync import ArticleSyncService
+from app.services.usage_stats import UsageStatsService
+from app.services.wechat_service import WechatService
+
+
+class SyncScheduler:
+    """定时同步调度器
+
+    周期性地领取 scheduled_at 已到期的文章,领取方式与 SyncRetryWorker 相同
+    (SELECT ... FOR UPDATE SKIP LOCKED 后把 scheduled_at 推后一个租约时长并立即提交)。
+
+    领取的文章按用户(即公众号)分组:
+    - 每组先获取一次AccessToken,组内文章复用,避免并发同步时重复刷新
+    - 组内并发数受 SCHEDULED_SYNC_ACCOUNT_CONCURRENCY 限制,同时处理的公众号数受 SCHEDULED_SYNC_MAX_ACCOUNTS 限制
+    同步失败的文章进入重试队列,由 SyncRetryWorker 处理。
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """启动后台循环"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="sync-scheduler")
+            logger.info("定时同步调度器已启动")
+
+    async def stop(self) -> None:
+        """停止后台循环"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                logger.error(f"定时同步批处理失败: {e}", exc_info=True)
+                processed = 0
+            if processed < settings.SCHEDULED_SYNC_BATCH_SIZE:
+                await asyncio.sleep(settings.SCHEDULED_SYNC_POLL_INTERVAL)
+
+    async def _claim_due(self) -> dict[int, list[int]]:
+        """领取一批到期的文章
+
+        Returns:
+            用户ID -> 文章ID列表(按定时时间排序)
+        """
+        now = datetime.utcnow()
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Article)
+                .where(Article.scheduled_at <= now, Article.status.in_(SYNCABLE_STATUSES))
+                .order_by(Article.scheduled_at)
+                .limit(settings.SCHEDULED_SYNC_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            articles = result.scalars().all()
+
+            lease_until = now + timedelta(seconds=settings.SCHEDULED_SYNC_LEASE_SECONDS)
+            groups: dict[int, list[int]] = defaultdict(list)
+            for article in articles:
+                article.scheduled_at = lease_until
+                groups[article.user_id].append(article.id)
+            await session.commit()
+
+            return dict(groups)
+
+    async def drain_once(self) -> int:
+        """处理一批到期的定时文章
+
+        Returns:
+            本批领取的文章数量
+        """
+        groups = await self._claim_due()
+        if not groups:
+            return 0
+
+        account_slots = asyncio.Semaphore(settings.SCHEDULED_SYNC_MAX_ACCOUNTS)
+
+        async def run_group(user_id: int, article_ids: list[int]) -> None:
+            async with account_slots:
+                await self._dispatch_account(user_id, article_ids)
+
+        await asyncio.gather(*(run_group(user_id, ids) for user_id, ids in groups.items()))
+        return sum(len(ids) for ids in groups.values())
+
+    async def _dispatch_account(self, user_id: int, article_ids: list[int]) -> None:
+        """同步同一公众号下的一组文章"""
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(WechatConfig).where(WechatConfig.user_id == user_id)
+            )
+            wechat_config = result.scalar_one_or_none()
+            error: Optional[Exception] = None
+            if wechat_config is None:
+                error = Exception("未配置微信公众号")
+            else:
+                # 预先刷新AccessToken并提交,组内各文章加载配置时直接使用
+                try:
+                    await WechatService(wechat_config).get_access_token()
+                    await session.commit()
+                except Exception as e:
+                    error = e
+
+        if error is not None:
+            logger.warning(f"定时同步跳过用户 {user_id} 的 {len(article_ids)} 篇文章: {error}")
+            await self._fail_all(article_ids, error)
+            return
+
+        logger.info(f"定时同步: user_id={user_id}, {len(article_ids)} 篇文章")
+        slots = asyncio.Semaphore(settings.SCHEDULED_SYNC_ACCOUNT_CONCURRENCY)
+
+        async def run(article_id: int) -> None:
+            async with slots:
+                await self._sync(article_id)
+
+        await asyncio.gather(*(run(article_id) for article_id in article_ids))
+
+    async def _sync(self, article_id: int) -> None:
+        """同步单篇定时文章"""
+        async with async_session_maker() as session:
+            article = await session.get(Article, article_id)
+            if article is None or article.scheduled_at is None:
+                # 领取后被删除或取消了定时
+                return
+
+            result = await session.execute(
+                select(WechatConfig).where(WechatConfig.user_id == article.user_id)
+            )
+            wechat_config = result.scalar_one()
+
+            # 随同步结果一起提交
+            article.scheduled_at = None
+            try:
+                await ArticleSyncService.sync(session, article, wechat_config, max_retries=1)
+            except Exception as e:
+                logger.warning(f"定时同步失败: article_id={article_id}: {e}")
+
+    async def _fail_all(self, article_ids: list[int], error: Exception) -> None:
+        """整组无法同步时记录失败并按重试策略安排重试"""
+        async with async_session_maker() as session:
+            result = await session.execute(select(Article).where(Article.id.in_(article_ids)))
+            for article in result.scalars().all():
+                if article.scheduled_at is None:
+                    continue
+                article.scheduled_at = None
+                ArticleSyncService.schedule_retry(article, error)
+                await ArticleStatusService.transition(session, article, ArticleStatus.SYNC_FAILED)
+                await UsageStatsService.record_sync(session, article.user_id, False)
+            await session.commit()
+
+
+# 全局调度器实例
+sync_scheduler = SyncScheduler()
@@ -0,0 +1,249 @@
+"""任务进度推送 - 记录任务状态并通过Redis Pub/Sub推送给用户的WebSocket连接
+
+- 任务开始/结束时写入 tasks 表,中间进度只推送不落库
+- 每个进程只维护一条Redis订阅连接(模式订阅),再分发给本进程内的WebSocket连接
+- Redis不可用时退化为进程内推送(单进程部署下效果相同)
+"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.db import async_session_maker
+from app.core.logging import logger
+from app.core.redis import get_redis, mark_redis_unavailable, redis_available
+from app.models.task import Task
+
+# 频道名: task_progress:{user_id}
+CHANNEL_PREFIX = "task_progress:"
+
+# 每个WebSocket连接的待发送事件上限,客户端过慢时丢弃最旧的事件
+_SUBSCRIBER_QUEUE_SIZE = 100
+
+# 订阅连接每次等待消息的时长(秒)。共享客户端的 socket_timeout 很短,阻塞读取会在空闲时超时,
+# 因此按该时长轮询,空闲超时返回None而不视为Redis故障
+_LISTEN_POLL_TIMEOUT = 5.0
+
+
+class ProgressBroker:
+    """进度事件分发器"""
+
+    def __init__(self):
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._listening = False  # Redis订阅是否处于连接状态
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        """发布进度事件
+
+        Args:
+            user_id: 用户ID
+            event: 事件内容
+        """
+        message = json.dumps(event, ensure_ascii=False, default=str)
+        if redis_available():
+            try:
+                await get_redis().publish(f"{CHANNEL_PREFIX}{user_id}", message)
+                if self._listening:
+                    # 本进程的订阅者会从Redis收到该事件
+                    return
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+        self._dispatch(user_id, message)
+
+    def _dispatch(self, user_id: int, message: str) -> None:
+        """分发给本进程内该用户的所有订阅者"""
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """订阅用户的进度事件
+
+        Args:
+            user_id: 用户ID
+
+        Yields:
+            接收JSON字符串事件的队列
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        self._ensure_listener()
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(), name="task-progress-listener")
+
+    async def _listen(self) -> None:
+        """订阅Redis并分发事件,连接断开后按 REDIS_RETRY_INTERVAL 重连"""
+        while True:
+            if not redis_available():
+                await asyncio.sleep(settings.REDIS_RETRY_INTERVAL)
+                continue
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                self._listening = True
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=_LISTEN_POLL_TIMEOUT
+                    )
+                    if message is None or message["type"] != "pmessage":
+                        continue
+                    user_id = int(message["channel"][len(CHANNEL_PREFIX):])
+                    self._dispatch(user_id, message["data"])
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+            finally:
+                self._listening = False
+                try:
+                    await pubsub.aclose()
+                except (RedisError, OSError):
+                    pass
+
+    async def stop(self) -> None:
+        """停止Redis订阅"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+# 全局分发器实例
+progress_broker = ProgressBroker()
+
+
+class TaskProgress:
+    """单个任务的进度记录器"""
+
+    def __init__(self, task: Task):
+        self.task = task
+        self.progress = 0
+        self.tokens = 0  # 已生成的Token数
+
+    def event(self, stage: str, **detail) -> dict:
+        """构造进度事件"""
+        return {
+            "task_id": self.task.id,
+            "task_type": self.task.task_type,
+            "article_id": self.task.article_id,
+            "status": self.task.status,
+            "stage": stage,
+            "progress": self.progress,
+            "tokens": self.tokens,
+            "detail": detail,
+            "at": datetime.utcnow().isoformat(),
+        }
+
+    async def update(self, stage: str, progress: Optional[int] = None, tokens: int = 0, **detail) -> None:
+        """推送阶段变化(不写数据库)
+
+        Args:
+            stage: 阶段,如 queued/generating/rendering/syncing/uploading_images
+            progress: 进度(0-100),为空时保持不变
+            tokens: 本次新增的生成Token数
+            **detail: 附加信息,如 uploaded/total
+        """
+        if progress is not None:
+            # 并发小节完成顺序不定,进度只增不减
+            self.progress = max(self.progress, min(100, progress))
+        self.tokens += tokens
+        await progress_broker.publish(self.task.user_id, self.event(stage, **detail))
+
+
+_current_progress: ContextVar[Optional[TaskProgress]] = ContextVar("task_progress", default=None)
+
+
+async def report_progress(stage: str, progress: Optional[int] = None, tokens: int = 0, **detail) -> None:
+    """向当前上下文的任务推送进度,不在任务中时不做任何处理
+
+    Args:
+        stage: 阶段
+        progress: 进度(0-100)
+        tokens: 本次新增的生成Token数
+        **detail: 附加信息
+    """
+    tracker = _current_progress.get()
+    if tracker is not None:
+        try:
+            await tracker.update(stage, progress, tokens, **detail)
+        except Exception as e:
+            # 进度推送失败不影响任务本身
+            logger.warning(f"任务进度推送失败: task_id={tracker.task.id}: {e}")
+
+
+async def _save_task(task: Task) -> Task:
+    async with async_session_maker() as session:
+        task = await session.merge(task)
+        await session.commit()
+        await session.refresh(task)
+        return task
+
+
+@asynccontextmanager
+async def track_task(user_id: int, task_type: str, article_id: Optional[int] = None) -> AsyncIterator[TaskProgress]:
+    """记录任务并在当前上下文中开启进度推送
+
+    任务开始与结束时各写一次 tasks 表(使用独立会话,不影响调用方的事务)。
+
+    Args:
+        user_id: 用户ID
+        task_type: 任务类型: generate_article/sync_wechat
+        article_id: 关联文章ID
+
+    Yields:
+        任务进度记录器
+    """
+    task = await _save_task(Task(
+        user_id=user_id,
+        task_type=task_type,
+        article_id=article_id,
+        status="running",
+        started_at=datetime.utcnow(),
+    ))
+    tracker = TaskProgress(task)
+    token = _current_progress.set(tracker)
+    await report_progress("queued")
+    try:
+        yield tracker
+    except BaseException as e:
+        task.status = "failed"
+        task.error_message = str(e) or type(e).__name__
+        task.progress = tracker.progress
+        task.completed_at = datetime.utcnow()
+        await asyncio.shield(_finish(tracker, "failed", error=task.error_message))
+        raise
+    else:
+        task.status = "completed"
+        task.progress = tracker.progress = 100
+        task.completed_at = datetime.utcnow()
+        await _finish(tracker, "completed")
+    finally:
+        _current_progress.reset(token)
+
+
+async def _finish(tracker: TaskProgress, stage: str, **detail) -> None:
+    """保存任务终态并推送"""
+    try:
+        tracker.task = await _save_task(tracker.task)
+    except Exception as e:
+        logger.warning(f"保存任务状态失败: task_id={tracker.task.id}: {e}")
+    await tracker.update(stage, **detail)
@@ -0,0 +1,268 @@
+"""用量统计服务 - 按用户、按天增量维护用量汇总,统计接口只读取汇总行
+
+- 生成与同步流程在各自的事务中对 usage_daily 执行一次 upsert(计数累加),不扫描 articles 表
+- LLM调用的Token用量通过上下文累计(分节生成的并发小节也计入同一篇文章)
+- 生成耗时按固定上限分桶计数,分位数由直方图估算,多天、多用户的直方图可直接相加
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterator, Mapping, Optional
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.usage_daily import UsageDaily
+from app.models.user import User
+from app.schemas.usage import UsageDay, UsageReport, UsageTotals, UserUsage
+from app.utils.sql import upsert_insert
+
+# 生成耗时分桶: (上限毫秒, 列名),最后一个桶没有上限
+LATENCY_BUCKETS: tuple[tuple[Optional[int], str], ...] = (
+    (1000, "latency_le_1s"),
+    (2000, "latency_le_2s"),
+    (5000, "latency_le_5s"),
+    (10000, "latency_le_10s"),
+    (20000, "latency_le_20s"),
+    (30000, "latency_le_30s"),
+    (60000, "latency_le_60s"),
+    (120000, "latency_le_120s"),
+    (None, "latency_gt_120s"),
+)
+
+# 可累加的计数列
+COUNTER_COLUMNS = (
+    "articles_generated", "generation_failed", "articles_synced", "sync_failed",
+    "llm_calls", "prompt_tokens", "completion_tokens", "cached_tokens",
+    "latency_total_ms", *(column for _, column in LATENCY_BUCKETS),
+)
+
+
+@dataclass
+class LLMUsage:
+    """一次任务中累计的LLM用量"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+
+_current_usage: ContextVar[Optional[LLMUsage]] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def meter_llm_usage() -> Iterator[LLMUsage]:
+    """在当前上下文中累计LLM用量
+
+    Yields:
+        用量累加器(上下文中创建的子任务共享同一个累加器)
+    """
+    usage = LLMUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_llm_usage(usage: Optional[dict], cached_tokens: int = 0) -> None:
+    """把一次LLM调用计入当前上下文的累加器,不在计量范围内时不做任何处理
+
+    Args:
+        usage: 响应的 usage 字段(部分提供商不返回)
+        cached_tokens: 命中前缀缓存的输入Token数
+    """
+    meter = _current_usage.get()
+    if meter is None:
+        return
+    meter.calls += 1
+    if usage:
+        meter.prompt_tokens += usage.get("prompt_tokens", 0)
+        meter.completion_tokens += usage.get("completion_tokens", 0)
+        meter.cached_tokens += cached_tokens
+
+
+def latency_bucket(latency_ms: float) -> str:
+    """耗时所属的直方图列"""
+    for upper, column in LATENCY_BUCKETS:
+        if upper is None or latency_ms <= upper:
+            return column
+    return LATENCY_BUCKETS[-1][1]
+
+
+def estimate_percentile(counts: list[int], q: float) -> Optional[float]:
+    """由直方图估算分位数(桶内线性插值)
+
+    Args:
+        counts: 与 LATENCY_BUCKETS 一一对应的计数
+        q: 分位(0-1)
+
+    Returns:
+        估算的耗时(毫秒),没有样本时为None;落在无上限桶中时返回该桶下限
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    target = q * total
+    cumulative = 0
+    lower = 0
+    for (upper, _), count in zip(LATENCY_BUCKETS, counts):
+        if count and cumulative + count >= target:
+            if upper is None:
+                return float(lower)
+            return round(lower + (upper - lower) * (target - cumulative) / count, 1)
+        cumulative += count
+        lower = upper if upper is not None else lower
+    return float(lower)
+
+
+class UsageStatsService:
+    """用量统计服务类"""
+
+    @staticmethod
+    async def _increment(session: AsyncSession, user_id: int, values: dict[str, int]) -> None:
+        """当天汇总行的计数累加(不存在时插入,不提交)
+
+        Args:
+            session: 数据库会话
+            user_id: 用户ID
+            values: 列名 -> 增量
+        """
+        values = {column: value for column, value in values.items() if value}
+        if not values:
+            return
+        table = UsageDaily.__table__
+        stmt = upsert_insert(session)(table).values(user_id=user_id, day=datetime.utcnow().date(), **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day],
+            set_={column: table.c[column] + stmt.excluded[column] for column in values},
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    async def record_generation(
+        session: AsyncSession,
+        user_id: int,
+        success: bool,
+        usage: Optional[LLMUsage] = None,
+        latency_ms: Optional[float] = None,
+    ) -> None:
+        """记录一次文章生成(与文章状态在同一事务中提交)
+
+        Args:
+            session: 数据库会话
+            user_id: 用户ID
+            success: 是否生成成功
+            usage: 本次生成累计的LLM用量
+            latency_ms: 生成耗时,只有成功的生成计入耗时直方图
+        """
+        values = {"articles_generated" if success else "generation_failed": 1}
+        if usage is not None:
+            values.update(
+                llm_calls=usage.calls,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                cached_tokens=usage.cached_tokens,
+            )
+        if success and latency_ms is not None:
+            values["latency_total_ms"] = round(latency_ms)
+            values[latency_bucket(latency_ms)] = 1
+        await UsageStatsService._increment(session, user_id, values)
+
+    @staticmethod
+    async def record_sync(session: AsyncSession, user_id: int, success: bool) -> None:
+        """记录一次同步(与文章状态在同一事务中提交)
+
+        Args:
+            session: 数据库会话
+            user_id: 文章所属用户ID
+            success: 是否同步成功
+        """
+        await UsageStatsService._increment(
+            session, user_id, {"articles_synced" if success else "sync_failed": 1}
+        )
+
+    @staticmethod
+    def _totals(sums: Mapping) -> dict:
+        """把计数列合计换算为响应字段(平均耗时与分位数)"""
+        data = {column: int(sums.get(column) or 0) for column in COUNTER_COLUMNS}
+        histogram = [data.pop(column) for _, column in LATENCY_BUCKETS]
+        latency_total_ms = data.pop("latency_total_ms")
+        samples = sum(histogram)
+        data["latency_avg_ms"] = round(latency_total_ms / samples, 1) if samples else None
+        data["latency_p50_ms"] = estimate_percentile(histogram, 0.5)
+        data["latency_p95_ms"] = estimate_percentile(histogram, 0.95)
+        data["latency_p99_ms"] = estimate_percentile(histogram, 0.99)
+        return data
+
+    @staticmethod
+    def _sums() -> list:
+        return [func.sum(getattr(UsageDaily, column)).label(column) for column in COUNTER_COLUMNS]
+
+    @staticmethod
+    async def report(
+        session: AsyncSession,
+        start: date,
+        end: date,
+        user_id: Optional[int] = None,
+    ) -> UsageReport:
+        """按天汇总用量
+
+        Args:
+            session: 数据库会话
+            start: 开始日期(含)
+            end: 结束日期(含)
+            user_id: 只统计该用户,为空时合计全部用户
+
+        Returns:
+            用量报表
+        """
+        query = (
+            select(UsageDaily.day, *UsageStatsService._sums())
+            .where(UsageDaily.day >= start, UsageDaily.day <= end)
+            .group_by(UsageDaily.day)
+            .order_by(UsageDaily.day)
+        )
+        if user_id is not None:
+            query = query.where(UsageDaily.user_id == user_id)
+        rows = (await session.execute(query)).all()
+
+        # 直方图可以相加,合计行直接由各天的计数求和
+        totals = {column: sum(row._mapping[column] or 0 for row in rows) for column in COUNTER_COLUMNS}
+        return UsageReport(
+            start=start,
+            end=end,
+            user_id=user_id,
+            totals=UsageTotals(**UsageStatsService._totals(totals)),
+            days=[UsageDay(day=row.day, **UsageStatsService._totals(row._mapping)) for row in rows],
+        )
+
+    @staticmethod
+    async def top_users(session: AsyncSession, start: date, end: date, limit: int) -> list[UserUsage]:
+        """时间范围内生成文章最多的用户
+
+        Args:
+            session: 数据库会话
+            start: 开始日期(含)
+            end: 结束日期(含)
+            limit: 返回数量
+
+        Returns:
+            按生成文章数从高到低排序的用户用量
+        """
+        generated = func.sum(UsageDaily.articles_generated)
+        query = (
+            select(UsageDaily.user_id, User.username, *UsageStatsService._sums())
+            .join(User, User.id == UsageDaily.user_id)
+            .where(UsageDaily.day >= start, UsageDaily.day <= end)
+            .group_by(UsageDaily.user_id, User.username)
+            .order_by(generated.desc(), UsageDaily.user_id)
+            .limit(limit)
+        )
+        rows = (await session.execute(query)).all()
+        return [
+            UserUsage(user_id=row.user_id, username=row.username, **UsageStatsService._totals(row._mapping))
+            for row in rows
+        ]
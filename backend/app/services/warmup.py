@@ -0,0 +1,28 @@
+"""启动预热 - 在worker开始接收请求前加载惰性导入的依赖"""
+import time
+
+from app.core.logging import logger
+from app.core.security import get_password_context
+from app.services.prompt_builder import PromptBuilder
+from app.services.style_service import StyleService
+
+
+def warm_up() -> float:
+    """预热惰性加载的模块与对象
+    
+    - Markdown转换器与Pygments词法分析器(代码高亮)
+    - 密码哈希上下文(passlib)
+    - wechatpy.exceptions(包导入较慢,只用于AccessToken接口报错时的 WeChatClientException)
+    - Token估算器(LLM_TOKENIZER=tiktoken 时加载编码表)
+    
+    Returns:
+        耗时(毫秒)
+    """
+    start = time.perf_counter()
+    StyleService.warm_up()
+    get_password_context()
+    import wechatpy.exceptions  # noqa: F401
+    PromptBuilder.estimate_tokens("预热 warm up")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"启动预热完成,耗时 {elapsed_ms:.0f}ms")
+    return elapsed_ms
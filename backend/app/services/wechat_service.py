@@ -6,13 +6,58 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 import httpx
-from wechatpy import WeChatClient
-from wechatpy.exceptions import WeChatClientException
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, get_breaker
 from app.core.security import decrypt_sensitive_data
+from app.core.tracing import get_tracer
 from app.models.wechat_config import WechatConfig
+from app.services.task_progress import report_progress
+
+tracer = get_tracer(__name__)
+
+
+# 可重试的微信错误码(临时性错误)
+# -1: 系统繁忙  40001/42001: AccessToken失效/过期  45009: 接口调用超过当日限额  45011: 调用频率过高
+RETRYABLE_ERRCODES = {-1, 40001, 42001, 45009, 45011}
+
+# 需要较长等待的错误码(配额类,通常次日或数分钟后才恢复)
+QUOTA_ERRCODES = {45009}
+
+
+class WechatAPIError(Exception):
+    """微信接口返回错误码"""
+    
+    def __init__(self, message: str, errcode: int):
+        super().__init__(message)
+        self.errcode = errcode
+
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """判断错误是否说明微信接口本身故障(计入熔断)
+    
+    网络错误、5xx与系统繁忙计入;AppSecret错误、内容不合规等调用方错误不计入。
+    """
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return getattr(error, "errcode", None) == -1
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """判断同步错误是否值得在本次请求内立即重试
+    
+    熔断中与配额耗尽时立即放弃,交由重试队列稍后处理。
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    errcode = getattr(error, "errcode", None)
+    if errcode is not None:
+        return errcode in RETRYABLE_ERRCODES and errcode not in QUOTA_ERRCODES
+    return True
+
 
 # 默认封面图 (蓝色背景) Base64
 DEFAULT_COVER_BASE64 = "/9j/4AAQSkZJRgABAQEASABIAAD/2wBDAAMCAgMCAgMDAwMEAwMEBQgFBQQEBQoHBwYIDAoMDAsKCwsNDhIQDQ4RDgsLEBYQERMUFRUVDA8XGBYUGBIUFRT/2wBDAQMEBAUEBQkFBQkUDQsNFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBT/wAARCAH0A4QDASIAAhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVWV1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJBUQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq8vP09fb3+Pn6/9oADAMBAAIRAxEAPwD9U6KKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooA//Z"
@@ -30,7 +75,46 @@ class WechatService:
         self.config = wechat_config
         self.app_id = wechat_config.app_id
         self.app_secret = decrypt_sensitive_data(wechat_config.app_secret_encrypted)
-        self.client = WeChatClient(self.app_id, self.app_secret)
+        self.api_base_url = settings.WECHAT_API_BASE_URL.rstrip("/")
+    
+    @staticmethod
+    def _breaker(endpoint: str) -> CircuitBreaker:
+        """获取微信接口的熔断器(所有公众号共享)"""
+        return get_breaker(
+            f"微信接口 {endpoint}",
+            settings.WECHAT_BREAKER_FAILURE_THRESHOLD,
+            settings.WECHAT_BREAKER_RECOVERY,
+            is_endpoint_failure,
+        )
+    
+    async def _request(self, endpoint: str, method: str, path: str, timeout: float = 10.0, **kwargs) -> dict:
+        """调用微信接口并返回JSON结果
+        
+        请求经过该接口的熔断器;系统繁忙(-1)与5xx作为接口故障抛出,其余错误码由调用方处理。
+        
+        Args:
+            endpoint: 接口标识(熔断器名称)
+            method: HTTP方法
+            path: 接口路径(含查询参数)
+            timeout: 超时时间(秒)
+            **kwargs: 传给httpx的其他参数
+            
+        Returns:
+            响应JSON
+            
+        Raises:
+            CircuitOpenError: 接口熔断中
+            WechatAPIError: 微信系统繁忙
+        """
+        async with self._breaker(endpoint):
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.request(method, f"{self.api_base_url}{path}", **kwargs)
+            if response.status_code >= 500:
+                response.raise_for_status()
+            result = response.json()
+            if result.get("errcode") == -1:
+                raise WechatAPIError(f"微信系统繁忙: {result.get('errmsg', 'system error')}", -1)
+            return result
     
     async def get_access_token(self, force_refresh: bool = False) -> str:
         """获取AccessToken,自动处理刷新逻辑
@@ -41,34 +125,66 @@ class WechatService:
         Returns:
             有效的AccessToken
         """
-        now = datetime.utcnow()
+        with tracer.start_as_current_span("wechat.get_access_token") as span:
+            now = datetime.utcnow()
+            
+            # 检查是否需要刷新Token
+            need_refresh = (
+                force_refresh
+                or self.config.access_token is None
+                or self.config.token_expires_at is None
+                or (self.config.token_expires_at - now).total_seconds() < settings.WECHAT_TOKEN_REFRESH_ADVANCE
+            )
+            span.set_attribute("wechat.token_refreshed", need_refresh)
+            
+            if need_refresh:
+                # wechatpy 导入较慢,这里只用到其异常类型,刷新Token时才导入
+                from wechatpy.exceptions import WeChatClientException
+                
+                logger.info(f"刷新微信AccessToken: AppID={self.app_id}")
+                
+                try:
+                    # 调用微信API获取新Token
+                    token_data = await self._fetch_access_token()
+                    
+                    self.config.access_token = token_data["access_token"]
+                    self.config.token_expires_at = now + timedelta(seconds=token_data["expires_in"])
+                    self.config.last_refresh_at = now
+                    
+                    logger.info(f"AccessToken刷新成功,过期时间: {self.config.token_expires_at}")
+                    
+                except WeChatClientException as e:
+                    logger.error(f"刷新AccessToken失败: {e}")
+                    raise
+            
+            return self.config.access_token
+    
+    async def _fetch_access_token(self) -> dict:
+        """调用微信接口获取AccessToken
         
-        # 检查是否需要刷新Token
-        need_refresh = (
-            force_refresh
-            or self.config.access_token is None
-            or self.config.token_expires_at is None
-            or (self.config.token_expires_at - now).total_seconds() < settings.WECHAT_TOKEN_REFRESH_ADVANCE
+        Returns:
+            包含access_token和expires_in的字典
+            
+        Raises:
+            WeChatClientException: 微信接口返回错误码时抛出
+        """
+        result = await self._request(
+            "token",
+            "GET",
+            "/cgi-bin/token",
+            params={
+                "grant_type": "client_credential",
+                "appid": self.app_id,
+                "secret": self.app_secret,
+            },
         )
         
-        if need_refresh:
-            logger.info(f"刷新微信AccessToken: AppID={self.app_id}")
+        if "errcode" in result and result["errcode"] != 0:
+            from wechatpy.exceptions import WeChatClientException
             
-            try:
-                # 调用微信API获取新Token
-                token_data = await asyncio.to_thread(self.client.fetch_access_token)
-                
-                self.config.access_token = token_data["access_token"]
-                self.config.token_expires_at = now + timedelta(seconds=token_data["expires_in"])
-                self.config.last_refresh_at = now
-                
-                logger.info(f"AccessToken刷新成功,过期时间: {self.config.token_expires_at}")
-                
-            except WeChatClientException as e:
-                logger.error(f"刷新AccessToken失败: {e}")
-                raise
+            raise WeChatClientException(result["errcode"], result.get("errmsg", "Unknown error"))
         
-        return self.config.access_token
+        return result
     
     async def get_or_create_default_cover(self) -> str:
         """获取或创建默认封面图本地文件"""
@@ -128,48 +244,49 @@ class WechatService:
         Returns:
             微信media_id
         """
-        access_token = await self.get_access_token()
-        image_data = None
+        with tracer.start_as_current_span("wechat.upload_image"):
+            access_token = await self.get_access_token()
+            image_data = None
 
-        # 判断是URL还是本地路径
-        if image_url_or_path.startswith(('http://', 'https://')):
-            # 下载图片
-            async with httpx.AsyncClient() as client:
-                response = await client.get(image_url_or_path)
-                response.raise_for_status()
-                image_data = response.content
-        else:
-            # 读取本地文件
-            try:
-                # 兼容 Linux/Windows 路径
-                path = image_url_or_path
-                if not os.path.isabs(path):
-                     # 如果是相对路径，尝试基于当前工作目录
-                     path = os.path.abspath(path)
-                
-                with open(path, 'rb') as f:
-                    image_data = f.read()
-            except Exception as e:
-                logger.error(f"读取本地图片失败: {e}")
-                raise Exception(f"读取本地图片失败: {e}")
-        
-        # 上传到微信
-        upload_url = f"https://api.weixin.qq.com/cgi-bin/material/add_material?access_token={access_token}&type=image"
-        
-        async with httpx.AsyncClient() as client:
-            files = {"media": ("image.jpg", image_data, "image/jpeg")}
-            response = await client.post(upload_url, files=files)
-            result = response.json()
-        
-        if "errcode" in result and result["errcode"] != 0:
-            error_msg = f"上传图片失败: {result.get('errmsg', 'Unknown error')}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
-        
-        media_id = result.get("media_id")
-        logger.info(f"图片上传成功: media_id={media_id}")
-        
-        return media_id
+            # 判断是URL还是本地路径
+            if image_url_or_path.startswith(('http://', 'https://')):
+                # 下载图片
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(image_url_or_path)
+                    response.raise_for_status()
+                    image_data = response.content
+            else:
+                # 读取本地文件
+                try:
+                    # 兼容 Linux/Windows 路径
+                    path = image_url_or_path
+                    if not os.path.isabs(path):
+                         # 如果是相对路径，尝试基于当前工作目录
+                         path = os.path.abspath(path)
+                    
+                    with open(path, 'rb') as f:
+                        image_data = f.read()
+                except Exception as e:
+                    logger.error(f"读取本地图片失败: {e}")
+                    raise Exception(f"读取本地图片失败: {e}")
+            
+            # 上传到微信
+            result = await self._request(
+                "add_material",
+                "POST",
+                f"/cgi-bin/material/add_material?access_token={access_token}&type=image",
+                files={"media": ("image.jpg", image_data, "image/jpeg")},
+            )
+            
+            if "errcode" in result and result["errcode"] != 0:
+                error_msg = f"上传图片失败: {result.get('errmsg', 'Unknown error')}"
+                logger.error(error_msg)
+                raise WechatAPIError(error_msg, result["errcode"])
+            
+            media_id = result.get("media_id")
+            logger.info(f"图片上传成功: media_id={media_id}")
+            
+            return media_id
     
     async def create_draft(
         self,
@@ -191,98 +308,97 @@ class WechatService:
         Returns:
             草稿media_id
         """
-        access_token = await self.get_access_token()
-        
-        # 微信标题限制基于字节长度（UTF-8编码），实际限制约为32-40字节
-        # 中文字符通常占3字节，32字节约能容纳10个中文字符
-        max_title_bytes = 32
-        title_bytes = title.encode('utf-8')
-        
-        if len(title_bytes) > max_title_bytes:
-            # 截断标题，确保不破坏 UTF-8 字符边界
-            truncated_bytes = title_bytes[:max_title_bytes]
-            # 尝试解码，如果失败则继续向前截断直到成功
-            for i in range(max_title_bytes, max_title_bytes - 4, -1):
-                try:
-                    truncated_title = title_bytes[:i].decode('utf-8')
-                    break
-                except UnicodeDecodeError:
-                    continue
+        with tracer.start_as_current_span("wechat.create_draft"):
+            access_token = await self.get_access_token()
+            
+            # 微信标题限制基于字节长度（UTF-8编码），实际限制约为32-40字节
+            # 中文字符通常占3字节，32字节约能容纳10个中文字符
+            max_title_bytes = 32
+            title_bytes = title.encode('utf-8')
+            
+            if len(title_bytes) > max_title_bytes:
+                # 截断标题，确保不破坏 UTF-8 字符边界
+                truncated_bytes = title_bytes[:max_title_bytes]
+                # 尝试解码，如果失败则继续向前截断直到成功
+                for i in range(max_title_bytes, max_title_bytes - 4, -1):
+                    try:
+                        truncated_title = title_bytes[:i].decode('utf-8')
+                        break
+                    except UnicodeDecodeError:
+                        continue
+                else:
+                    # 如果都失败了，使用前10个字符作为兜底
+                    truncated_title = title[:10]
+                
+                logger.warning(f"标题字节过长 ({len(title_bytes)} 字节)，已截断至 {len(truncated_title.encode('utf-8'))} 字节: {truncated_title}")
             else:
-                # 如果都失败了，使用前10个字符作为兜底
-                truncated_title = title[:10]
+                truncated_title = title
             
-            logger.warning(f"标题字节过长 ({len(title_bytes)} 字节)，已截断至 {len(truncated_title.encode('utf-8'))} 字节: {truncated_title}")
-        else:
-            truncated_title = title
-        
-        # 处理摘要（digest）字节长度限制，约54字节
-        max_digest_bytes = 54
-        digest_text = digest or title
-        digest_bytes = digest_text.encode('utf-8')
-        
-        if len(digest_bytes) > max_digest_bytes:
-            # 截断摘要，确保不破坏 UTF-8 字符边界
-            for i in range(max_digest_bytes, max_digest_bytes - 4, -1):
-                try:
-                    truncated_digest = digest_bytes[:i].decode('utf-8')
-                    break
-                except UnicodeDecodeError:
-                    continue
+            # 处理摘要（digest）字节长度限制，约54字节
+            max_digest_bytes = 54
+            digest_text = digest or title
+            digest_bytes = digest_text.encode('utf-8')
+            
+            if len(digest_bytes) > max_digest_bytes:
+                # 截断摘要，确保不破坏 UTF-8 字符边界
+                for i in range(max_digest_bytes, max_digest_bytes - 4, -1):
+                    try:
+                        truncated_digest = digest_bytes[:i].decode('utf-8')
+                        break
+                    except UnicodeDecodeError:
+                        continue
+                else:
+                    # 兜底：使用前15个字符
+                    truncated_digest = digest_text[:15]
+                
+                logger.warning(f"摘要字节过长 ({len(digest_bytes)} 字节)，已截断至 {len(truncated_digest.encode('utf-8'))} 字节: {truncated_digest}")
             else:
-                # 兜底：使用前15个字符
-                truncated_digest = digest_text[:15]
+                truncated_digest = digest_text
             
-            logger.warning(f"摘要字节过长 ({len(digest_bytes)} 字节)，已截断至 {len(truncated_digest.encode('utf-8'))} 字节: {truncated_digest}")
-        else:
-            truncated_digest = digest_text
-        
-        # 构建草稿数据
-        articles = [
-            {
-                "title": truncated_title,
-                "author": author,
-                "digest": truncated_digest,
-                "content": content,
-                "content_source_url": "",
-                "thumb_media_id": thumb_media_id or "",
-                "need_open_comment": 0,
-                "only_fans_can_comment": 0,
-            }
-        ]
-        
-        # 调用微信API创建草稿
-        draft_url = f"https://api.weixin.qq.com/cgi-bin/draft/add?access_token={access_token}"
-        
-        # 手动序列化 JSON，确保中文字符不被转义
-        import json
-        json_data = json.dumps({"articles": articles}, ensure_ascii=False)
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                draft_url,
+            # 构建草稿数据
+            articles = [
+                {
+                    "title": truncated_title,
+                    "author": author,
+                    "digest": truncated_digest,
+                    "content": content,
+                    "content_source_url": "",
+                    "thumb_media_id": thumb_media_id or "",
+                    "need_open_comment": 0,
+                    "only_fans_can_comment": 0,
+                }
+            ]
+            
+            # 手动序列化 JSON，确保中文字符不被转义
+            import json
+            json_data = json.dumps({"articles": articles}, ensure_ascii=False)
+            
+            # 调用微信API创建草稿
+            result = await self._request(
+                "draft_add",
+                "POST",
+                f"/cgi-bin/draft/add?access_token={access_token}",
+                timeout=30.0,
                 content=json_data.encode('utf-8'),
                 headers={"Content-Type": "application/json; charset=utf-8"},
-                timeout=30.0,
             )
-            result = response.json()
-        
-        if "errcode" in result and result["errcode"] != 0:
-            error_msg = f"创建草稿失败: {result.get('errmsg', 'Unknown error')}"
-            logger.error(error_msg)
             
-            # 如果是Token过期,尝试刷新后重试
-            if result["errcode"] == 40001:
-                logger.info("Token过期,刷新后重试")
-                await self.get_access_token(force_refresh=True)
-                return await self.create_draft(title, content, author, digest, thumb_media_id)
+            if "errcode" in result and result["errcode"] != 0:
+                error_msg = f"创建草稿失败: {result.get('errmsg', 'Unknown error')}"
+                logger.error(error_msg)
+                
+                # 如果是Token过期,尝试刷新后重试
+                if result["errcode"] == 40001:
+                    logger.info("Token过期,刷新后重试")
+                    await self.get_access_token(force_refresh=True)
+                    return await self.create_draft(title, content, author, digest, thumb_media_id)
+                
+                raise WechatAPIError(error_msg, result["errcode"])
             
-            raise Exception(error_msg)
-        
-        media_id = result.get("media_id")
-        logger.info(f"草稿创建成功: media_id={media_id}, title={title}")
-        
-        return media_id
+            media_id = result.get("media_id")
+            logger.info(f"草稿创建成功: media_id={media_id}, title={title}")
+            
+            return media_id
 
     async def sync_article_with_retry(
         self,
@@ -307,18 +423,23 @@ class WechatService:
             logger.info(f"步骤1.2: 封面图路径: {cover_path}")
             
             logger.info(f"步骤1.3: 正在上传默认封面图到微信")
+            await report_progress("uploading_images", 20, uploaded=0, total=1)
             thumb_media_id = await self.upload_image(cover_path)
             logger.info(f"步骤1.4: 封面图上传成功, media_id={thumb_media_id}")
+            await report_progress("uploading_images", 50, uploaded=1, total=1)
             
             if not thumb_media_id:
                 raise Exception("封面图上传后未返回Media ID")
                 
         except Exception as e:
             logger.error(f"严重错误: 封面图处理失败: {e}", exc_info=True)
-            raise Exception(f"同步前置检查失败: 封面图处理异常 - {str(e)}")
+            raise Exception(f"同步前置检查失败: 封面图处理异常 - {str(e)}") from e
         
         logger.info(f"步骤2: 封面图准备完成, 开始创建草稿, thumb_media_id={thumb_media_id}")
+        await report_progress("creating_draft", 60)
+        policy = RetryPolicy(settings.WECHAT_RETRY_BASE_DELAY, settings.WECHAT_RETRY_MAX_DELAY)
         last_error = None
+        wait_time = None
         
         for attempt in range(max_retries):
             try:
@@ -332,13 +453,16 @@ class WechatService:
                 last_error = e
                 logger.warning(f"同步失败(尝试 {attempt + 1}/{max_retries}): {e}")
                 
+                if not is_transient_error(e):
+                    break
+                
                 if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    logger.info(f"等待 {wait_time} 秒后重试...")
+                    wait_time = policy.next_delay(wait_time)
+                    logger.info(f"等待 {wait_time:.1f} 秒后重试...")
                     await asyncio.sleep(wait_time)
         
         # 所有重试都失败
-        error_msg = f"同步失败,已重试 {max_retries} 次: {last_error}"
+        error_msg = f"同步失败,已尝试 {attempt + 1} 次: {last_error}"
         logger.error(error_msg)
-        raise Exception(error_msg)
+        raise Exception(error_msg) from last_error
 
@@ -0,0 +1,53 @@
+"""压缩工具 - 优先使用zstd,未安装 zstandard 时退回zlib"""
+import zlib
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 取决于部署环境
+    zstandard = None
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+
+
+def default_codec() -> str:
+    """当前环境可用的最佳压缩算法"""
+    return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+
+def compress(data: bytes, level: Optional[int] = None) -> tuple[bytes, str]:
+    """压缩数据
+
+    Args:
+        data: 原始数据
+        level: 压缩级别,为空时使用各算法的默认值
+
+    Returns:
+        (压缩后的数据, 使用的算法)
+    """
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=level or 3).compress(data), CODEC_ZSTD
+    return zlib.compress(data, level if level is not None else 6), CODEC_ZLIB
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """解压数据
+
+    Args:
+        data: 压缩数据
+        codec: 压缩时使用的算法
+
+    Returns:
+        原始数据
+
+    Raises:
+        ValueError: 未知算法,或数据为zstd压缩但未安装 zstandard
+    """
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("数据使用zstd压缩,请安装 zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"未知的压缩算法: {codec}")
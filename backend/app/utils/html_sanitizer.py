@@ -1,5 +1,6 @@
 """HTML清理工具 - XSS防护"""
 import bleach
+from bleach.css_sanitizer import CSSSanitizer
 
 # 允许的HTML标签
 ALLOWED_TAGS = [
@@ -38,7 +39,7 @@ def sanitize_html(html_content: str) -> str:
         html_content,
         tags=ALLOWED_TAGS,
         attributes=ALLOWED_ATTRIBUTES,
-        styles=ALLOWED_STYLES,
+        css_sanitizer=CSSSanitizer(allowed_css_properties=ALLOWED_STYLES),
         strip=True,  # 移除不允许的标签
     )
     
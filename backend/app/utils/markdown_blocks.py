@@ -0,0 +1,141 @@
+"""Markdown分块工具 - 按顶层块切分Markdown并应用编辑补丁"""
+import hashlib
+import re
+
+# 围栏代码块起止标记
+_FENCE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+
+# 列表项、引用
+_LIST_ITEM = re.compile(r"^\s{0,3}([*+-]|\d+[.)])\s")
+_QUOTE = re.compile(r"^\s{0,3}>")
+
+# 依赖全文上下文的语法: 引用式链接定义、脚注、缩写定义、目录标记
+_GLOBAL_SYNTAX = re.compile(
+    r"^\s{0,3}\[[^\]]+\]:\s|\[\^[^\]]+\]|^\*\[[^\]]+\]:|^\s*\[TOC\]\s*$",
+    re.MULTILINE,
+)
+
+# 可能跨空行的块级语法: 行首的原始HTML/注释(空行不结束HTML块)、任意位置的HTML注释、
+# 定义列表(多个术语会合并为同一个 <dl>)
+_MULTI_BLOCK_SYNTAX = re.compile(r"^\s{0,3}<|<!--|^\s{0,3}:\s", re.MULTILINE)
+
+
+def block_hash(block: str) -> str:
+    """计算块内容的哈希"""
+    return hashlib.blake2b(block.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def content_hash(text: str) -> str:
+    """计算全文的SHA-256,用于编辑时的并发冲突检测"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_blocks(markdown_content: str) -> list[str]:
+    """按空行把Markdown切分为顶层块
+
+    围栏代码块内的空行不切分;缩进续行、同类列表项与连续引用会并入上一块,
+    以保证各块单独渲染后拼接的结果与整篇渲染一致。
+
+    Args:
+        markdown_content: Markdown内容
+
+    Returns:
+        块列表(不含首尾空行)
+    """
+    blocks: list[list[str]] = []
+    current: list[str] = []
+    fence: str = ""
+    pending_blank = False
+
+    def kind(line: str) -> str:
+        if _LIST_ITEM.match(line):
+            return "list"
+        if _QUOTE.match(line):
+            return "quote"
+        return "other"
+
+    for line in markdown_content.split("\n"):
+        if fence:
+            current.append(line)
+            stripped = line.strip()
+            if stripped.startswith(fence) and stripped.strip(fence[0]) == "":
+                fence = ""
+            continue
+
+        if not line.strip():
+            if current:
+                pending_blank = True
+            continue
+
+        if pending_blank:
+            previous_kind = kind(current[0])
+            continues = line.startswith(("    ", "\t")) or (
+                previous_kind != "other" and kind(line) == previous_kind
+            )
+            if continues:
+                current.append("")
+            else:
+                blocks.append(current)
+                current = []
+            pending_blank = False
+
+        fence_match = _FENCE.match(line)
+        if fence_match:
+            fence = fence_match.group(1)
+        current.append(line)
+
+    if current:
+        blocks.append(current)
+    return ["\n".join(block) for block in blocks]
+
+
+def requires_full_render(blocks: list[str]) -> bool:
+    """判断是否必须整篇渲染
+
+    引用式链接、脚注、缩写与目录标记跨块生效,原始HTML块、HTML注释与定义列表可能跨越空行,
+    分块渲染结果会与整篇不一致。
+
+    Args:
+        blocks: 块列表
+
+    Returns:
+        是否需要整篇渲染
+    """
+    return any(
+        _GLOBAL_SYNTAX.search(block) or _MULTI_BLOCK_SYNTAX.search(block)
+        for block in blocks
+    )
+
+
+def apply_splices(text: str, splices: list[tuple[int, int, str]]) -> str:
+    """应用文本替换补丁
+
+    每个补丁把原文 [start, end) 区间替换为新文本,偏移量均基于补丁前的原文。
+
+    Args:
+        text: 原文
+        splices: (start, end, 新文本) 列表
+
+    Returns:
+        替换后的文本
+
+    Raises:
+        ValueError: 偏移越界或补丁区间重叠
+    """
+    ordered = sorted(splices, key=lambda s: (s[0], s[1]))
+    previous_end = 0
+    for start, end, _ in ordered:
+        if not 0 <= start <= end <= len(text):
+            raise ValueError(f"补丁区间越界: [{start}, {end}),原文长度 {len(text)}")
+        if start < previous_end:
+            raise ValueError(f"补丁区间重叠: [{start}, {end})")
+        previous_end = end
+
+    parts = []
+    cursor = 0
+    for start, end, replacement in ordered:
+        parts.append(text[cursor:start])
+        parts.append(replacement)
+        cursor = end
+    parts.append(text[cursor:])
+    return "".join(parts)
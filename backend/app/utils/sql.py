@@ -0,0 +1,48 @@
+"""SQL工具 - 跨数据库方言的语句构造与表结构升级"""
+from sqlalchemy import Table, inspect, literal
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+def upsert_insert(session: AsyncSession):
+    """按数据库方言选择支持 ON CONFLICT 的insert构造函数(PostgreSQL/SQLite)"""
+    return postgresql_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+async def add_missing_columns(conn: AsyncConnection, table: Table, column_names: tuple[str, ...]) -> list[str]:
+    """为已存在的表补充模型中新增的列及其索引(幂等)
+
+    create_all 不会修改已存在的表,从旧版本升级时需要补列。非空列使用模型默认值作为列默认值,
+    以便为已有行填充。
+
+    Args:
+        conn: 数据库连接(处于事务中)
+        table: 模型对应的表
+        column_names: 需要检查的列名
+
+    Returns:
+        本次新增的列名
+    """
+    existing = await conn.run_sync(
+        lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns(table.name)}
+    )
+    dialect = conn.dialect
+    preparer = dialect.identifier_preparer
+    added = []
+    for name in column_names:
+        if name in existing:
+            continue
+        column = table.c[name]
+        ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} "
+        ddl += column.type.compile(dialect=dialect)
+        if not column.nullable:
+            default = literal(column.default.arg).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+            ddl += f" NOT NULL DEFAULT {default}"
+        await conn.exec_driver_sql(ddl)
+        added.append(name)
+
+    for index in table.indexes:
+        if any(column.name in added for column in index.columns):
+            await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
+    return added
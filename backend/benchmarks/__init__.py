@@ -0,0 +1 @@
+"""性能基准测试 - 压测与微基准"""
@@ -0,0 +1,108 @@
+"""基准测试公共工具 - 统计汇总与结果持久化"""
+import json
+import math
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """计算百分位数(nearest-rank)
+
+    Args:
+        sorted_values: 已升序排列的数值
+        pct: 百分位(0-100)
+
+    Returns:
+        百分位数值,空列表返回0
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies_ms: list[float], errors: int, elapsed_s: float) -> dict:
+    """汇总一组请求的延迟与吞吐
+
+    Args:
+        latencies_ms: 每个请求的耗时(毫秒)
+        errors: 失败请求数
+        elapsed_s: 总耗时(秒)
+
+    Returns:
+        包含 count/errors/rps/p50/p95/p99/mean/max 的字典
+    """
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "rps": round(count / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "mean_ms": round(sum(values) / count, 3) if count else 0.0,
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def build_report(kind: str, results: dict, params: Optional[dict] = None) -> dict:
+    """构建带运行环境信息的报告"""
+    return {
+        "kind": kind,
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params or {},
+        "results": results,
+    }
+
+
+def save_report(report: dict, output: Optional[str]) -> None:
+    """保存报告为JSON文件(未指定路径时仅打印)"""
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output:
+        Path(output).write_text(text, encoding="utf-8")
+        print(f"结果已保存: {output}")
+    else:
+        print(text)
+
+
+def compare_reports(current: dict, baseline_path: str, metric: str, threshold: float = 0.1) -> list[str]:
+    """与基线报告对比,返回退化项描述
+
+    Args:
+        current: 当前报告
+        baseline_path: 基线JSON路径
+        metric: 用于比较的指标名(越小越好),如 "p95_ms"
+        threshold: 允许的退化比例,默认10%
+
+    Returns:
+        退化项描述列表,为空表示没有退化
+    """
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get(metric):
+            continue
+        ratio = result[metric] / base[metric]
+        line = f"{name}: {metric} {base[metric]} -> {result[metric]} ({ratio:.2f}x)"
+        print(line)
+        if ratio > 1 + threshold:
+            regressions.append(line)
+    return regressions
+
+
+class Stopwatch:
+    """简单计时器"""
+
+    def __enter__(self) -> "Stopwatch":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed_ms = (time.perf_counter() - self.start) * 1000
@@ -0,0 +1,221 @@
+"""模拟上游服务 - 用于压测的LLM与微信API替身
+
+提供两个可配置延迟和错误率的本地服务:
+- LLM: 兼容OpenAI的 /chat/completions 与 /models (对应 SILICONFLOW_BASE_URL)
+- 微信: /cgi-bin/token、/cgi-bin/material/add_material、/cgi-bin/draft/add
+  (对应 WECHAT_API_BASE_URL)
+
+单独运行:
+    python -m benchmarks.fake_servers --llm-port 9001 --wechat-port 9002 --llm-latency-ms 800
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SAMPLE_MARKDOWN = """# 如何提高工作效率
+
+## 一、明确目标
+
+工作效率的提升首先来自于**清晰的目标**。每天开始工作前,列出最重要的三件事。
+
+## 二、减少干扰
+
+- 关闭不必要的通知
+- 使用番茄工作法
+- 批量处理邮件
+
+| 方法 | 效果 |
+| --- | --- |
+| 番茄工作法 | 专注度提升 |
+| 时间块 | 减少切换 |
+
+```python
+def focus(minutes: int = 25) -> None:
+    print(f"专注 {minutes} 分钟")
+```
+
+## 三、总结
+
+> 效率不是做更多的事,而是做对的事。
+"""
+
+
+@dataclass
+class UpstreamProfile:
+    """上游行为配置"""
+    latency_ms: float = 0.0  # 平均延迟
+    jitter_ms: float = 0.0  # 延迟抖动(均匀分布 ±jitter)
+    error_rate: float = 0.0  # 返回错误的概率 (0-1)
+
+    async def delay(self) -> None:
+        """按配置模拟网络与处理延迟"""
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+def create_fake_llm_app(profile: UpstreamProfile) -> FastAPI:
+    """创建模拟LLM服务"""
+    app = FastAPI(title="fake-llm")
+    # 模拟提供商的前缀缓存: 系统提示出现过时按其长度计为命中缓存
+    seen_system_prompts: set[str] = set()
+
+    @app.get("/models")
+    async def list_models() -> dict:
+        return {"object": "list", "data": [{"id": "fake-model", "object": "model"}]}
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        await profile.delay()
+        if profile.should_fail():
+            return JSONResponse({"error": {"message": "upstream overloaded"}}, status_code=503)
+
+        system_prompt = str(payload["messages"][0]["content"]) if payload.get("messages") else ""
+        cached_tokens = min(len(system_prompt), 120) if system_prompt in seen_system_prompts else 0
+        seen_system_prompts.add(system_prompt)
+        usage = {
+            "prompt_tokens": 120,
+            "completion_tokens": 400,
+            "total_tokens": 520,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+
+        if payload.get("stream"):
+            async def events():
+                for start in range(0, len(SAMPLE_MARKDOWN), 50):
+                    chunk = {"choices": [{"index": 0, "delta": {"content": SAMPLE_MARKDOWN[start:start + 50]}}]}
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake-model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": SAMPLE_MARKDOWN},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": usage,
+        }
+
+    return app
+
+
+def create_fake_wechat_app(profile: UpstreamProfile) -> FastAPI:
+    """创建模拟微信API服务"""
+    app = FastAPI(title="fake-wechat")
+
+    def error_response() -> dict:
+        return {"errcode": -1, "errmsg": "system error"}
+
+    @app.get("/cgi-bin/token")
+    async def token() -> dict:
+        await profile.delay()
+        if profile.should_fail():
+            return error_response()
+        return {"access_token": f"fake-token-{uuid.uuid4().hex}", "expires_in": 7200}
+
+    @app.post("/cgi-bin/material/add_material")
+    async def add_material(request: Request) -> dict:
+        await request.body()
+        await profile.delay()
+        if profile.should_fail():
+            return error_response()
+        return {"media_id": f"media-{uuid.uuid4().hex}", "url": "http://mmbiz.qpic.cn/fake.jpg"}
+
+    @app.post("/cgi-bin/draft/add")
+    async def add_draft(request: Request) -> dict:
+        await request.body()
+        await profile.delay()
+        if profile.should_fail():
+            return error_response()
+        return {"media_id": f"draft-{uuid.uuid4().hex}"}
+
+    return app
+
+
+class BackgroundServer:
+    """在后台线程中运行的uvicorn服务"""
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off")
+        self.server = uvicorn.Server(config)
+        self.host = host
+        self.port = port
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "BackgroundServer":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("模拟服务启动超时")
+            time.sleep(0.01)
+        # port=0 时读取实际绑定的端口
+        sockets = self.server.servers[0].sockets
+        self.port = sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="启动模拟LLM与微信服务")
+    parser.add_argument("--llm-port", type=int, default=9001)
+    parser.add_argument("--wechat-port", type=int, default=9002)
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--wechat-latency-ms", type=float, default=50)
+    parser.add_argument("--wechat-jitter-ms", type=float, default=10)
+    parser.add_argument("--wechat-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    llm = BackgroundServer(
+        create_fake_llm_app(UpstreamProfile(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate)),
+        port=args.llm_port,
+    ).start()
+    wechat = BackgroundServer(
+        create_fake_wechat_app(
+            UpstreamProfile(args.wechat_latency_ms, args.wechat_jitter_ms, args.wechat_error_rate)
+        ),
+        port=args.wechat_port,
+    ).start()
+    print(f"SILICONFLOW_BASE_URL={llm.base_url}")
+    print(f"WECHAT_API_BASE_URL={wechat.base_url}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        llm.stop()
+        wechat.stop()
+
+
+if __name__ == "__main__":
+    main()
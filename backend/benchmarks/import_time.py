@@ -0,0 +1,109 @@
+"""导入耗时基准 - 使用 python -X importtime 统计 import app.main 的耗时
+
+用法:
+    python -m benchmarks.import_time --output import.json
+    python -m benchmarks.import_time --compare import.json  # p50退化超过阈值时返回非0
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import build_report, compare_reports, save_report, summarize_latencies
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 应在首次使用时才导入的重量级依赖
+LAZY_MODULES = ("markdown", "bs4", "wechatpy", "passlib", "bleach")
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int, int]]:
+    """解析 -X importtime 输出
+
+    Args:
+        stderr: 子进程的标准错误输出
+
+    Returns:
+        模块名 -> (自身耗时us, 累计耗时us, 嵌套深度)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure_once() -> dict[str, tuple[int, int, int]]:
+    """在全新解释器中导入应用一次"""
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(BACKEND_DIR),
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    env.setdefault("SECRET_KEY", "benchmark-secret-key")
+    if "ENCRYPTION_KEY" not in env:
+        from cryptography.fernet import Fernet
+        env["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+
+    # 在临时目录中运行,同时确认导入不会在工作目录下创建文件
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True,
+        )
+        leftovers = os.listdir(workdir)
+    if leftovers:
+        print(f"警告: 导入时在工作目录下创建了 {leftovers}")
+    return parse_importtime(result.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="导入耗时基准")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="输出累计耗时最高的前N个顶层依赖")
+    parser.add_argument("--output", help="结果JSON保存路径")
+    parser.add_argument("--compare", help="基线JSON路径")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    totals = []
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        modules = measure_once()
+        totals.append(modules["app.main"][1] / 1000)
+    summary = summarize_latencies(totals, 0, time.perf_counter() - started)
+    print(f"[import_app_main] p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms")
+
+    # app.main 的直接依赖(深度1)按累计耗时排序
+    top = sorted(
+        ((name, cumulative / 1000) for name, (_, cumulative, depth) in modules.items() if depth == 1),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:args.top]
+    for name, cumulative_ms in top:
+        print(f"  {cumulative_ms:8.1f}ms  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        print(f"警告: 以下模块应惰性导入,但在导入应用时已加载: {eager}")
+
+    params = {
+        "runs": args.runs,
+        "top_modules_ms": {name: round(ms, 1) for name, ms in top},
+        "eager_lazy_modules": eager,
+    }
+    report = build_report("import_time", {"import_app_main": summary}, params)
+    save_report(report, args.output)
+
+    if args.compare and compare_reports(report, args.compare, "p50_ms", args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""登录吞吐基准 - 并发登录下的吞吐、延迟与事件循环阻塞情况
+
+密码哈希在线程池中执行后,事件循环在登录洪峰期间应保持可响应。
+脚本同时运行一个心跳协程,记录其最大调度延迟(event loop lag)。
+
+用法:
+    python -m benchmarks.login_bench --concurrency 32 --requests 400 --output login.json
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks.common import build_report, compare_reports, save_report
+from benchmarks.load_test import run_scenario
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """心跳协程,返回最大调度延迟(毫秒)"""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, (time.perf_counter() - start - interval) * 1000)
+    return max_lag
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import httpx
+
+    from app.core.db import async_session_maker, create_db_and_tables
+    from app.core.security import get_password_hash
+    from app.main import app
+    from app.models.user import User
+
+    await create_db_and_tables()
+    username = f"login_bench_{int(time.time())}"
+    async with async_session_maker() as session:
+        session.add(User(username=username, password_hash=get_password_hash("benchmark")))
+        await session.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+        async def login(index: int) -> bool:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"username": username, "password": "benchmark"},
+            )
+            return response.status_code == 200
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        summary = await run_scenario("login", args.requests, args.concurrency, login)
+        stop.set()
+        summary["max_loop_lag_ms"] = round(await lag_task, 3)
+
+    print(f"[login] max_loop_lag={summary['max_loop_lag_ms']}ms")
+    return {"login": summary}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="登录吞吐基准")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./benchmark.db")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--output", help="结果JSON保存路径")
+    parser.add_argument("--compare", help="基线JSON路径")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    if "ENCRYPTION_KEY" not in os.environ:
+        from cryptography.fernet import Fernet
+        os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+
+    results = asyncio.run(run(args))
+    report = build_report("login", results, {"concurrency": args.concurrency, "requests": args.requests})
+    save_report(report, args.output)
+
+    if args.compare and compare_reports(report, args.compare, "p95_ms", args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""微基准 - Markdown渲染(整篇/分块增量)、HTML清理、JWT编解码、文章响应序列化与压缩
+
+用法:
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.micro --compare micro.json  # 与基线对比,p50退化超过阈值时返回非0
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.common import build_report, compare_reports, save_report, summarize_latencies
+from benchmarks.fake_servers import SAMPLE_MARKDOWN
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于部署环境
+    orjson = None
+
+
+def bench(name: str, fn: Callable[[], object], iterations: int, warmup: int = 10) -> dict:
+    """重复执行函数并统计单次耗时
+
+    Args:
+        name: 基准名
+        fn: 被测函数
+        iterations: 计时迭代次数
+        warmup: 预热次数
+    """
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    summary = summarize_latencies(latencies, 0, time.perf_counter() - started)
+    print(f"[{name}] p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms ops/s={summary['rps']}")
+    return summary
+
+
+def collect_benchmarks(scale: int) -> dict[str, Callable[[], object]]:
+    """构建被测函数集合
+
+    Args:
+        scale: 样例文章重复倍数,用于模拟长文
+    """
+    from app.core.security import create_access_token, decode_access_token
+    from app.middleware.compression import SUPPORTED_ENCODINGS, StreamCompressor
+    from app.services.style_service import StyleService
+    from app.utils.html_sanitizer import sanitize_html
+
+    markdown_content = "\n\n".join([SAMPLE_MARKDOWN] * scale)
+    css_content = "body { color: #333; line-height: 1.8; } h1 { font-size: 24px; }"
+    html_content = StyleService.markdown_to_html(markdown_content, css_content)
+    token = create_access_token({"user_id": 1, "username": "bench"})
+
+    # 模拟自动保存: 每次只改动一个块,其余块命中缓存
+    edits = iter(range(10**9))
+
+    def markdown_incremental() -> str:
+        edited = markdown_content.replace("清晰的目标", f"清晰的目标{next(edits)}", 1)
+        return StyleService.wrap_html(StyleService.render_body_incremental(edited), css_content)
+
+    article_payload = build_article_payload(markdown_content, html_content)
+    json_body = article_json_stdlib(article_payload)
+
+    def compress_with(encoding: str) -> Callable[[], bytes]:
+        def run() -> bytes:
+            compressor = StreamCompressor(encoding)
+            return compressor.compress(json_body) + compressor.flush()
+        return run
+
+    benchmarks = {
+        "markdown_to_html": lambda: StyleService.markdown_to_html(markdown_content, css_content),
+        "markdown_incremental": markdown_incremental,
+        "sanitize_html": lambda: sanitize_html(html_content),
+        "jwt_encode": lambda: create_access_token({"user_id": 1, "username": "bench"}),
+        "jwt_decode": lambda: decode_access_token(token),
+        "article_json_stdlib": lambda: article_json_stdlib(article_payload),
+    }
+    if orjson is not None:
+        benchmarks["article_json_orjson"] = lambda: orjson.dumps(article_payload)
+    for encoding in SUPPORTED_ENCODINGS:
+        benchmarks[f"article_{encoding}"] = compress_with(encoding)
+    return benchmarks
+
+
+def build_article_payload(markdown_content: str, html_content: str) -> dict:
+    """构造与 ArticleResponse 序列化结果相同结构的数据"""
+    from app.models.article import ArticleStatus
+    from app.schemas.article import ArticleResponse
+
+    now = datetime.utcnow()
+    article = ArticleResponse(
+        id=1, user_id=1, style_id=1, title="基准文章", prompt_input="基准主题",
+        content_raw=markdown_content, content_html=html_content, status=ArticleStatus.GENERATED,
+        wechat_media_id=None, generation_error=None, sync_error_message=None,
+        retry_count=0, created_at=now, updated_at=now, synced_at=None,
+    )
+    return jsonable_encoder(article)
+
+
+def article_json_stdlib(payload: dict) -> bytes:
+    """与 starlette JSONResponse 相同的序列化方式"""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def payload_sizes(scale: int) -> dict[str, int]:
+    """文章响应在各压缩算法下的字节数"""
+    from app.middleware.compression import SUPPORTED_ENCODINGS, StreamCompressor
+    from app.services.style_service import StyleService
+
+    markdown_content = "\n\n".join([SAMPLE_MARKDOWN] * scale)
+    html_content = StyleService.markdown_to_html(markdown_content, "body { color: #333; }")
+    body = article_json_stdlib(build_article_payload(markdown_content, html_content))
+    sizes = {"identity": len(body)}
+    for encoding in SUPPORTED_ENCODINGS:
+        compressor = StreamCompressor(encoding)
+        sizes[encoding] = len(compressor.compress(body) + compressor.flush())
+    print("[article_payload] " + " ".join(f"{name}={size}B" for name, size in sizes.items()))
+    return sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="微基准测试")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=5, help="样例文章重复倍数")
+    parser.add_argument("--only", help="逗号分隔的基准名,默认全部")
+    parser.add_argument("--output", help="结果JSON保存路径")
+    parser.add_argument("--compare", help="基线JSON路径")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    if "ENCRYPTION_KEY" not in os.environ:
+        from cryptography.fernet import Fernet
+        os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+
+    benchmarks = collect_benchmarks(args.scale)
+    selected = args.only.split(",") if args.only else list(benchmarks)
+    results = {name: bench(name, benchmarks[name], args.iterations) for name in selected}
+
+    params = {"iterations": args.iterations, "scale": args.scale, "article_payload_bytes": payload_sizes(args.scale)}
+    report = build_report("micro", results, params)
+    save_report(report, args.output)
+
+    if args.compare and compare_reports(report, args.compare, "p50_ms", args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
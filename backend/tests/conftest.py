@@ -18,7 +18,7 @@ def event_loop():
 
 
 @pytest.fixture(scope="session")
-async def test_engine():
+async def test_engine(event_loop):
     """创建测试数据库引擎"""
     # 使用内存SQLite数据库进行测试
     engine = create_async_engine(
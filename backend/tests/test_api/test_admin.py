@@ -0,0 +1,28 @@
+"""管理端API测试"""
+import pytest
+from httpx import AsyncClient
+
+from app.api.dependencies import get_current_admin_user
+from app.main import app
+from app.models.user import User
+from app.services.prompt_templates import PromptCacheStats
+
+
+@pytest.mark.asyncio
+async def test_prompt_cache_stats():
+    """测试管理员可查看进程内的前缀缓存命中统计"""
+    PromptCacheStats.reset()
+    PromptCacheStats.record(100, 0, 800)
+    PromptCacheStats.record(100, 60, 400)
+    app.dependency_overrides[get_current_admin_user] = lambda: User(id=1, username="admin", password_hash="x", is_admin=True)
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/admin/prompt-cache")
+    finally:
+        app.dependency_overrides.clear()
+        PromptCacheStats.reset()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["calls"], data["hit_calls"], data["cached_ratio"]) == (2, 1, 0.3)
+    assert (data["avg_hit_latency_ms"], data["avg_miss_latency_ms"]) == (400.0, 800.0)
@@ -27,3 +27,15 @@ async def test_root_endpoint():
         data = response.json()
         assert "message" in data
         assert "version" in data
+
+
+@pytest.mark.asyncio
+async def test_liveness_and_readiness_probes():
+    """测试存活探针始终200,未完成启动时就绪探针返回503"""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/health/live")
+        assert response.status_code == 200
+
+        response = await client.get("/api/v1/health/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
@@ -0,0 +1,21 @@
+"""配置测试"""
+from app.core.config import settings
+
+
+def test_per_worker_splits_global_limit(monkeypatch):
+    """测试全局并发额度按worker数平分"""
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 1)
+    assert settings.per_worker(5) == 5
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 2)
+    assert settings.per_worker(5) == 3
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 8)
+    assert settings.per_worker(5) == 1
+
+
+def test_worker_count_auto(monkeypatch):
+    """测试 SERVER_WORKERS=0 时按CPU核数"""
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 0)
+    monkeypatch.setattr("app.core.config.os.cpu_count", lambda: 6)
+    assert settings.get_worker_count() == 6
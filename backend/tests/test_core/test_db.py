@@ -0,0 +1,43 @@
+"""数据库升级测试"""
+from sqlalchemy import Column, MetaData, Table, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.core.db import ADDED_COLUMNS
+from app.models.article import Article
+from app.utils.sql import add_missing_columns
+
+
+async def test_add_missing_columns_upgrades_existing_tables():
+    """测试为旧版本建的表补齐新增列(已有行使用默认值),重复执行不报错"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    old = MetaData()
+    for table_name, column_names in ADDED_COLUMNS.items():
+        table = SQLModel.metadata.tables[table_name]
+        Table(table_name, old, *[
+            Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+            for column in table.columns if column.name not in column_names
+        ])
+
+    async with engine.begin() as conn:
+        await conn.run_sync(old.create_all)
+        await conn.execute(text(
+            "INSERT INTO articles (user_id, style_id, title, prompt_input, content_raw, content_html, "
+            "status, retry_count, created_at, updated_at) "
+            "VALUES (1, 1, 't', 'p', 'x', '<p>x</p>', 'generated', 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+        await conn.run_sync(SQLModel.metadata.create_all)
+        for table_name, column_names in ADDED_COLUMNS.items():
+            table = SQLModel.metadata.tables[table_name]
+            assert await add_missing_columns(conn, table, column_names) == list(column_names)
+            assert await add_missing_columns(conn, table, column_names) == []
+
+        indexes = await conn.run_sync(lambda sync_conn: {i["name"] for i in inspect(sync_conn).get_indexes("articles")})
+        expected = {i.name for i in Article.__table__.indexes if any(c.name in ADDED_COLUMNS["articles"] for c in i.columns)}
+        assert expected <= indexes
+
+    async with AsyncSession(engine) as session:
+        article = (await session.execute(select(Article))).scalar_one()
+        assert article.shell_omitted is False
+        assert article.content_codec is None
+    await engine.dispose()
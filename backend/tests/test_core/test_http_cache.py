@@ -0,0 +1,28 @@
+"""ETag与条件请求测试"""
+from app.core.http_cache import etag_matches, make_etag, not_modified
+
+
+def test_make_etag_changes_with_version():
+    """测试ETag随版本字段变化"""
+    etag = make_etag(1, 3, "2024-01-01T00:00:00")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(1, 3, "2024-01-01T00:00:00")
+    assert etag != make_etag(1, 4, "2024-01-01T00:00:00")
+
+
+def test_etag_matches_weak_list_and_wildcard():
+    """测试 If-None-Match 的弱比较、多值与通配符"""
+    etag = make_etag(1)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_not_modified_response():
+    """测试304响应携带ETag且无响应体"""
+    response = not_modified('"abc"', "private, no-cache")
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"abc"'
+    assert response.body == b""
@@ -0,0 +1,22 @@
+"""启动导入测试 - 重量级依赖应在首次使用时才导入"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+LAZY_MODULES = ("markdown", "bs4", "wechatpy", "passlib", "bleach")
+
+
+def test_app_import_defers_heavy_modules(tmp_path):
+    """测试导入应用时不加载重量级依赖,也不在工作目录下创建文件"""
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR), "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(' '.join(sys.modules))"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    )
+    loaded = set(result.stdout.split())
+
+    assert [name for name in LAZY_MODULES if name in loaded] == []
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,70 @@
+"""限流测试"""
+import pytest
+from starlette.requests import Request
+
+from app.api.dependencies import get_client_ip
+from app.core.config import settings
+from app.core.rate_limit import LocalTokenBucket, RateLimiter, parse_rate, retry_after_header
+
+
+def test_parse_rate():
+    """测试限流规则解析"""
+    assert parse_rate("5/minute") == (5, 60)
+    assert parse_rate("100/hours") == (100, 3600)
+
+    with pytest.raises(ValueError):
+        parse_rate("5 per minute")
+
+
+def test_local_token_bucket_limits_and_refills(monkeypatch):
+    """测试本地令牌桶的限额与回填"""
+    now = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: now[0])
+    bucket = LocalTokenBucket()
+
+    assert all(bucket.hit("k", 3, 60).allowed for _ in range(3))
+    denied = bucket.hit("k", 3, 60)
+    assert not denied.allowed
+    assert retry_after_header(denied) == "20"
+
+    # 20秒后回填一个令牌
+    now[0] += 20
+    assert bucket.hit("k", 3, 60).allowed
+    assert not bucket.hit("k", 3, 60).allowed
+
+
+def test_local_token_bucket_evicts_oldest_keys():
+    """测试本地令牌桶键数量有上限"""
+    bucket = LocalTokenBucket(max_keys=2)
+    for key in ("a", "b", "c"):
+        bucket.hit(key, 1, 60)
+
+    assert bucket.hit("a", 1, 60).allowed
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_falls_back_without_redis(monkeypatch):
+    """测试Redis不可用时降级为本地限流"""
+    monkeypatch.setattr("app.core.rate_limit.redis_available", lambda: False)
+    limiter = RateLimiter()
+
+    assert (await limiter.hit("auth", "ip:127.0.0.1", "2/minute")).allowed
+    assert (await limiter.hit("auth", "ip:127.0.0.1", "2/minute")).allowed
+    assert not (await limiter.hit("auth", "ip:127.0.0.1", "2/minute")).allowed
+
+
+def test_client_ip_trusts_x_real_ip_only_from_configured_proxies(monkeypatch):
+    """测试只有来自可信代理的请求才使用X-Real-IP"""
+    def request(peer: str) -> Request:
+        return Request({
+            "type": "http",
+            "headers": [(b"x-real-ip", b"203.0.113.9")],
+            "client": (peer, 1234),
+        })
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", [])
+    assert get_client_ip(request("172.18.0.5")) == "172.18.0.5"
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", ["172.16.0.0/12"])
+    assert get_client_ip(request("172.18.0.5")) == "203.0.113.9"
+    assert get_client_ip(request("198.51.100.7")) == "198.51.100.7"
@@ -0,0 +1,64 @@
+"""重试策略与熔断器测试"""
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from app.core.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+from app.services.mcp_service import MCPService
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    """测试解析秒数与HTTP日期两种格式"""
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not-a-date") is None
+
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(future) <= 30
+
+
+def test_decorrelated_jitter_within_bounds():
+    """测试退避时间在 [base, max] 之间,并优先使用Retry-After"""
+    policy = RetryPolicy(base_delay=1, max_delay=10)
+    delay = None
+    for _ in range(50):
+        delay = policy.next_delay(delay)
+        assert 1 <= delay <= 10
+    assert policy.next_delay(delay, retry_after=3) == 3
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_probes(monkeypatch):
+    """测试连续失败后熔断,冷却后只放行一个探测请求,探测成功后恢复"""
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=10)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            async with breaker:
+                raise RuntimeError("down")
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_quota_errors_are_distinguished_from_rate_limits():
+    """测试429按错误体区分配额耗尽与短时限流"""
+    quota = httpx.Response(429, json={"error": {"code": "insufficient_quota"}})
+    throttled = httpx.Response(429, json={"error": {"message": "rate limit reached"}}, headers={"Retry-After": "2"})
+
+    assert MCPService.is_quota_error(quota)
+    assert not MCPService.is_quota_error(throttled)
+    assert MCPService.is_quota_error(httpx.Response(402))
@@ -0,0 +1,70 @@
+"""密码哈希测试"""
+import asyncio
+import threading
+
+import pytest
+from passlib.hash import pbkdf2_sha256
+
+from app.core import security
+from app.core.security import (
+    PasswordHasherBusyError,
+    get_password_hash_async,
+    verify_and_update_password,
+)
+
+
+@pytest.mark.asyncio
+async def test_password_hash_roundtrip():
+    """测试异步哈希与校验"""
+    hashed = await get_password_hash_async("secret-pass")
+
+    assert await verify_and_update_password("secret-pass", hashed) == (True, None)
+    assert (await verify_and_update_password("wrong-pass", hashed))[0] is False
+
+
+@pytest.mark.asyncio
+async def test_password_rehash_when_rounds_changed():
+    """测试哈希参数变化后登录时返回新哈希"""
+    old_hash = pbkdf2_sha256.using(rounds=1000).hash("secret-pass")
+
+    valid, new_hash = await verify_and_update_password("secret-pass", old_hash)
+
+    assert valid
+    assert new_hash is not None and new_hash != old_hash
+    assert (await verify_and_update_password("secret-pass", new_hash)) == (True, None)
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_sheds_load(monkeypatch):
+    """测试排队已满时拒绝新任务"""
+    monkeypatch.setattr(security, "_pending_hash_jobs", security.settings.PASSWORD_HASH_MAX_PENDING)
+
+    with pytest.raises(PasswordHasherBusyError):
+        await get_password_hash_async("secret-pass")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hash_job_keeps_slot_until_thread_finishes():
+    """测试请求取消后,线程仍在计算期间继续占用排队名额"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(5)
+        return "hashed"
+
+    before = security._pending_hash_jobs
+    job = asyncio.create_task(security._run_hash_job(slow_hash))
+    await asyncio.to_thread(started.wait, 5)
+    job.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await job
+    assert security._pending_hash_jobs == before + 1
+
+    release.set()
+    for _ in range(100):
+        if security._pending_hash_jobs == before:
+            break
+        await asyncio.sleep(0.01)
+    assert security._pending_hash_jobs == before
@@ -0,0 +1,44 @@
+"""链路追踪测试"""
+from app.core.config import settings
+from app.core.tracing import (
+    NoOpSpan,
+    format_server_timing,
+    get_stage_timings,
+    get_tracer,
+    start_stage_collection,
+    stop_stage_collection,
+)
+
+tracer = get_tracer(__name__)
+
+
+def test_tracing_disabled_is_noop(monkeypatch):
+    """测试追踪关闭时不记录耗时"""
+    monkeypatch.setattr(settings, "TRACING_ENABLED", False)
+    _, token = start_stage_collection()
+    try:
+        with tracer.start_as_current_span("stage") as span:
+            assert isinstance(span, NoOpSpan)
+            assert not span.is_recording()
+        assert get_stage_timings() == []
+    finally:
+        stop_stage_collection(token)
+
+
+def test_tracing_records_stage_timings(monkeypatch):
+    """测试追踪开启时记录各阶段耗时"""
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    _, token = start_stage_collection()
+    try:
+        with tracer.start_as_current_span("llm.attempt") as span:
+            span.set_attribute("llm.attempt", 1)
+        with tracer.start_as_current_span("llm.attempt"):
+            pass
+        timings = get_stage_timings()
+    finally:
+        stop_stage_collection(token)
+
+    assert [t.name for t in timings] == ["llm.attempt", "llm.attempt"]
+    header = format_server_timing(timings)
+    assert header.startswith("llm.attempt;dur=")
+    assert "llm.attempt.2;dur=" in header
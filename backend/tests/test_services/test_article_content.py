@@ -0,0 +1,67 @@
+"""文章紧凑存储测试"""
+import pytest
+
+from app.core.config import settings
+from app.models.article import Article
+from app.models.style import Style
+from app.services import article_content
+from app.services.article_content import ArticleContentService
+from app.services.blob_store import BlobStore
+from app.services.style_cache import StyleCache
+from app.services.style_service import StyleService
+
+BODY = "<h1>标题</h1>\n<p>" + "正文内容。" * 200 + "</p>"
+
+
+@pytest.fixture
+def style(monkeypatch):
+    style = Style(id=1, name="s", prompt_instruction="p", css_content="p { color: red; }", is_system=True, version=2)
+    monkeypatch.setattr(StyleCache, "_system_styles", {1: style})
+    return style
+
+
+@pytest.fixture
+def compact(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ARTICLE_COMPACT_STORAGE", True)
+    monkeypatch.setattr(article_content, "blob_store", BlobStore(str(tmp_path)))
+    return tmp_path
+
+
+def _article() -> Article:
+    return Article(id=1, user_id=1, style_id=1, title="t", prompt_input="p", content_raw="# 标题", content_html="")
+
+
+@pytest.mark.asyncio
+async def test_compact_storage_omits_shell_and_compresses(compact, style):
+    """测试紧凑模式只保存压缩后的正文,读取时按样式重新包装"""
+    article = _article()
+    await ArticleContentService.set_rendered(article, BODY, style)
+
+    assert article.content_html == ""
+    assert article.style_version == 2
+    assert len(article.content_body) < len(BODY.encode()) / 5
+    assert await ArticleContentService.get_html(None, article) == StyleService.wrap_html(BODY, style.css_content)
+
+
+@pytest.mark.asyncio
+async def test_large_bodies_are_deduplicated_in_blob_store(compact, style, monkeypatch):
+    """测试大正文存入Blob存储,相同内容只保存一份"""
+    monkeypatch.setattr(settings, "ARTICLE_BLOB_THRESHOLD", 1)
+    first, second = _article(), _article()
+    await ArticleContentService.set_rendered(first, BODY, style)
+    await ArticleContentService.set_rendered(second, BODY, style)
+
+    assert first.content_body is None
+    assert first.content_blob == second.content_blob
+    assert len([p for p in compact.rglob("*") if p.is_file()]) == 1
+    assert BODY in await ArticleContentService.get_html(None, second)
+
+
+@pytest.mark.asyncio
+async def test_inline_storage_unchanged_by_default(style):
+    """测试未启用紧凑存储时保存完整HTML"""
+    article = _article()
+    await ArticleContentService.set_rendered(article, BODY, style)
+
+    assert article.content_codec is None
+    assert article.content_html == StyleService.wrap_html(BODY, style.css_content)
@@ -0,0 +1,77 @@
+"""文章搜索测试(SQLite FTS5)"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from app.models.article import Article
+from app.services.article_search import ArticleSearchService, highlight, snippet
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await ArticleSearchService.setup(conn)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+def _article(user_id: int, title: str, content: str) -> Article:
+    now = datetime.utcnow()
+    return Article(
+        user_id=user_id, style_id=1, title=title, prompt_input="", content_raw=content,
+        content_html="", created_at=now, updated_at=now,
+    )
+
+
+async def test_search_ranks_title_matches_and_paginates(session):
+    """测试中文子串搜索、标题命中优先、游标分页与用户隔离"""
+    session.add_all([
+        _article(1, "时间管理的方法", "# 时间管理\n\n每天列出待办事项。"),
+        _article(1, "读书笔记", "提高效率的关键在于时间管理与专注。"),
+        _article(1, "健身计划", "每周三次力量训练。"),
+        _article(2, "时间管理入门", "别人的文章"),
+    ])
+    await session.commit()
+
+    page = await ArticleSearchService.search(session, 1, "时间管理", limit=1)
+    assert [hit.title for hit in page.items] == ["时间管理的方法"]
+    assert page.items[0].title_highlight == "<mark>时间管理</mark>的方法"
+    assert page.next_cursor is not None
+
+    page = await ArticleSearchService.search(session, 1, "时间管理", limit=1, cursor=page.next_cursor)
+    assert [hit.title for hit in page.items] == ["读书笔记"]
+    assert "<mark>时间管理</mark>" in page.items[0].snippet
+    assert page.next_cursor is None
+
+
+async def test_search_follows_updates_and_short_terms(session):
+    """测试更新后的内容可被搜索,少于3个字符的关键词也能命中"""
+    article = _article(1, "草稿", "旧内容")
+    session.add(article)
+    await session.commit()
+
+    article.content_raw = "关于Python异步编程的笔记"
+    await session.commit()
+
+    assert not (await ArticleSearchService.search(session, 1, "旧内容")).items
+    page = await ArticleSearchService.search(session, 1, "异步 Python")
+    assert [hit.id for hit in page.items] == [article.id]
+    page = await ArticleSearchService.search(session, 1, "异步")
+    assert [hit.id for hit in page.items] == [article.id]
+
+
+async def test_invalid_cursor(session):
+    """测试无效游标"""
+    with pytest.raises(ValueError):
+        await ArticleSearchService.search(session, 1, "时间", cursor="not-a-cursor")
+
+
+def test_highlight_escapes_html():
+    """测试高亮前转义HTML"""
+    assert highlight("<b>Vue</b> 与 vue", ["vue"]) == "&lt;b&gt;<mark>Vue</mark>&lt;/b&gt; 与 <mark>vue</mark>"
+    assert snippet("a" * 200 + "关键词" + "b" * 200, ["关键词"], length=30).startswith("…")
@@ -0,0 +1,82 @@
+"""文章状态机与状态计数测试"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from app.models.article import Article, ArticleStatus
+from app.services.article_status import ArticleStatusService, InvalidStatusTransition
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+def _article(user_id: int, status: ArticleStatus, content_raw: str = "x") -> Article:
+    now = datetime.utcnow()
+    return Article(user_id=user_id, style_id=1, title="t", prompt_input="p", content_raw=content_raw,
+                   content_html="", status=status, created_at=now, updated_at=now)
+
+
+async def test_transitions_update_counts(engine):
+    """测试状态转换同步更新计数,不允许的转换抛出异常"""
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        article = _article(1, ArticleStatus.GENERATING)
+        session.add_all([article, _article(2, ArticleStatus.GENERATING)])
+        await ArticleStatusService.created(session, 1, ArticleStatus.GENERATING)
+        await ArticleStatusService.created(session, 2, ArticleStatus.GENERATING)
+
+        with pytest.raises(InvalidStatusTransition):
+            await ArticleStatusService.transition(session, article, ArticleStatus.SYNCING)
+
+        for target in (ArticleStatus.GENERATED, ArticleStatus.SYNCING, ArticleStatus.SYNC_FAILED,
+                       ArticleStatus.SYNCING, ArticleStatus.SYNCED):
+            await ArticleStatusService.transition(session, article, target)
+        await session.commit()
+
+        counts = await ArticleStatusService.counts(session, user_id=1)
+        assert counts[ArticleStatus.SYNCED.value] == 1
+        assert sum(counts.values()) == 1
+        counts = await ArticleStatusService.counts(session)
+        assert counts[ArticleStatus.GENERATING.value] == 1
+        assert counts[ArticleStatus.SYNC_FAILED.value] == 0
+
+        await ArticleStatusService.deleted(session, article)
+        await session.delete(article)
+        await session.commit()
+        assert sum((await ArticleStatusService.counts(session, user_id=1)).values()) == 0
+
+
+async def test_setup_migrates_legacy_statuses(engine):
+    """测试首次升级时转换旧状态值并初始化计数,重复执行不重复计数"""
+    legacy = [("draft", "x"), ("failed", ""), ("failed", "x"), ("synced", "x")]
+    async with AsyncSession(engine) as session:
+        articles = [_article(1, ArticleStatus.GENERATED, content_raw) for _, content_raw in legacy]
+        session.add_all(articles)
+        await session.flush()
+        for article, (status, _) in zip(articles, legacy):
+            await session.execute(text("UPDATE articles SET status = :status WHERE id = :id"),
+                                  {"status": status, "id": article.id})
+        await session.commit()
+
+    async with engine.begin() as conn:
+        await ArticleStatusService.setup(conn)
+        await ArticleStatusService.setup(conn)
+
+    async with AsyncSession(engine) as session:
+        counts = await ArticleStatusService.counts(session, user_id=1)
+    assert counts == {
+        ArticleStatus.GENERATING.value: 0,
+        ArticleStatus.GENERATED.value: 1,
+        ArticleStatus.GENERATION_FAILED.value: 1,
+        ArticleStatus.SYNCING.value: 0,
+        ArticleStatus.SYNCED.value: 1,
+        ArticleStatus.SYNC_FAILED.value: 1,
+    }
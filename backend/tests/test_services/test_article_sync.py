@@ -0,0 +1,83 @@
+"""文章同步重试策略测试"""
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+from wechatpy.exceptions import WeChatClientException
+
+from app.core.config import settings
+from app.models.article import Article, ArticleStatus
+from app.models.wechat_config import WechatConfig
+from app.services.article_sync import ArticleSyncService
+from app.services.wechat_service import WechatAPIError
+
+
+def _wrapped(error: Exception) -> Exception:
+    """模拟 sync_article_with_retry 包装后的异常"""
+    try:
+        raise Exception("同步失败,已重试 1 次") from error
+    except Exception as e:
+        return e
+
+
+def test_is_retryable_classifies_errcodes():
+    """测试按微信错误码区分可重试与致命错误"""
+    assert ArticleSyncService.is_retryable(_wrapped(WechatAPIError("系统繁忙", -1)))
+    assert ArticleSyncService.is_retryable(_wrapped(WeChatClientException(45011, "freq limit")))
+    assert not ArticleSyncService.is_retryable(_wrapped(WechatAPIError("IP不在白名单", 40164)))
+    assert ArticleSyncService.is_retryable(_wrapped(httpx.ConnectTimeout("timeout")))
+
+
+def test_next_retry_delay_is_jittered_and_capped():
+    """测试退避时间带抖动且不超过上限"""
+    for retry_count in range(1, 12):
+        base = min(settings.SYNC_RETRY_MAX_DELAY, settings.SYNC_RETRY_BASE_DELAY * 2 ** (retry_count - 1))
+        delay = ArticleSyncService.next_retry_delay(retry_count)
+        assert base / 2 <= delay <= base
+
+
+def test_schedule_retry_stops_on_fatal_error():
+    """测试致命错误不安排重试"""
+    article = Article(user_id=1, style_id=1, title="t", prompt_input="p", content_raw="", content_html="")
+
+    ArticleSyncService.schedule_retry(article, _wrapped(WechatAPIError("系统繁忙", -1)))
+    assert article.retry_count == 1
+    assert article.next_attempt_at is not None
+
+    ArticleSyncService.schedule_retry(article, _wrapped(WechatAPIError("AppSecret错误", 40125)))
+    assert article.retry_count == 2
+    assert article.next_attempt_at is None
+
+
+async def test_successful_sync_resets_retry_count(monkeypatch):
+    """测试同步成功后重试次数清零,之后的失败重新获得自动重试次数"""
+    class FakeWechatService:
+        def __init__(self, config):
+            pass
+
+        async def sync_article_with_retry(self, title, content_html, max_retries):
+            return "media-id"
+
+    async def fake_get_html(session, article):
+        return article.content_html
+
+    monkeypatch.setattr("app.services.article_sync.WechatService", FakeWechatService)
+    monkeypatch.setattr("app.services.article_sync.ArticleContentService.get_html", fake_get_html)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        article = Article(user_id=1, style_id=1, title="t", prompt_input="p", content_raw="x",
+                          content_html="<p>x</p>", status=ArticleStatus.SYNC_FAILED,
+                          retry_count=settings.SYNC_RETRY_MAX_ATTEMPTS - 1)
+        config = WechatConfig(user_id=1, app_id="wx", app_secret_encrypted="secret")
+        session.add_all([article, config])
+        await session.commit()
+
+        await ArticleSyncService._sync(session, article, config, max_retries=1)
+        assert article.status == ArticleStatus.SYNCED
+        assert article.retry_count == 0
+
+        ArticleSyncService.schedule_retry(article, _wrapped(WechatAPIError("系统繁忙", -1)))
+        assert article.next_attempt_at is not None
+    await engine.dispose()
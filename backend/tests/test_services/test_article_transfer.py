@@ -0,0 +1,46 @@
+"""文章批量导出/导入测试"""
+import io
+import zipfile
+
+import pytest
+
+from app.core.config import settings
+from app.services.article_transfer import ArticleTransferService, ImportLineTooLarge, _ZipStream
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _collect(iterator) -> list[bytes]:
+    return [item async for item in iterator]
+
+
+async def test_iter_lines_across_chunks():
+    """测试行跨越多个数据块时正确切分,末行无换行符也能读出"""
+    data = b'{"a": 1}\n\n{"b": "\xe4\xb8\xad\xe6\x96\x87"}\n{"c": 3}'
+    lines = await _collect(ArticleTransferService._iter_lines(_chunks(data, 3)))
+    assert lines == [b'{"a": 1}', b"", b'{"b": "\xe4\xb8\xad\xe6\x96\x87"}', b'{"c": 3}']
+
+
+async def test_iter_lines_rejects_oversized_line(monkeypatch):
+    """测试单行超过上限时中止"""
+    monkeypatch.setattr(settings, "ARTICLE_IMPORT_MAX_LINE_BYTES", 16)
+    with pytest.raises(ImportLineTooLarge):
+        await _collect(ArticleTransferService._iter_lines(_chunks(b"ok\n" + b"x" * 64, 8)))
+
+
+def test_zip_stream_produces_valid_archive():
+    """测试写入不可寻址流的zip可正常解压"""
+    stream = _ZipStream()
+    parts = []
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for i in range(3):
+            archive.writestr(f"markdown/{i}.md", f"# 文章{i}\n" * 100)
+            parts.append(stream.drain())
+    parts.append(stream.drain())
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(parts)))
+    assert archive.testzip() is None
+    assert archive.read("markdown/2.md").decode("utf-8").startswith("# 文章2")
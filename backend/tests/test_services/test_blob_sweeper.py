@@ -0,0 +1,40 @@
+"""未引用Blob清理测试"""
+import os
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.models.article import Article, ArticleStatus
+from app.services.blob_store import BlobStore
+from app.services.blob_sweeper import BlobSweeper
+
+
+async def test_sweep_deletes_only_stale_unreferenced_blobs(monkeypatch, tmp_path):
+    """测试只删除宽限期之前写入且不再被引用的Blob,重复写入会刷新宽限期"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    store = BlobStore(str(tmp_path))
+    monkeypatch.setattr("app.services.blob_sweeper.async_session_maker", session_maker)
+    monkeypatch.setattr("app.services.blob_sweeper.blob_store", store)
+
+    referenced, orphan, reused, fresh = (store.put(data) for data in (b"a", b"b", b"c", b"d"))
+    old = time.time() - 7200
+    for digest in (referenced, orphan, reused):
+        os.utime(store._path(digest), (old, old))
+    # 已过宽限期的Blob被新文章再次写入
+    assert store.put(b"c") == reused
+
+    async with session_maker() as session:
+        session.add(Article(user_id=1, style_id=1, title="t", prompt_input="p", content_raw="x", content_html="",
+                            status=ArticleStatus.GENERATED, content_blob=referenced, content_codec="zlib"))
+        await session.commit()
+
+    assert await BlobSweeper().sweep_once() == 1
+    assert not store._path(orphan).exists()
+    for digest in (referenced, reused, fresh):
+        assert store._path(digest).exists()
+    await engine.dispose()
@@ -0,0 +1,58 @@
+"""健康监控测试"""
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services.health_monitor import DEGRADED, DOWN, OK, ComponentHealth, HealthMonitor
+
+
+def _monitor(database_status: str) -> HealthMonitor:
+    monitor = HealthMonitor()
+    monitor.components = {
+        "database": ComponentHealth(database_status),
+        "redis": ComponentHealth(DEGRADED, {"error": "connection refused"}),
+    }
+    monitor.last_check = time.monotonic()
+    return monitor
+
+
+def test_not_ready_before_startup_completes():
+    """启动预热完成前不就绪"""
+    monitor = _monitor(OK)
+    assert not monitor.is_ready()
+    monitor.accepting = True
+    assert monitor.is_ready()
+
+
+def test_redis_degraded_does_not_affect_readiness():
+    """Redis降级不影响就绪,数据库不可用则未就绪"""
+    monitor = _monitor(OK)
+    monitor.accepting = True
+    assert monitor.snapshot()["components"]["redis"]["status"] == DEGRADED
+    assert monitor.is_ready()
+
+    monitor = _monitor(DOWN)
+    monitor.accepting = True
+    assert not monitor.is_ready()
+
+
+def test_stale_snapshot_is_not_ready():
+    """检查结果过期(后台检查停滞)时不就绪"""
+    monitor = _monitor(OK)
+    monitor.accepting = True
+    monitor.last_check = time.monotonic() - 1000
+    assert not monitor.is_ready()
+
+
+async def test_check_once_times_out_slow_checks(monkeypatch):
+    """单项检查超时记为down"""
+    async def slow():
+        await asyncio.sleep(1)
+        return ComponentHealth(OK)
+
+    monitor = HealthMonitor()
+    monkeypatch.setattr(settings, "HEALTH_CHECK_TIMEOUT", 0.05)
+    monkeypatch.setattr(monitor, "_check_database", slow)
+    await monitor.check_once(include_upstreams=False)
+    assert monitor.components["database"].status == DOWN
+    assert monitor.last_check is not None
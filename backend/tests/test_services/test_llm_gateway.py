@@ -0,0 +1,157 @@
+"""LLM网关故障转移测试"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.llm_gateway import LLMBackend, LLMGateway
+
+
+def _completion(content: str) -> dict:
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def _gateway(handler) -> LLMGateway:
+    gateway = LLMGateway([
+        LLMBackend(name="primary", provider="siliconflow", base_url="http://primary", model="m1"),
+        LLMBackend(name="backup", provider="other", base_url="http://backup", model="m2", api_key="sk-backup"),
+        LLMBackend(name="no-key", provider="third", base_url="http://no-key", model="m3"),
+    ])
+    gateway._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return gateway
+
+
+def test_candidates_skip_backends_without_credentials():
+    """测试没有可用Key的其他提供商后端不作为候选"""
+    gateway = _gateway(lambda request: httpx.Response(200, json=_completion("ok")))
+    assert [b.name for b in gateway.candidates("siliconflow")] == ["primary", "backup"]
+
+
+@pytest.mark.asyncio
+async def test_failover_to_backup_on_server_error():
+    """测试主后端5xx时切换到备用后端,并使用备用后端自己的Key和模型"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.host, request.headers["Authorization"]))
+        if request.url.host == "primary":
+            return httpx.Response(503)
+        return httpx.Response(200, json=_completion("ok"))
+
+    gateway = _gateway(handler)
+    call = await gateway.chat_completion({"messages": []}, "sk-user", model="style-model")
+
+    assert call.backend.name == "backup"
+    assert call.model == "m2"
+    assert seen == [("primary", "Bearer sk-user"), ("backup", "Bearer sk-backup")]
+    assert gateway.backends[0].breaker.failures == 1
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_failover_on_non_transport_request_error():
+    """测试解码错误等非传输层的请求错误同样切换到备用后端"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "primary":
+            raise httpx.DecodingError("bad gzip", request=request)
+        return httpx.Response(200, json=_completion("ok"))
+
+    gateway = _gateway(handler)
+    call = await gateway.chat_completion({"messages": []}, "sk-user")
+
+    assert call.backend.name == "backup"
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_streaming_reports_deltas(monkeypatch):
+    """测试流式请求回调文本增量,结果结构与非流式响应相同"""
+    monkeypatch.setattr(settings, "LLM_STREAM_PROGRESS_INTERVAL", 0)
+    events = [
+        {"choices": [{"delta": {"role": "assistant"}}]},
+        {"choices": [{"delta": {"content": "你好"}}]},
+        {"choices": [{"delta": {"content": ",世界"}}]},
+        {"choices": [], "usage": {"completion_tokens": 3}},
+    ]
+    body = "".join(f"data: {json.dumps(e, ensure_ascii=False)}\n\n" for e in events) + "data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+
+    deltas = []
+
+    async def on_delta(text: str) -> None:
+        deltas.append(text)
+
+    gateway = _gateway(handler)
+    call = await gateway.chat_completion({"messages": []}, "sk-user", on_delta=on_delta)
+
+    assert deltas == ["你好", ",世界"]
+    assert call.result["choices"][0]["message"]["content"] == "你好,世界"
+    assert call.result["usage"] == {"completion_tokens": 3}
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_no_failover_on_invalid_key():
+    """测试401不触发故障转移"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(401 if request.url.host == "primary" else 200, json=_completion("ok"))
+
+    gateway = _gateway(handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        await gateway.chat_completion({"messages": []}, "sk-user")
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_skips_backend():
+    """测试熔断中的后端被跳过,不再发出请求"""
+    hosts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        return httpx.Response(503 if request.url.host == "primary" else 200, json=_completion("ok"))
+
+    gateway = _gateway(handler)
+    primary = gateway.backends[0]
+    for _ in range(primary.breaker.failure_threshold):
+        primary.record_failure()
+
+    call = await gateway.chat_completion({"messages": []}, "sk-user")
+
+    assert call.backend.name == "backup"
+    assert hosts == ["backup"]
+    await gateway.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hedged_call_cancels_primary_request(monkeypatch):
+    """测试对冲等待期间调用方被取消时,主后端的请求也被取消"""
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_DELAY_MS", 60000)
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow_call(backend, *args):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(backend.name)
+            raise
+
+    gateway = _gateway(lambda request: httpx.Response(200, json=_completion("ok")))
+    monkeypatch.setattr(gateway, "_call", slow_call)
+    primary, backup = gateway.backends[:2]
+
+    call = asyncio.create_task(gateway._hedged_call(primary, backup, {"messages": []}, "sk-user", "siliconflow", None))
+    await started.wait()
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    await asyncio.sleep(0)
+    assert cancelled == ["primary"]
+    await gateway.close()
@@ -0,0 +1,34 @@
+"""MCP服务分节生成测试"""
+import asyncio
+
+import pytest
+
+from app.services.mcp_service import MCPService
+
+
+@pytest.mark.asyncio
+async def test_sectioned_generation_runs_sections_concurrently(monkeypatch):
+    """测试分节模式先生成大纲,再并发生成各小节并按大纲顺序拼接"""
+    running = 0
+    peak = 0
+
+    async def fake_generate(self, plan, max_retries, model=None):
+        nonlocal running, peak
+        system_prompt = plan.messages[0]["content"]
+        if "只输出大纲" in system_prompt:
+            return "# 标题\n## 一\n- a\n## 二\n- b\n## 三\n- c"
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        heading = system_prompt.split("「")[1].split("」")[0]
+        return f"{heading}的正文"
+
+    monkeypatch.setattr(MCPService, "_generate_with_retry", fake_generate)
+    service = MCPService.__new__(MCPService)
+
+    markdown = await service.generate_article("主题", "简洁", target_length=900, mode="sectioned")
+
+    assert peak > 1
+    assert markdown.index("一的正文") < markdown.index("二的正文") < markdown.index("三的正文")
+    assert markdown.startswith("# 标题\n\n## 一\n\n")
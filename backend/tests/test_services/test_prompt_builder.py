@@ -0,0 +1,52 @@
+"""Prompt构建测试"""
+from app.core.config import settings
+from app.services.prompt_builder import PromptBuilder
+
+
+def test_estimate_tokens_counts_cjk_per_char():
+    """测试中文按字计数,英文按约4字符一个Token"""
+    assert PromptBuilder.estimate_tokens("") == 0
+    assert PromptBuilder.estimate_tokens("人工智能") == 4
+    assert PromptBuilder.estimate_tokens("abcdefgh") == 2
+
+
+def test_truncate_respects_budget_and_sentence_boundary():
+    """测试截断不超出预算并在句末断开"""
+    text = "第一句话。" * 50
+    truncated = PromptBuilder.truncate(text, 42)
+
+    assert PromptBuilder.estimate_tokens(truncated) <= 42
+    assert truncated.endswith("。")
+    assert PromptBuilder.truncate("短文本", 42) == "短文本"
+
+
+def test_build_sizes_max_tokens_from_target_length():
+    """测试按目标字数确定输出上限,未指定时使用默认上限"""
+    short = PromptBuilder.build("写一篇关于咖啡的短文", "轻松活泼", target_length=300)
+    default = PromptBuilder.build("写一篇关于咖啡的短文", "轻松活泼")
+
+    assert short.max_tokens == PromptBuilder.output_tokens_for_length(300)
+    assert short.max_tokens < default.max_tokens == settings.LLM_MAX_OUTPUT_TOKENS
+    assert "300 字" in short.messages[0]["content"]
+
+
+def test_build_truncates_long_input():
+    """测试超长输入被截断"""
+    plan = PromptBuilder.build("很长的输入" * 2000, "简洁")
+
+    assert plan.truncated
+    assert PromptBuilder.estimate_tokens(plan.messages[1]["content"]) <= settings.LLM_MAX_INPUT_TOKENS
+
+
+def test_parse_outline_and_stitch_sections():
+    """测试解析大纲并拼接小节,去掉模型重复输出的小节标题"""
+    title, sections = PromptBuilder.parse_outline(
+        "# 咖啡简史\n\n## 起源\n- 埃塞俄比亚传说\n## 传播\n- 阿拉伯半岛\n- 欧洲咖啡馆\n"
+    )
+
+    assert title == "咖啡简史"
+    assert [s.heading for s in sections] == ["起源", "传播"]
+    assert sections[1].points == ["阿拉伯半岛", "欧洲咖啡馆"]
+
+    markdown = PromptBuilder.stitch_sections(title, sections, ["## 起源\n牧羊人的故事。", "商路与咖啡馆。"])
+    assert markdown == "# 咖啡简史\n\n## 起源\n\n牧羊人的故事。\n\n## 传播\n\n商路与咖啡馆。\n"
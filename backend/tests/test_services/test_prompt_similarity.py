@@ -0,0 +1,62 @@
+"""相似Prompt检测测试"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from app.models.article import Article, ArticleStatus
+from app.services.prompt_similarity import PromptSimilarityService
+from app.utils import minhash
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+def test_signature_similarity():
+    """测试近似Prompt相似度高,不同主题相似度低,且签名可序列化"""
+    base = minhash.signature("写一篇关于时间管理的文章")
+    assert minhash.similarity(base, minhash.signature("写一篇关于时间管理的文章吧!")) >= 0.7
+    assert minhash.similarity(base, minhash.signature("写一篇关于健身计划的文章")) < 0.5
+    assert minhash.unpack(minhash.pack(base)) == base
+    assert len(minhash.buckets(base)) == minhash.LSH_BANDS
+    assert minhash.signature("?!") == []
+
+
+async def test_find_similar_per_user_and_style(session):
+    """测试只返回同一用户(及指定样式)下近似的文章,删除后不再返回"""
+    now = datetime.utcnow()
+    articles = [
+        Article(user_id=1, style_id=1, title="A", prompt_input="如何提高工作效率,给出具体方法",
+                content_raw="x", content_html="", status=ArticleStatus.GENERATED, created_at=now, updated_at=now),
+        Article(user_id=1, style_id=2, title="B", prompt_input="请问如何提高工作效率,给出具体方法",
+                content_raw="x", content_html="", status=ArticleStatus.GENERATED, created_at=now, updated_at=now),
+        Article(user_id=2, style_id=1, title="C", prompt_input="如何提高工作效率,给出具体方法",
+                content_raw="x", content_html="", status=ArticleStatus.GENERATED, created_at=now, updated_at=now),
+        Article(user_id=1, style_id=1, title="D", prompt_input="介绍一下Python的异步编程",
+                content_raw="x", content_html="", status=ArticleStatus.GENERATED, created_at=now, updated_at=now),
+    ]
+    session.add_all(articles)
+    await session.flush()
+    for article in articles:
+        PromptSimilarityService.index(session, article)
+    await session.commit()
+
+    similar = await PromptSimilarityService.find_similar(session, 1, "如何提高工作效率?给出具体方法")
+    assert [s.title for s in similar] == ["A", "B"]
+    assert similar[0].similarity == 1.0
+
+    similar = await PromptSimilarityService.find_similar(session, 1, "如何提高工作效率,给出具体方法", style_id=2)
+    assert [s.title for s in similar] == ["B"]
+
+    await PromptSimilarityService.remove(session, articles[0].id)
+    await session.commit()
+    similar = await PromptSimilarityService.find_similar(session, 1, "如何提高工作效率,给出具体方法")
+    assert [s.title for s in similar] == ["B"]
@@ -0,0 +1,47 @@
+"""Prompt模板测试"""
+from app.services.prompt_builder import PromptBuilder
+from app.services.prompt_templates import (
+    CACHE_HINT_CACHE_CONTROL,
+    CACHE_HINT_NONE,
+    CACHE_HINT_PROMPT_CACHE_KEY,
+    PromptTemplates,
+)
+
+
+def test_system_prompt_starts_with_stable_prefix():
+    """测试字数要求等可变内容位于前缀之后,同一样式版本的请求共享前缀"""
+    PromptTemplates.clear()
+    short = PromptBuilder.build("咖啡", "轻松活泼", target_length=300, style_key=(3, 1))
+    other = PromptBuilder.build("茶", "轻松活泼", style_key=(3, 1))
+    bumped = PromptBuilder.build("茶", "严肃专业", style_key=(3, 2))
+
+    assert short.prefix is other.prefix
+    assert short.messages[0]["content"].startswith(short.prefix.text)
+    assert other.messages[0]["content"] == other.prefix.text
+    assert "300 字" not in short.prefix.text
+    assert bumped.prefix.cache_key != short.prefix.cache_key
+    assert "严肃专业" in bumped.messages[0]["content"]
+
+
+def test_apply_cache_hints():
+    """测试按提示方式添加缓存键或缓存断点"""
+    plan = PromptBuilder.build("咖啡", "简洁", target_length=500, style_key=(1, 1))
+    payload = {"messages": plan.messages, "max_tokens": plan.max_tokens}
+
+    assert PromptTemplates.apply_cache_hint(payload, plan.prefix, CACHE_HINT_NONE) is payload
+    keyed = PromptTemplates.apply_cache_hint(payload, plan.prefix, CACHE_HINT_PROMPT_CACHE_KEY)
+    assert keyed["prompt_cache_key"] == plan.prefix.cache_key
+
+    marked = PromptTemplates.apply_cache_hint(payload, plan.prefix, CACHE_HINT_CACHE_CONTROL)
+    blocks = marked["messages"][0]["content"]
+    assert blocks[0] == {"type": "text", "text": plan.prefix.text, "cache_control": {"type": "ephemeral"}}
+    assert "".join(block["text"] for block in blocks) == plan.messages[0]["content"]
+    assert payload["messages"][0]["content"] == plan.messages[0]["content"]
+
+
+def test_cached_tokens_across_providers():
+    """测试兼容不同提供商的缓存Token字段"""
+    assert PromptTemplates.cached_tokens(None) == 0
+    assert PromptTemplates.cached_tokens({"prompt_tokens_details": {"cached_tokens": 64}}) == 64
+    assert PromptTemplates.cached_tokens({"prompt_cache_hit_tokens": 32}) == 32
+    assert PromptTemplates.cached_tokens({"cache_read_input_tokens": 16}) == 16
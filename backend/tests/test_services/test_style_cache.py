@@ -0,0 +1,85 @@
+"""样式缓存测试"""
+import pytest
+
+from app.models.style import Style
+from app.models.user import User
+from app.services.style_cache import StyleCache
+
+
+@pytest.fixture(autouse=True)
+def disable_redis(monkeypatch):
+    """测试环境没有Redis,直接走数据库"""
+    monkeypatch.setattr("app.services.style_cache.redis_available", lambda: False)
+    monkeypatch.setattr(StyleCache, "_system_styles", {})
+    monkeypatch.setattr(StyleCache, "_system_loaded", False)
+
+
+@pytest.mark.asyncio
+async def test_list_styles_puts_system_styles_first(test_session):
+    """测试样式列表包含系统样式和本人样式"""
+    user = User(username="style_cache_user", password_hash="x")
+    other = User(username="style_cache_other", password_hash="x")
+    test_session.add_all([user, other])
+    await test_session.flush()
+
+    system_style = Style(name="系统", prompt_instruction="p", css_content="c", is_system=True)
+    own_style = Style(name="自定义", prompt_instruction="p", css_content="c", user_id=user.id)
+    other_style = Style(name="他人", prompt_instruction="p", css_content="c", user_id=other.id)
+    test_session.add_all([system_style, own_style, other_style])
+    await test_session.commit()
+
+    styles = await StyleCache.list_styles(test_session, user.id)
+    names = [s.name for s in styles]
+
+    assert names.index("系统") < names.index("自定义")
+    assert "他人" not in names
+
+
+@pytest.mark.asyncio
+async def test_get_style_prefers_preloaded_system_styles(test_session):
+    """测试系统样式从进程内存读取"""
+    style = Style(name="预加载", prompt_instruction="p", css_content="c", is_system=True)
+    test_session.add(style)
+    await test_session.commit()
+
+    await StyleCache.preload_system_styles(test_session)
+    cached = await StyleCache.get_style(test_session, style.id)
+
+    assert cached is StyleCache._system_styles[style.id]
+    assert await StyleCache.get_style_version(test_session, style.id, style.version + 1) is None
+
+
+@pytest.mark.asyncio
+async def test_stale_reader_cannot_overwrite_newer_version(test_session, monkeypatch):
+    """测试样式更新后,读到旧版本的请求写回缓存不会覆盖新版本"""
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr("app.services.style_cache.redis_available", lambda: True)
+    monkeypatch.setattr("app.services.style_cache.get_redis", lambda: redis)
+    monkeypatch.setattr(StyleCache, "_get_current_script", None)
+    monkeypatch.setattr(StyleCache, "_store_script", None)
+
+    user = User(username="style_cache_race", password_hash="x")
+    test_session.add(user)
+    await test_session.flush()
+    style = Style(name="旧", prompt_instruction="p", css_content="c", user_id=user.id, version=1)
+    test_session.add(style)
+    await test_session.commit()
+
+    # 读请求在更新前从数据库读到版本1
+    stale = Style.model_validate(style.model_dump())
+
+    style.name = "新"
+    style.version = 2
+    await test_session.commit()
+    await StyleCache.invalidate(style.id, user.id, 1, 2)
+
+    # 读请求在失效之后才写回缓存
+    await StyleCache._store(stale)
+    assert await redis.get(StyleCache._pointer_key(style.id)) == "2"
+
+    cached = await StyleCache.get_style(test_session, style.id)
+    assert (cached.name, cached.version) == ("新", 2)
+    cached = await StyleCache.get_style(test_session, style.id)
+    assert (cached.name, cached.version) == ("新", 2)
+    await redis.aclose()
@@ -0,0 +1,85 @@
+"""Markdown渲染测试"""
+import markdown
+import pytest
+
+from app.services.style_service import MARKDOWN_EXTENSIONS, StyleService
+from app.utils.markdown_blocks import apply_splices, split_blocks
+
+SAMPLE = """# 标题
+
+第一段 *强调*。
+
+## 小节
+
+- 列表一
+
+- 列表二
+
+    续行
+
+> 引用一
+
+> 引用二
+
+```python
+x = 1
+
+
+y = 2
+```
+
+<div>原始HTML</div>
+
+## 小节
+
+| a | b |
+|---|---|
+| 1 | 2 |
+"""
+
+
+def test_split_blocks_keeps_fences_and_loose_lists_together():
+    """测试围栏代码块与松散列表不被空行拆开"""
+    blocks = split_blocks(SAMPLE)
+
+    assert "- 列表一\n\n- 列表二\n\n    续行" in blocks
+    assert "> 引用一\n\n> 引用二" in blocks
+    assert any(block.startswith("```python") and block.endswith("```") for block in blocks)
+
+
+def test_incremental_render_matches_full_render():
+    """测试分块渲染与整篇渲染结果一致(包括重复标题的锚点ID)"""
+    expected = markdown.markdown(SAMPLE, extensions=MARKDOWN_EXTENSIONS)
+
+    assert StyleService.render_body_incremental(SAMPLE) == expected
+    # 编辑一个块后,缓存命中的其他块与新块拼接的结果仍然一致
+    edited = SAMPLE.replace("第一段", "改写后的第一段")
+    assert StyleService.render_body_incremental(edited) == markdown.markdown(edited, extensions=MARKDOWN_EXTENSIONS)
+
+
+def test_reference_links_fall_back_to_full_render():
+    """测试引用式链接跨块生效时退回整篇渲染"""
+    content = "见[文档][doc]。\n\n[doc]: https://example.com"
+    assert 'href="https://example.com"' in StyleService.render_body_incremental(content)
+
+
+@pytest.mark.parametrize("content", [
+    "<div>\nhello\n\nworld</div>",
+    "<div>\n\n段落一\n\n段落二",
+    "前文\n\n<!-- a\n\nb -->\n\n后文",
+    "术语一\n:   定义一\n\n术语二\n:   定义二",
+])
+def test_multi_block_syntax_matches_full_render(content):
+    """测试原始HTML块、跨空行的注释与定义列表的渲染结果与整篇渲染一致"""
+    expected = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS)
+    assert StyleService.render_body_incremental(content) == expected
+
+
+def test_apply_splices():
+    """测试补丁基于原文偏移应用,并拒绝越界与重叠"""
+    assert apply_splices("hello world", [(6, 11, "there"), (0, 0, "> ")]) == "> hello there"
+
+    with pytest.raises(ValueError):
+        apply_splices("abc", [(2, 5, "x")])
+    with pytest.raises(ValueError):
+        apply_splices("abcdef", [(0, 3, "x"), (2, 4, "y")])
@@ -0,0 +1,39 @@
+"""同步重试Worker测试"""
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.models.article import Article, ArticleStatus
+from app.services.article_status import ArticleStatusService
+from app.services.sync_retry_worker import SyncRetryWorker
+
+
+async def test_claim_marks_articles_syncing(monkeypatch):
+    """测试领取时把到期文章转为同步中并设置租约,未到期的文章不被领取"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr("app.services.sync_retry_worker.async_session_maker", session_maker)
+
+    now = datetime.utcnow()
+    async with session_maker() as session:
+        due = Article(user_id=1, style_id=1, title="due", prompt_input="p", content_raw="x", content_html="",
+                      status=ArticleStatus.SYNC_FAILED, next_attempt_at=now - timedelta(seconds=1))
+        later = Article(user_id=1, style_id=1, title="later", prompt_input="p", content_raw="x", content_html="",
+                        status=ArticleStatus.SYNC_FAILED, next_attempt_at=now + timedelta(hours=1))
+        session.add_all([due, later])
+        await ArticleStatusService.created(session, 1, ArticleStatus.SYNC_FAILED, 2)
+        await session.commit()
+
+    assert await SyncRetryWorker()._claim_due() == [due.id]
+
+    async with session_maker() as session:
+        claimed = await session.get(Article, due.id)
+        assert claimed.status == ArticleStatus.SYNCING
+        assert claimed.next_attempt_at > now
+        counts = await ArticleStatusService.counts(session, 1)
+        assert (counts["syncing"], counts["sync_failed"]) == (1, 1)
+    await engine.dispose()
@@ -0,0 +1,66 @@
+"""定时同步调度器测试"""
+import asyncio
+
+from app.core.config import settings
+from app.services.sync_scheduler import SyncScheduler
+
+
+class FakeResult:
+    def scalar_one_or_none(self):
+        return object()
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        return FakeResult()
+
+    async def commit(self):
+        pass
+
+
+async def test_dispatch_groups_by_account_with_concurrency_limit(monkeypatch):
+    """测试每个公众号只刷新一次Token,且组内并发不超过上限"""
+    token_fetches = []
+
+    class FakeWechatService:
+        def __init__(self, config):
+            pass
+
+        async def get_access_token(self):
+            token_fetches.append(1)
+            return "token"
+
+    monkeypatch.setattr("app.services.sync_scheduler.async_session_maker", FakeSession)
+    monkeypatch.setattr("app.services.sync_scheduler.WechatService", FakeWechatService)
+    monkeypatch.setattr(settings, "SCHEDULED_SYNC_ACCOUNT_CONCURRENCY", 2)
+
+    scheduler = SyncScheduler()
+    groups = {1: [1, 2, 3, 4, 5], 2: [6]}
+    active = {1: 0, 2: 0}
+    peak = {1: 0, 2: 0}
+    synced = []
+
+    async def fake_claim():
+        return groups
+
+    async def fake_sync(article_id):
+        user_id = 1 if article_id <= 5 else 2
+        active[user_id] += 1
+        peak[user_id] = max(peak[user_id], active[user_id])
+        await asyncio.sleep(0.01)
+        active[user_id] -= 1
+        synced.append(article_id)
+
+    monkeypatch.setattr(scheduler, "_claim_due", fake_claim)
+    monkeypatch.setattr(scheduler, "_sync", fake_sync)
+
+    assert await scheduler.drain_once() == 6
+    assert sorted(synced) == [1, 2, 3, 4, 5, 6]
+    assert len(token_fetches) == 2
+    assert peak[1] == 2
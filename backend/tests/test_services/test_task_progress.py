@@ -0,0 +1,102 @@
+"""任务进度推送测试"""
+import asyncio
+import json
+
+import redis.asyncio as aioredis
+
+from app.models.task import Task
+from app.services.task_progress import ProgressBroker, TaskProgress, report_progress
+
+
+async def test_broker_dispatches_locally_without_redis(monkeypatch):
+    """测试Redis不可用时在进程内分发给同一用户的订阅者"""
+    monkeypatch.setattr("app.services.task_progress.redis_available", lambda: False)
+    broker = ProgressBroker()
+
+    async with broker.subscribe(1) as queue, broker.subscribe(2) as other:
+        await broker.publish(1, {"stage": "generating", "progress": 10})
+        assert json.loads(queue.get_nowait()) == {"stage": "generating", "progress": 10}
+        assert other.empty()
+
+    assert broker._subscribers == {}
+    await broker.stop()
+
+
+def _resp(*items) -> bytes:
+    """编码RESP数组(元素为字符串或整数)"""
+    parts = [f"*{len(items)}\r\n".encode()]
+    for item in items:
+        if isinstance(item, int):
+            parts.append(f":{item}\r\n".encode())
+        else:
+            data = item.encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def test_idle_subscription_does_not_mark_redis_unavailable(monkeypatch):
+    """测试订阅连接空闲超过 socket_timeout 时不被当作Redis故障,之后仍能收到事件"""
+    subscribed = asyncio.Event()
+    writers = []
+
+    async def handle(reader, writer):
+        writers.append(writer)
+        while line := await reader.readline():
+            # 只处理RESP数组命令: *N 后跟 N 个 $len/value 行
+            args = []
+            for _ in range(int(line[1:])):
+                await reader.readline()
+                args.append((await reader.readline()).strip().decode())
+            if args[0].upper() == "PSUBSCRIBE":
+                writer.write(_resp("psubscribe", args[1], 1))
+                subscribed.set()
+            else:
+                writer.write(b"+OK\r\n")
+            await writer.drain()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    client = aioredis.Redis(port=port, decode_responses=True, socket_timeout=0.1)
+    failures = []
+    monkeypatch.setattr("app.services.task_progress.get_redis", lambda: client)
+    monkeypatch.setattr("app.services.task_progress.redis_available", lambda: True)
+    monkeypatch.setattr("app.services.task_progress.mark_redis_unavailable", failures.append)
+    monkeypatch.setattr("app.services.task_progress._LISTEN_POLL_TIMEOUT", 0.2)
+    broker = ProgressBroker()
+
+    async with broker.subscribe(1) as queue:
+        await asyncio.wait_for(subscribed.wait(), 2)
+        await asyncio.sleep(0.5)
+        assert failures == []
+        assert broker._listening
+
+        writers[-1].write(_resp("pmessage", "task_progress:*", "task_progress:1", '{"stage": "syncing"}'))
+        await writers[-1].drain()
+        assert json.loads(await asyncio.wait_for(queue.get(), 2)) == {"stage": "syncing"}
+
+    await broker.stop()
+    await client.aclose()
+    server.close()
+
+
+async def test_progress_is_monotonic_and_counts_tokens(monkeypatch):
+    """测试进度只增不减并累计Token数"""
+    published = []
+
+    async def fake_publish(user_id, event):
+        published.append(event)
+
+    monkeypatch.setattr("app.services.task_progress.progress_broker.publish", fake_publish)
+    tracker = TaskProgress(Task(id=7, user_id=1, task_type="generate_article", status="running"))
+
+    await tracker.update("generating", 40, tokens=100, sections_done=2, sections_total=4)
+    await tracker.update("generating", 30, tokens=50)
+
+    assert published[-1]["progress"] == 40
+    assert published[-1]["tokens"] == 150
+    assert published[0]["detail"] == {"sections_done": 2, "sections_total": 4}
+
+
+async def test_report_progress_outside_task_is_noop():
+    """测试不在任务上下文中时不推送"""
+    await report_progress("generating", 50)
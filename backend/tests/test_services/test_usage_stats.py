@@ -0,0 +1,69 @@
+"""用量统计测试"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from app.models.user import User
+from app.services.usage_stats import (
+    LATENCY_BUCKETS,
+    UsageStatsService,
+    estimate_percentile,
+    meter_llm_usage,
+    record_llm_usage,
+)
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all([User(id=1, username="alice", password_hash="x"), User(id=2, username="bob", password_hash="x")])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+def test_estimate_percentile_interpolates_within_bucket():
+    """测试由直方图估算分位数"""
+    counts = [0] * len(LATENCY_BUCKETS)
+    assert estimate_percentile(counts, 0.5) is None
+
+    counts[2] = 10  # 2-5秒
+    assert estimate_percentile(counts, 0.5) == 3500.0
+    counts[-1] = 90
+    assert estimate_percentile(counts, 0.99) == 120000.0
+
+
+async def test_counters_upsert_and_report(session):
+    """测试计数在同一天累加,报表按天合计并估算耗时分位数"""
+    with meter_llm_usage() as usage:
+        record_llm_usage({"prompt_tokens": 100, "completion_tokens": 400}, cached_tokens=60)
+        record_llm_usage(None)
+    record_llm_usage({"prompt_tokens": 1})  # 不在计量范围内,忽略
+
+    await UsageStatsService.record_generation(session, 1, True, usage, 1500)
+    await UsageStatsService.record_generation(session, 1, True, usage, 4000)
+    await UsageStatsService.record_generation(session, 2, False, usage)
+    await UsageStatsService.record_sync(session, 1, True)
+    await UsageStatsService.record_sync(session, 1, False)
+    await session.commit()
+
+    today = datetime.utcnow().date()
+    report = await UsageStatsService.report(session, today - timedelta(days=6), today)
+    assert [day.day for day in report.days] == [today]
+    totals = report.totals
+    assert (totals.articles_generated, totals.generation_failed) == (2, 1)
+    assert (totals.articles_synced, totals.sync_failed) == (1, 1)
+    assert (totals.llm_calls, totals.prompt_tokens, totals.cached_tokens) == (6, 300, 180)
+    assert totals.latency_avg_ms == 2750.0
+    assert 1000 < totals.latency_p50_ms <= 2000 < totals.latency_p95_ms <= 5000
+
+    alice = await UsageStatsService.report(session, today, today, user_id=1)
+    assert alice.totals.generation_failed == 0
+
+    top = await UsageStatsService.top_users(session, today, today, limit=10)
+    assert [(u.username, u.articles_generated) for u in top] == [("alice", 2), ("bob", 0)]
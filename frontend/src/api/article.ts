@@ -15,7 +15,7 @@ export interface Article {
     title: string
     prompt_input: string
     content_html: string
-    status: 'draft' | 'synced' | 'failed'
+    status: 'generating' | 'generated' | 'generation_failed' | 'syncing' | 'synced' | 'sync_failed'
     synced_at?: string
     created_at: string
 }